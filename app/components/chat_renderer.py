@@ -103,13 +103,29 @@ def render_tool_data_for_display(tool_name: str, tool_data):
                 st.markdown(str(processed_data))
 
 
+def _superseded_answers(session: list) -> set:
+    # Judge 재생성으로 대체된 초안 위치 (턴마다 마지막 답변만 표시)
+    superseded, last_answer = set(), None
+    for i, msg in enumerate(session):
+        role = msg.get("role")
+        if role == "user":
+            last_answer = None
+        elif role == "assistant" and msg.get("content") and not msg.get("tool_calls"):
+            if last_answer is not None:
+                superseded.add(last_answer)
+            last_answer = i
+    return superseded
+
+
 def render_chat_history():
-    for msg in st.session_state.get("session", []):
+    session = st.session_state.get("session", [])
+    superseded = _superseded_answers(session)
+    for i, msg in enumerate(session):
         role = msg.get("role", "")
         content = msg.get("content", "")
 
-        # system 메시지는 화면에 표시 안 함
-        if role == "system":
+        # system 메시지와 재생성 전 초안은 화면에 표시 안 함
+        if role == "system" or i in superseded:
             continue
 
         # 이전 턴 tool 결과
@@ -4,6 +4,7 @@ import os
 
 from src.session_manager import list_log_sessions
 from src.config import SESSION_DIR
+from src.embedding_cache import get_query_embedding_cache
 
 logger = logging.getLogger(__name__)
 
@@ -107,6 +108,35 @@ def _render_session_list(user_id: str, current_session_file: str | None = None):
             st.rerun()
 
 
+# 워밍업 단계별 안내 문구
+_WARMUP_STAGES = {
+    "scan": "문서 폴더를 확인하는 중",
+    "load": "저장된 인덱스를 여는 중",
+    "ingest": "문서를 읽고 임베딩하는 중",
+    "save": "인덱스를 저장하는 중",
+}
+
+
+@st.fragment(run_every=2)
+def _render_warmup_progress(warmup):
+    """백그라운드 인덱스 워밍업 진행 상황 (2초마다 갱신, 완료되면 앱 전체를 다시 실행)"""
+    snapshot = warmup.snapshot()
+    if snapshot["status"] in ("ready", "failed"):
+        st.rerun()
+
+    progress = snapshot["progress"]
+    stage = _WARMUP_STAGES.get(progress.get("stage"), "준비 중")
+    st.markdown(f"- 문서 인덱스 {stage}... ({snapshot['elapsed_sec']:.0f}초)")
+    files_total = progress.get("files_total") or 0
+    if progress.get("stage") == "ingest" and files_total:
+        files_done = progress.get("files_done", 0)
+        st.progress(
+            min(files_done / files_total, 1.0),
+            text=f"파일 {files_done}/{files_total}개 · 임베딩 청크 {progress.get('chunks_embedded', 0)}개",
+        )
+    st.caption("준비되는 동안에는 문서 검색 없이 답변합니다.")
+
+
 # cookie_manager를 인자로 받도록 변경
 def render_sidebar(
     user_id: str, cookie_manager, current_session_file: str | None = None
@@ -180,10 +210,25 @@ def render_sidebar(
 
         # 지식 베이스 상태
         st.markdown("#### 📚 지식 베이스 상태")
-        if "index" in st.session_state and st.session_state.get("chunks"):
+        warmup = st.session_state.get("rag_warmup")
+        if warmup is not None and not warmup.done:
+            _render_warmup_progress(warmup)
+        elif st.session_state.get("index") is not None and not st.session_state.get(
+            "chunks"
+        ):
+            st.markdown("- 로컬 검색 서비스로 문서를 검색합니다.")
+        elif "index" in st.session_state and st.session_state.get("chunks"):
             num_chunks = len(st.session_state["chunks"])
             st.markdown(f"- 사전 임베딩 문서 청크 수: **{num_chunks}**개")
+            cache_stats = get_query_embedding_cache().stats()
+            if cache_stats["hit_rate"] or cache_stats["misses"]:
+                st.markdown(
+                    f"- 질의 임베딩 캐시 적중률: **{cache_stats['hit_rate'] * 100:.0f}%**"
+                )
             st.caption("사전 로드된 부동산 자료를 기반으로 답변을 보완합니다.")
+        elif warmup is not None and warmup.error:
+            st.markdown("- 사전 임베딩 문서를 불러오지 못했습니다.")
+            st.caption(f"문서 검색 없이 답변합니다. ({warmup.error})")
         else:
             st.markdown("- 사전 임베딩 문서가 아직 준비되지 않았습니다.")
             st.caption("앱이 시작되면 자동으로 문서를 불러옵니다.")
@@ -59,6 +59,9 @@ else:
 
 st.session_state["session"] = previous_session
 
+# RAG 인덱스 로드 (백그라운드 워밍업, 준비 전에는 문서 검색 없이 응답)
+index, chunks, metadatas, lexical_index = initialize_rag_index(client, RAG_DATA_DIR)
+
 # UI 렌더링
 render_header()
 # 사이드바에도 cookie_manager 전달 (로그아웃 버튼용)
@@ -66,9 +69,6 @@ render_sidebar(
     user_id=user_id, cookie_manager=cookie_manager, current_session_file=session_file
 )
 
-# RAG 인덱스 로드
-index, chunks, metadatas = initialize_rag_index(client, RAG_DATA_DIR)
-
 # 기존 대화 렌더링
 render_chat_history()
 
@@ -83,4 +83,5 @@ if query := st.chat_input("질문을 입력해 주세요."):
         metadatas=metadatas,
         user_id=user_id,
         session_file=session_file,
+        lexical_index=lexical_index,
     )
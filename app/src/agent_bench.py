@@ -0,0 +1,324 @@
+import argparse
+import asyncio
+import glob
+import json
+import os
+import time
+import types
+
+import numpy as np
+from openai import AsyncOpenAI
+
+from src.config import OPENAI_API_KEY, SESSION_DIR, TRACE_DIR
+from src.tools import (
+    classify_query_for_tools_async,
+    plan_from_user_query_async,
+    route_and_plan_async,
+)
+
+# 에이전트 단계 벤치마크 (실제 API 호출 발생)
+#   cd app && python -m src.agent_bench route --limit 50
+#   기록된 세션의 사용자 질문으로 분류+플래너 2회 호출(split)과 1회 호출(combined)을 비교
+#   cd app && python -m src.agent_bench judge --days 7
+#   트레이스 저장소의 Judge 기록으로 JUDGE_POLICY 별 점수와 지연을 집계 (API 호출 없음)
+
+
+class UsageRecorder:
+    # chat.completions.create 호출마다 토큰 사용량을 기록하는 AsyncOpenAI 프록시
+
+    def __init__(self, aclient: AsyncOpenAI):
+        self._aclient = aclient
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.chat = types.SimpleNamespace(
+            completions=types.SimpleNamespace(create=self._create)
+        )
+
+    async def _create(self, **kwargs):
+        res = await self._aclient.chat.completions.create(**kwargs)
+        if res.usage is not None:
+            self.prompt_tokens += res.usage.prompt_tokens
+            self.completion_tokens += res.usage.completion_tokens
+        return res
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+def load_recorded_queries(session_dir: str = SESSION_DIR, limit: int | None = None):
+    # 세션 로그(jsonl)의 사용자 질문을 중복 없이 최신 파일부터 수집
+    paths = sorted(
+        glob.glob(os.path.join(session_dir, "**", "*.jsonl"), recursive=True),
+        key=os.path.getmtime,
+        reverse=True,
+    )
+    queries = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    continue
+                content = (msg.get("content") or "").strip()
+                if msg.get("role") == "user" and content and content not in queries:
+                    queries.append(content)
+        if limit and len(queries) >= limit:
+            break
+    return queries[:limit] if limit else queries
+
+
+def _plan_tools(plan: dict) -> set:
+    return {step.get("name") for step in plan.get("tool_plan") or []}
+
+
+async def _run_split(query: str, aclient: AsyncOpenAI):
+    # 현재 파이프라인과 같이 분류와 플래너를 동시에 호출 (순차 실행 시 지연은 두 호출의 합)
+    recorder = UsageRecorder(aclient)
+
+    async def timed(coro):
+        started = time.perf_counter()
+        result = await coro
+        return result, time.perf_counter() - started
+
+    started = time.perf_counter()
+    (classify_result, classify_sec), (plan, plan_sec) = await asyncio.gather(
+        timed(classify_query_for_tools_async(query, recorder)),
+        timed(plan_from_user_query_async(query, recorder)),
+    )
+    return {
+        "need_tools": bool(classify_result.get("need_tools", False)),
+        "tools": _plan_tools(plan),
+        "latency_sec": time.perf_counter() - started,
+        "sequential_sec": classify_sec + plan_sec,
+        "tokens": recorder.total_tokens,
+    }
+
+
+async def _run_combined(query: str, aclient: AsyncOpenAI):
+    recorder = UsageRecorder(aclient)
+    started = time.perf_counter()
+    classify_result, plan = await route_and_plan_async(query, recorder)
+    return {
+        "need_tools": classify_result["need_tools"],
+        "tools": _plan_tools(plan),
+        "latency_sec": time.perf_counter() - started,
+        "tokens": recorder.total_tokens,
+    }
+
+
+async def evaluate_route_modes(queries: list, aclient: AsyncOpenAI):
+    # 질의마다 두 방식을 번갈아 순서를 바꿔 실행 (캐시/네트워크 편향 완화)
+    rows = []
+    for i, query in enumerate(queries):
+        if i % 2:
+            combined = await _run_combined(query, aclient)
+            split = await _run_split(query, aclient)
+        else:
+            split = await _run_split(query, aclient)
+            combined = await _run_combined(query, aclient)
+        rows.append({"query": query, "split": split, "combined": combined})
+    return rows
+
+
+def summarize_route_report(rows: list) -> dict:
+    if not rows:
+        return {}
+    same_route = [r["split"]["need_tools"] == r["combined"]["need_tools"] for r in rows]
+    # 둘 다 툴이 필요하다고 본 질의에서 계획한 툴 종류가 같은 비율
+    both_tools = [
+        r for r in rows if r["split"]["need_tools"] and r["combined"]["need_tools"]
+    ]
+    same_tools = [r["split"]["tools"] == r["combined"]["tools"] for r in both_tools]
+
+    def stat(mode: str, key: str):
+        return np.array([r[mode][key] for r in rows], dtype="float64")
+
+    split_tokens = stat("split", "tokens")
+    combined_tokens = stat("combined", "tokens")
+    split_sec = stat("split", "latency_sec")
+    combined_sec = stat("combined", "latency_sec")
+    sequential_sec = stat("split", "sequential_sec")
+    return {
+        "queries": len(rows),
+        "route_agreement": float(np.mean(same_route)),
+        "tool_plan_agreement": float(np.mean(same_tools)) if same_tools else None,
+        "split_p50_ms": float(np.median(split_sec) * 1000),
+        "split_sequential_p50_ms": float(np.median(sequential_sec) * 1000),
+        "combined_p50_ms": float(np.median(combined_sec) * 1000),
+        "split_tokens": float(split_tokens.mean()),
+        "combined_tokens": float(combined_tokens.mean()),
+        "tokens_saved": float((split_tokens - combined_tokens).mean()),
+        "latency_saved_ms": float(np.mean(split_sec - combined_sec) * 1000),
+        "sequential_latency_saved_ms": float(
+            np.mean(sequential_sec - combined_sec) * 1000
+        ),
+    }
+
+
+def format_route_report(rows: list) -> str:
+    summary = summarize_route_report(rows)
+    if not summary:
+        return "비교할 질의가 없습니다."
+    tool_agreement = summary["tool_plan_agreement"]
+    lines = [
+        f"질의 {summary['queries']}개",
+        f"분류 일치율: {summary['route_agreement']:.1%}",
+        "툴 계획 일치율: "
+        + (f"{tool_agreement:.1%}" if tool_agreement is not None else "-")
+        + " (둘 다 툴 필요로 판단한 질의 기준)",
+        f"{'mode':<22} {'p50(ms)':>9} {'tokens':>8}",
+        f"{'split (parallel)':<22} {summary['split_p50_ms']:>9.0f} "
+        f"{summary['split_tokens']:>8.0f}",
+        f"{'split (sequential)':<22} {summary['split_sequential_p50_ms']:>9.0f} "
+        f"{summary['split_tokens']:>8.0f}",
+        f"{'combined':<22} {summary['combined_p50_ms']:>9.0f} "
+        f"{summary['combined_tokens']:>8.0f}",
+        f"요청당 절감: 토큰 {summary['tokens_saved']:.0f}개, "
+        f"지연 {summary['latency_saved_ms']:.0f}ms (순차 대비 "
+        f"{summary['sequential_latency_saved_ms']:.0f}ms)",
+    ]
+    mismatches = [
+        r for r in rows if r["split"]["need_tools"] != r["combined"]["need_tools"]
+    ]
+    if mismatches:
+        lines.append("분류 불일치 질의:")
+        for r in mismatches:
+            lines.append(
+                f"- split={r['split']['need_tools']} combined="
+                f"{r['combined']['need_tools']}: {r['query'][:60]}"
+            )
+    return "\n".join(lines)
+
+
+def load_judge_records(trace_dir: str = TRACE_DIR, days: int | None = None):
+    # 트레이스 저장소(날짜별 jsonl)의 "_judge" 기록 수집
+    paths = sorted(glob.glob(os.path.join(trace_dir, "*.jsonl")), reverse=True)
+    if days:
+        paths = paths[:days]
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if '"_judge"' not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("name") == "_judge":
+                    records.append(record)
+    return records
+
+
+def summarize_judge_report(records: list) -> dict:
+    # 정책별 평가 비율, 평균 점수, 재생성 횟수, Judge 단계/전체 응답 지연
+    # async 정책은 점수가 나중에 기록되므로 점수와 지연을 trace_id 로 합침
+    merged = {}
+    for r in records:
+        row = merged.setdefault((r["policy"], r["trace_id"]), dict(r))
+        for key in ("score", "request_sec"):
+            if r.get(key) is not None:
+                row[key] = r[key]
+        row["attempts"] = max(row["attempts"], r["attempts"])
+
+    def pct(values, q):
+        return float(np.percentile(values, q) * 1000) if values else None
+
+    summary = {}
+    for policy in sorted({policy for policy, _ in merged}):
+        rows = [row for (p, _), row in merged.items() if p == policy]
+        scores = [row["score"] for row in rows if row.get("score") is not None]
+        judge_sec = [row["judge_sec"] for row in rows]
+        request_sec = [
+            row["request_sec"] for row in rows if row.get("request_sec") is not None
+        ]
+        actions = [row["action"] for row in rows]
+        summary[policy] = {
+            "requests": len(rows),
+            "scored": len(scores),
+            "mean_score": float(np.mean(scores)) if scores else None,
+            "low_score_rate": (
+                float(np.mean([score < 4.0 for score in scores])) if scores else None
+            ),
+            "skipped": sum(
+                a in ("skipped_grounded", "deadline_skipped") for a in actions
+            ),
+            "capped": actions.count("deadline_capped"),
+            "mean_attempts": float(np.mean([row["attempts"] for row in rows])),
+            "judge_p50_ms": pct(judge_sec, 50),
+            "judge_p95_ms": pct(judge_sec, 95),
+            "request_p50_ms": pct(request_sec, 50),
+            "request_p95_ms": pct(request_sec, 95),
+        }
+    return summary
+
+
+def format_judge_report(records: list) -> str:
+    summary = summarize_judge_report(records)
+    if not summary:
+        return "Judge 기록이 없습니다."
+
+    def num(value, fmt):
+        return "-" if value is None else format(value, fmt)
+
+    lines = [
+        f"{'policy':<10} {'n':>5} {'scored':>6} {'score':>6} {'<4':>6} "
+        f"{'skip':>5} {'cap':>5} {'tries':>5} {'judge p50/p95(ms)':>18} "
+        f"{'total p50/p95(ms)':>18}"
+    ]
+    for policy, s in summary.items():
+        judge = f"{num(s['judge_p50_ms'], '.0f')}/{num(s['judge_p95_ms'], '.0f')}"
+        total = f"{num(s['request_p50_ms'], '.0f')}/{num(s['request_p95_ms'], '.0f')}"
+        lines.append(
+            f"{policy:<10} {s['requests']:>5} {s['scored']:>6} "
+            f"{num(s['mean_score'], '.2f'):>6} {num(s['low_score_rate'], '.0%'):>6} "
+            f"{s['skipped']:>5} {s['capped']:>5} {s['mean_attempts']:>5.2f} "
+            f"{judge:>18} {total:>18}"
+        )
+    lines.append(
+        "score: 평가된 요청의 최종 점수 평균, skip: 평가 생략, cap: 마감으로 재생성 중단, "
+        "tries: 평균 Judge 호출 수"
+    )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="에이전트 단계 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_route = sub.add_parser("route", help="분류+플래너 split / combined 방식 비교")
+    p_route.add_argument("--session-dir", default=SESSION_DIR)
+    p_route.add_argument(
+        "--queries-file", help="세션 로그 대신 사용할 질문 파일 (한 줄에 하나)"
+    )
+    p_route.add_argument("--limit", type=int, default=50)
+
+    p_judge = sub.add_parser("judge", help="JUDGE_POLICY 별 점수·지연 집계")
+    p_judge.add_argument("--trace-dir", default=TRACE_DIR)
+    p_judge.add_argument("--days", type=int, help="최근 N일 기록만 집계")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "judge":
+        print(format_judge_report(load_judge_records(args.trace_dir, args.days)))
+        return 0
+
+    if args.command == "route":
+        if args.queries_file:
+            with open(args.queries_file, encoding="utf-8") as f:
+                queries = [line.strip() for line in f if line.strip()][: args.limit]
+        else:
+            queries = load_recorded_queries(args.session_dir, args.limit)
+        if not queries:
+            print("비교할 질문이 없습니다.")
+            return 1
+        aclient = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        rows = asyncio.run(evaluate_route_modes(queries, aclient))
+        print(format_route_report(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -27,6 +27,28 @@ TOOLS = [
                         "description": "검색 개수",
                         "default": 3,
                     },
+                    "mode": {
+                        "type": "string",
+                        "enum": ["auto", "hybrid", "vector", "lexical"],
+                        "description": "검색 방식. 조문 번호·정책명·지역명 등 정확한 용어 검색은 lexical, 의미 검색은 vector, 기본은 auto",
+                        "default": "auto",
+                    },
+                    "category": {
+                        "type": "string",
+                        "description": "문서 분류(자료 폴더명, 예: 대출규제)로 검색 범위 제한",
+                    },
+                    "date_from": {
+                        "type": "string",
+                        "description": "이 날짜 이후 공표된 문서만 검색 (YYYY, YYYY-MM, YYYY-MM-DD)",
+                    },
+                    "date_to": {
+                        "type": "string",
+                        "description": "이 날짜 이전 공표된 문서만 검색 (YYYY, YYYY-MM, YYYY-MM-DD)",
+                    },
+                    "source_file": {
+                        "type": "string",
+                        "description": "파일명 일부로 특정 문서만 검색",
+                    },
                 },
                 "required": ["query"],
             },
@@ -87,3 +109,56 @@ TOOLS = [
         },
     },
 ]
+
+# 분류 + 플래너를 한 번에 처리하는 route-and-plan 응답 스키마 (structured outputs, strict)
+# strict 모드는 모든 필드가 required 여야 하므로 쓰지 않는 args 는 null 로 받음
+ROUTE_AND_PLAN_SCHEMA = {
+    "name": "route_and_plan",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "need_tools": {"type": "boolean"},
+            "reason": {"type": "string"},
+            "refine_question": {"type": "string"},
+            "intention": {"type": "string"},
+            "tool_plan": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "enum": [
+                                "search_vector_store",
+                                "search_korean_law",
+                                "get_news",
+                                "get_current_datetime",
+                            ],
+                        },
+                        "args": {
+                            "type": "object",
+                            "properties": {
+                                "query": {"type": ["string", "null"]},
+                                "top_k": {"type": ["integer", "null"]},
+                                "topic": {"type": ["string", "null"]},
+                            },
+                            "required": ["query", "top_k", "topic"],
+                            "additionalProperties": False,
+                        },
+                    },
+                    "required": ["name", "args"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": [
+            "need_tools",
+            "reason",
+            "refine_question",
+            "intention",
+            "tool_plan",
+        ],
+        "additionalProperties": False,
+    },
+}
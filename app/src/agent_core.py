@@ -1,21 +1,50 @@
+import asyncio
 import json
-from openai import OpenAI
+import time
+import uuid
+from openai import AsyncOpenAI, OpenAI
 from src.personal_memory import MemoryManager
 
 from src.tools import (
-    classify_query_for_tools,
-    plan_from_user_query,
-    get_news,
+    classify_query_for_tools_async,
+    is_small_talk,
+    plan_from_user_query_async,
+    route_and_plan_async,
+    get_news_async,
     search_vector_store,
+    search_vector_store_batch,
     get_current_datetime,
-    search_korean_law,
-    llm_as_a_judge,
-    check_policy_and_safety,
+    search_korean_law_async,
+    llm_as_a_judge_async,
+    check_policy_and_safety_async,
     get_user_summary,
 )
 from src.agent_constants import TOOLS
-from src.agent_utils import init_session, call_llm, update_status
+from src.retrieval import FILTER_KEYS
+from src.retrieval_service import RetrievalClient
+from src.embedding_cache import embed_query
+from src.lexical_index import is_keyword_query
+from src.agent_utils import init_session, call_llm_async, update_status
+from src.context_builder import update_session_summary
+from src.async_runtime import get_async_client, get_http_client, run_sync
 from src.prompts import MEMORY_PROMPT_TEMPLATE
+from src.tool_compactor import compact_tool_result
+from src.trace_store import get_trace_store
+from src.judge_policy import (
+    can_judge,
+    can_retry,
+    configured_judge_policy,
+    is_well_grounded,
+    observe,
+)
+from src.config import (
+    RAG_SEARCH_MODE,
+    ROUTE_MODE,
+    SPECULATIVE_PREFETCH,
+    TOOL_CONCURRENCY,
+    TOOL_TIMEOUT_SEC,
+    TOOL_TIMEOUTS,
+)
 
 
 def get_response(
@@ -27,19 +56,97 @@ def get_response(
     index=None,
     chunks=None,
     metadatas=None,
+    lexical_index=None,
+    session: list | None = None,
+    status_callback=None,
+    stream_callback=None,
+):
+    # 동기 호출용 래퍼 (Streamlit): 공용 이벤트 루프에서 get_response_async 를 실행
+    return run_sync(
+        get_response_async,
+        user_id,
+        client,
+        query,
+        directive,
+        continuous=continuous,
+        index=index,
+        chunks=chunks,
+        metadatas=metadatas,
+        lexical_index=lexical_index,
+        session=session,
+        status_callback=status_callback,
+        stream_callback=stream_callback,
+    )
+
+
+def update_context_summary(client: OpenAI, session: list):
+    # 답변을 화면에 보낸 뒤 호출 (동기 래퍼): 밀려난 턴이 생겼으면 이전 대화 요약을 갱신해 세션에 추가
+    return run_sync(update_context_summary_async, client, session)
+
+
+async def update_context_summary_async(client: OpenAI, session: list):
+    started = time.time()
+    msg = await update_session_summary(get_async_client(client), session)
+    if msg is not None:
+        print(
+            f"이전 대화 요약 갱신: 턴 {msg['covered_turns']}개, "
+            f"{time.time() - started:.2f}초 (응답 이후)"
+        )
+    return msg
+
+
+async def get_response_async(
+    user_id: str,
+    client: OpenAI,
+    query: str,
+    directive: str | None,
+    continuous: bool = True,
+    index=None,
+    chunks=None,
+    metadatas=None,
+    lexical_index=None,
     session: list | None = None,
     status_callback=None,
+    stream_callback=None,
 ):
     if session is None:
         session = []
 
     previous_session_size = len(session)
 
+    # LLM 은 AsyncOpenAI, 뉴스/법령 API 는 httpx 로 호출하고
+    # 문서 검색(임베딩 + faiss)과 SQLite 는 스레드로 넘겨 루프를 막지 않음
+    aclient = get_async_client(client)
+
     # 세션 초기화 및 준비
     session = init_session(session, directive, continuous)
 
+    # 분류와 동시에 플래너·원문 질의 문서 검색을 시작해 LLM 왕복 한 번을 겹침
+    # (combined 모드는 분류와 플래너가 한 번의 호출이므로 문서 검색만 미리 시작)
+    # 인사·감사 한마디는 간단 질의일 것이므로 선행 작업을 시작하지 않음
+    combined = ROUTE_MODE == "combined"
+    started = time.time()
+    plan_task = search_task = None
+    if SPECULATIVE_PREFETCH and not is_small_talk(query):
+        if not combined:
+            plan_task = asyncio.create_task(plan_from_user_query_async(query, aclient))
+        if index is not None:
+            search_task = asyncio.create_task(
+                _speculative_search(
+                    client, query, index, chunks, metadatas, lexical_index
+                )
+            )
+
     # 질의 복잡도 분류
-    classify_result = classify_query_for_tools(query, client)
+    plan = None
+    try:
+        if combined:
+            classify_result, plan = await route_and_plan_async(query, aclient)
+        else:
+            classify_result = await classify_query_for_tools_async(query, aclient)
+    except BaseException:
+        _discard_tasks(plan_task, search_task)
+        raise
     need_tools = classify_result.get("need_tools", False)
 
     final_answer = ""
@@ -47,8 +154,14 @@ def get_response(
 
     # 간단한 질의 (Tools 불필요)
     if not need_tools:
-        final_answer, tool_results, session = _handle_simple_query(
-            client, session, query, directive, classify_result
+        _discard_tasks(plan_task, search_task)
+        final_answer, tool_results, session = await _handle_simple_query(
+            aclient,
+            session,
+            query,
+            directive,
+            classify_result,
+            stream_callback=stream_callback,
         )
 
     # 복잡한 질의 (Tools + Planner + Judge)
@@ -57,47 +170,68 @@ def get_response(
         session.append({"role": "user", "content": query})
 
         # 플래너 단계
-        plan, tool_plan = _run_planner_phase(
-            client, query, session, status_callback=status_callback
+        plan, tool_plan = await _run_planner_phase(
+            aclient,
+            query,
+            session,
+            status_callback=status_callback,
+            plan=plan,
+            plan_task=plan_task,
         )
 
+        # 도구 원본 결과는 trace_id 로 트레이스 저장소에 보관
+        trace = {"trace_id": uuid.uuid4().hex, "user_id": user_id, "compact": {}}
         tool_results = {
             "_planner": plan,
             "_classifier": classify_result,
+            "_trace_id": trace["trace_id"],
         }
 
+        if search_task is not None:
+            await _use_speculative_search(
+                search_task, query, session, tool_results, trace, started
+            )
+
         # 툴 실행 루프
-        draft_answer = _run_tool_loop(
+        draft_answer = await _run_tool_loop(
             user_id=user_id,
             client=client,
+            aclient=aclient,
             session=session,
             tool_plan=tool_plan,
             tool_results=tool_results,
+            trace=trace,
             status_callback=status_callback,
+            stream_callback=stream_callback,
             index=index,
             chunks=chunks,
             metadatas=metadatas,
+            lexical_index=lexical_index,
         )
 
         # Judge 루프
-        final_answer, judge_logs = _run_judge_loop(
-            client=client,
+        final_answer, judge_logs = await _run_judge_phase(
+            aclient=aclient,
             query=query,
             directive=directive,
             session=session,
             first_output=draft_answer,
             tool_results=tool_results,
+            trace=trace,
+            started=started,
             status_callback=status_callback,
+            stream_callback=stream_callback,
         )
         tool_results.update(judge_logs)
+        _compact_turn_tool_messages(session, previous_session_size, trace)
 
         update_status(status_callback, "✅ 답변 준비가 완료되었습니다.")
 
     # 장기 메모리 지능형 업데이트
     if user_id:
         try:
-            mm = MemoryManager()
-            _update_memory_if_necessary(client, session, user_id, mm)
+            mm = await asyncio.to_thread(MemoryManager)
+            await _update_memory_if_necessary(aclient, session, user_id, mm)
         except Exception as e:
             # 메모리 저장이 메인 로직을 방해하면 안 되므로 로그만 남기고 패스
             print(f"Memory update failed: {e}")
@@ -105,8 +239,8 @@ def get_response(
     return final_answer, tool_results, session, previous_session_size
 
 
-def _update_memory_if_necessary(
-    client: OpenAI, session: list, user_id: str, mm: MemoryManager
+async def _update_memory_if_necessary(
+    aclient: AsyncOpenAI, session: list, user_id: str, mm: MemoryManager
 ):
     recent_messages = []
     # 뒤에서부터 10개 정도만 보되, user나 assistant의 '대화 내용'만 추려냅니다.
@@ -135,7 +269,7 @@ def _update_memory_if_necessary(
     messages.extend(recent_messages)
 
     try:
-        response = client.chat.completions.create(
+        response = await aclient.chat.completions.create(
             model="gpt-4o-mini",
             messages=messages,
             response_format={"type": "json_object"},
@@ -152,7 +286,7 @@ def _update_memory_if_necessary(
 
         if should_update and new_memory:
             # 기존 메모리 로드
-            existing = mm.get_user_summary(user_id) or ""
+            existing = await asyncio.to_thread(mm.get_user_summary, user_id) or ""
 
             if existing:
                 combined_memory = f"{existing}\n- {new_memory}"
@@ -160,7 +294,7 @@ def _update_memory_if_necessary(
                 combined_memory = f"- {new_memory}"
 
             # 저장
-            mm.save_user_summary(user_id, combined_memory)
+            await asyncio.to_thread(mm.save_user_summary, user_id, combined_memory)
             print(f"📝 [Memory Updated] {new_memory}")
         else:
             # 업데이트 불필요
@@ -170,15 +304,16 @@ def _update_memory_if_necessary(
         print(f"Error during memory judgement: {e}")
 
 
-def _handle_simple_query(
-    client: OpenAI,
+async def _handle_simple_query(
+    aclient: AsyncOpenAI,
     session,
     query: str,
     directive: str | None,
     classify_result: dict,
+    stream_callback=None,
 ):
     session.append({"role": "user", "content": query})
-    msg = call_llm(client, session)
+    msg = await call_llm_async(aclient, session, stream_callback=stream_callback)
     final_answer = msg.content
     session.append({"role": "assistant", "content": final_answer})
 
@@ -189,10 +324,136 @@ def _handle_simple_query(
     return final_answer, tool_results, session
 
 
-def _run_planner_phase(client: OpenAI, query: str, session, status_callback=None):
+def _discard_tasks(*tasks):
+    # 간단 질의로 판정되어 필요 없어진 선행 작업 취소 (이미 끝난 작업의 예외는 회수만 함)
+    # 스레드에서 이미 실행 중인 단계는 멈출 수 없으므로 선행 검색은 단계별로 나눠 다음 단계를 막음
+    for task in tasks:
+        if task is not None and not task.cancel() and not task.cancelled():
+            task.exception()
+
+
+async def _add_tool_result(
+    session, tool_results: dict, trace: dict, call_id: str, func_name: str, args, result
+):
+    # 이번 턴의 LLM 에는 원본을 보내고, Judge 입력에는 요약본을 사용
+    # (턴이 끝나면 세션의 도구 메시지도 요약본으로 교체, 원본은 트레이스 저장소에 보관)
+    compact = compact_tool_result(func_name, result)
+    tool_results[func_name] = compact
+    trace["compact"][call_id] = json.dumps(compact, ensure_ascii=False)
+    await asyncio.to_thread(
+        get_trace_store().append,
+        {
+            "trace_id": trace["trace_id"],
+            "user_id": trace["user_id"],
+            "tool_call_id": call_id,
+            "name": func_name,
+            "args": args,
+            "result": result,
+        },
+    )
+    session.append(
+        {
+            "role": "tool",
+            "tool_call_id": call_id,
+            "name": func_name,
+            "content": json.dumps(result, ensure_ascii=False),
+        }
+    )
+
+
+def _compact_turn_tool_messages(session, start: int, trace: dict):
+    # 다음 턴과 세션 파일에는 요약본만 남김
+    for i in range(start, len(session)):
+        msg = session[i]
+        if msg.get("role") == "tool" and msg.get("tool_call_id") in trace["compact"]:
+            session[i] = {**msg, "content": trace["compact"][msg["tool_call_id"]]}
+
+
+async def _speculative_search(
+    client, query: str, index, chunks, metadatas, lexical_index
+):
+    # 원문 질의 문서 검색을 단계별로 실행: 질의 임베딩(캐시에 저장) → 인덱스 검색
+    # 임베딩 중에 취소되면 인덱스 검색 스레드는 시작하지 않고, 받아 둔 임베딩은 캐시로 재사용됨
+    # (검색 서비스 모드와 BM25 로만 찾는 질의는 임베딩 단계 없이 바로 검색)
+    if not isinstance(index, RetrievalClient) and _needs_query_embedding(
+        query, lexical_index
+    ):
+        await asyncio.to_thread(embed_query, query, client)
+    return await asyncio.to_thread(
+        search_vector_store,
+        client,
+        query,
+        index,
+        chunks,
+        metadatas,
+        lexical_index=lexical_index,
+    )
+
+
+def _needs_query_embedding(query: str, lexical_index) -> bool:
+    # retrieval 의 검색 방식 선택과 같은 기준 (lexical / auto 의 키워드 질의는 임베딩 불필요)
+    if lexical_index is None or not len(lexical_index):
+        return True
+    if RAG_SEARCH_MODE == "lexical":
+        return False
+    if RAG_SEARCH_MODE == "auto":
+        return not is_keyword_query(query)
+    return True
+
+
+async def _use_speculative_search(
+    search_task, query: str, session, tool_results: dict, trace: dict, started: float
+):
+    # 원문 질의로 미리 돌린 문서 검색 결과를 첫 도구 호출처럼 세션에 넣어 도구 루프가 바로 활용
+    try:
+        result = await search_task
+    except Exception as e:
+        print(f"선행 문서 검색 실패: {e}")
+        return
+    # 턴이 바뀌어도 겹치지 않는 ID (세션 길이는 턴마다 같은 값이 될 수 있음)
+    call_id = f"speculative_search_{uuid.uuid4().hex[:16]}"
+    session.append(
+        {
+            "role": "assistant",
+            "tool_calls": [
+                {
+                    "id": call_id,
+                    "type": "function",
+                    "function": {
+                        "name": "search_vector_store",
+                        "arguments": json.dumps({"query": query}, ensure_ascii=False),
+                    },
+                }
+            ],
+        }
+    )
+    await _add_tool_result(
+        session,
+        tool_results,
+        trace,
+        call_id,
+        "search_vector_store",
+        {"query": query},
+        result,
+    )
+    print(f"선행 문서 검색 결과 사용: 질문 후 {time.time() - started:.2f}초")
+
+
+async def _run_planner_phase(
+    aclient: AsyncOpenAI,
+    query: str,
+    session,
+    status_callback=None,
+    plan=None,
+    plan_task=None,
+):
     update_status(status_callback, "✏️ 플래너가 질문을 정리하고 있습니다...")
 
-    plan = plan_from_user_query(query, client)
+    # 분류와 함께 받은 플랜(combined) 또는 분류와 동시에 시작한 플래너 결과를 사용
+    if plan is None and plan_task is not None:
+        plan = await plan_task
+    elif plan is None:
+        plan = await plan_from_user_query_async(query, aclient)
     refined_q = plan.get("refine_question", query)
     intent = plan.get("intention", "")
     tool_plan = plan.get("tool_plan", [])
@@ -215,47 +476,182 @@ def _run_planner_phase(client: OpenAI, query: str, session, status_callback=None
     return plan, tool_plan
 
 
-def _execute_tool_call(
+async def _execute_tool_call(
     user_id: str,
     func_name: str,
     args: dict,
     client: OpenAI,
+    aclient: AsyncOpenAI,
     index=None,
     chunks=None,
     metadatas=None,
+    lexical_index=None,
 ):
     if func_name == "get_news":
-        return get_news(args["topic"])
+        return await get_news_async(args["topic"], get_http_client())
     if func_name == "search_vector_store" and index is not None:
-        return search_vector_store(
+        request = _search_request(args)
+        return await asyncio.to_thread(
+            search_vector_store,
             client,
-            args["query"],
+            request["query"],
             index,
             chunks,
             metadatas,
-            top_k=args.get("top_k", 3),
+            top_k=request["top_k"],
+            mode=request["mode"],
+            lexical_index=lexical_index,
+            filters=request["filters"],
         )
     if func_name == "get_current_datetime":
         return get_current_datetime()
     if func_name == "search_korean_law":
-        return search_korean_law(**args)
+        return await search_korean_law_async(get_http_client(), **args)
     if func_name == "check_policy_and_safety":
-        return check_policy_and_safety(args["user_query"], args["answer"], client)
+        return await check_policy_and_safety_async(
+            args["user_query"], args["answer"], aclient
+        )
     if func_name == "get_user_summary":
-        return get_user_summary(user_id=user_id)
+        return await asyncio.to_thread(get_user_summary, user_id=user_id)
     return {"error": f"알 수 없는 함수: {func_name}"}
 
 
-def _run_tool_loop(
+def _search_request(args: dict):
+    return {
+        "query": args["query"],
+        "top_k": args.get("top_k", 3),
+        "mode": args.get("mode"),
+        "filters": {key: args.get(key) for key in FILTER_KEYS},
+    }
+
+
+def _prefetch_vector_searches(
+    tool_calls,
+    client: OpenAI,
+    index=None,
+    chunks=None,
+    metadatas=None,
+    lexical_index=None,
+):
+    # 한 응답에 search_vector_store 호출이 여러 개면 임베딩/검색을 한 번에 처리하고
+    # tool_call_id 별 결과로 나눠 돌려줌 (실패 시 빈 dict → 호출별 개별 실행)
+    if index is None:
+        return {}
+    calls = []
+    for t in tool_calls:
+        if t.function.name != "search_vector_store":
+            continue
+        try:
+            calls.append((t.id, _search_request(json.loads(t.function.arguments))))
+        except (ValueError, KeyError):
+            continue
+    if len(calls) < 2:
+        return {}
+
+    try:
+        results = search_vector_store_batch(
+            client, [req for _, req in calls], index, chunks, metadatas, lexical_index
+        )
+    except Exception as e:
+        print(f"문서 검색 일괄 처리 실패, 개별 실행합니다: {e}")
+        return {}
+    return {call_id: result for (call_id, _), result in zip(calls, results)}
+
+
+def _tool_timeout(func_name: str) -> float:
+    return TOOL_TIMEOUTS.get(func_name, TOOL_TIMEOUT_SEC)
+
+
+async def _execute_tool_calls(
+    user_id: str,
+    tool_calls,
+    client: OpenAI,
+    aclient: AsyncOpenAI,
+    index=None,
+    chunks=None,
+    metadatas=None,
+    lexical_index=None,
+):
+    # 한 턴의 도구 호출을 동시에 실행하고 tool_calls 순서대로 결과 반환 (동시 실행 수 TOOL_CONCURRENCY)
+    # 턴 지연은 호출별 지연의 합이 아니라 최댓값, 도구별 제한 시간을 넘기면 오류 결과로 대체
+    started = time.time()
+    limit = asyncio.Semaphore(TOOL_CONCURRENCY)
+
+    async def run(t):
+        async with limit:
+            return await _execute_tool_call(
+                user_id,
+                t.function.name,
+                json.loads(t.function.arguments),
+                client,
+                aclient,
+                index=index,
+                chunks=chunks,
+                metadatas=metadatas,
+                lexical_index=lexical_index,
+            )
+
+    search_calls = [t for t in tool_calls if t.function.name == "search_vector_store"]
+    prefetch = None
+    if index is not None and len(search_calls) >= 2:
+        # 문서 검색 여러 개는 임베딩/검색을 한 번에 묶어 하나의 작업으로 실행
+        prefetch = asyncio.ensure_future(
+            asyncio.to_thread(
+                _prefetch_vector_searches,
+                search_calls,
+                client,
+                index=index,
+                chunks=chunks,
+                metadatas=metadatas,
+                lexical_index=lexical_index,
+            )
+        )
+
+    async def run_with_prefetch(t):
+        if prefetch is not None and t in search_calls:
+            prefetched = await asyncio.shield(prefetch)
+            if t.id in prefetched:
+                return prefetched[t.id]
+            # 일괄 처리 실패 → 이 호출만 개별 실행
+        return await run(t)
+
+    async def run_with_timeout(t):
+        timeout = _tool_timeout(t.function.name)
+        try:
+            return await asyncio.wait_for(run_with_prefetch(t), timeout)
+        except asyncio.TimeoutError:
+            return {"error": f"{t.function.name} 응답 시간 초과 ({timeout:g}초)"}
+        except Exception as e:
+            return {"error": str(e)}
+
+    results = await asyncio.gather(*(run_with_timeout(t) for t in tool_calls))
+
+    if len(tool_calls) > 1:
+        print(f"도구 {len(tool_calls)}개 동시 실행: {time.time() - started:.2f}초")
+    return results
+
+
+def available_tools(index=None):
+    # 문서 인덱스가 아직 없으면 search_vector_store 를 도구 목록에서 제외
+    if index is not None:
+        return TOOLS
+    return [t for t in TOOLS if t["function"]["name"] != "search_vector_store"]
+
+
+async def _run_tool_loop(
     user_id: str,
     client: OpenAI,
+    aclient: AsyncOpenAI,
     session,
     tool_plan,
     tool_results: dict,
+    trace: dict,
     status_callback=None,
+    stream_callback=None,
     index=None,
     chunks=None,
     metadatas=None,
+    lexical_index=None,
 ):
     planned_steps = len(tool_plan or [])
     base_loops = 1 if planned_steps == 0 else planned_steps
@@ -271,6 +667,9 @@ def _run_tool_loop(
             f"🧭 플랜 분석 결과, 우선 {planned_steps}개의 도구 사용이 추천되었습니다.",
         )
 
+    # 인덱스 워밍업 중에는 문서 검색 도구를 빼고 나머지 도구로 답변
+    tools = available_tools(index)
+
     draft_answer = None
     loop_idx = 0
 
@@ -283,10 +682,11 @@ def _run_tool_loop(
             f"🔍 외부 도구를 사용해 자료를 수집하는 중입니다... ({loop_idx+1}/{MAX_TOOL_LOOPS})",
         )
 
-        msg = call_llm(
-            client,
+        msg = await call_llm_async(
+            aclient,
             session,
-            tools=TOOLS,
+            stream_callback=stream_callback,
+            tools=tools,
             tool_choice="auto",
         )
 
@@ -299,32 +699,27 @@ def _run_tool_loop(
         # 툴 호출 처리
         session.append({"role": "assistant", "tool_calls": msg.tool_calls})
 
-        for t in msg.tool_calls:
-            func_name = t.function.name
-            args = json.loads(t.function.arguments)
-
-            try:
-                result = _execute_tool_call(
-                    user_id,
-                    func_name,
-                    args,
-                    client,
-                    index=index,
-                    chunks=chunks,
-                    metadatas=metadatas,
-                )
-            except Exception as e:
-                result = {"error": str(e)}
-
-            tool_results[func_name] = result
+        results = await _execute_tool_calls(
+            user_id,
+            msg.tool_calls,
+            client,
+            aclient,
+            index=index,
+            chunks=chunks,
+            metadatas=metadatas,
+            lexical_index=lexical_index,
+        )
 
-            session.append(
-                {
-                    "role": "tool",
-                    "tool_call_id": t.id,
-                    "name": func_name,
-                    "content": json.dumps(result, ensure_ascii=False),
-                }
+        # 완료 순서와 관계없이 원래 tool_call 순서대로 세션에 추가
+        for t, result in zip(msg.tool_calls, results):
+            await _add_tool_result(
+                session,
+                tool_results,
+                trace,
+                t.id,
+                t.function.name,
+                t.function.arguments,
+                result,
             )
 
         loop_idx += 1
@@ -333,22 +728,152 @@ def _run_tool_loop(
         update_status(
             status_callback, "🧩 수집한 정보를 바탕으로 답변을 정리하고 있습니다..."
         )
-        msg = call_llm(client, session)
+        msg = await call_llm_async(aclient, session, stream_callback=stream_callback)
         draft_answer = msg.content
         session.append({"role": "assistant", "content": draft_answer})
 
     return draft_answer
 
 
-def _run_judge_loop(
-    client: OpenAI,
+async def _run_judge_phase(
+    aclient: AsyncOpenAI,
+    query: str,
+    directive: str | None,
+    session,
+    first_output: str,
+    tool_results: dict,
+    trace: dict,
+    started: float,
+    status_callback=None,
+    stream_callback=None,
+):
+    # JUDGE_POLICY 에 따라 평가 생략·마감 기준 재시도 제한·백그라운드 평가를 선택
+    # 정책별 점수/소요 시간은 트레이스 저장소에 "_judge" 기록으로 남김 (agent_bench judge 로 집계)
+    policy = configured_judge_policy()
+    phase_started = time.time()
+
+    if policy in ("grounded", "adaptive") and is_well_grounded(
+        first_output, tool_results
+    ):
+        output, judge_logs, action = first_output, {}, "skipped_grounded"
+    elif policy == "async":
+        task = asyncio.create_task(
+            _judge_in_background(
+                aclient, query, directive, first_output, dict(tool_results), trace
+            )
+        )
+        _background_judges.add(task)
+        task.add_done_callback(_background_judges.discard)
+        output, judge_logs, action = first_output, {}, "deferred"
+    else:
+        output, judge_logs, action = await _run_judge_loop(
+            aclient=aclient,
+            query=query,
+            directive=directive,
+            session=session,
+            first_output=first_output,
+            tool_results=tool_results,
+            policy=policy,
+            started=started,
+            status_callback=status_callback,
+            stream_callback=stream_callback,
+        )
+
+    judge_sec = time.time() - phase_started
+    judge_logs["_judge_policy"] = {"policy": policy, "action": action}
+    await _record_judge(
+        trace, policy, action, judge_logs, judge_sec, time.time() - started
+    )
+    return output, judge_logs
+
+
+# 백그라운드 Judge 작업 (완료 전에 가비지 컬렉션되지 않도록 참조 유지)
+_background_judges = set()
+
+
+async def _judge_in_background(
+    aclient: AsyncOpenAI,
+    query: str,
+    directive: str | None,
+    output: str,
+    tool_results: dict,
+    trace: dict,
+):
+    # 답변은 이미 확정됐으므로 평가 결과는 기록만 함 (재생성 없음)
+    phase_started = time.time()
+    judge_logs = {}
+    try:
+        judgement_str = await llm_as_a_judge_async(
+            _judge_input(query, directive, tool_results, output), aclient
+        )
+        judgement = json.loads(judgement_str or "")
+        judge_logs["llm_as_a_judge_attempt_1"] = judgement
+        judge_logs["_judge_last"] = judgement
+    except Exception as e:
+        judge_logs["llm_as_a_judge_attempt_1"] = {
+            "error": f"Judge 호출 또는 파싱 오류: {e}"
+        }
+    # 응답 지연은 답변 확정 시 기록했으므로 여기서는 점수만 추가 (집계 시 trace_id 로 합침)
+    await _record_judge(trace, "async", "deferred", judge_logs, 0.0, None)
+    print(
+        f"백그라운드 Judge 점수: {judge_logs.get('_judge_last', {}).get('score')} "
+        f"({time.time() - phase_started:.2f}초)"
+    )
+
+
+async def _record_judge(
+    trace: dict,
+    policy: str,
+    action: str,
+    judge_logs: dict,
+    judge_sec: float,
+    request_sec: float | None,
+):
+    attempts = sum(1 for key in judge_logs if key.startswith("llm_as_a_judge_attempt"))
+    await asyncio.to_thread(
+        get_trace_store().append,
+        {
+            "trace_id": trace["trace_id"],
+            "user_id": trace["user_id"],
+            "name": "_judge",
+            "policy": policy,
+            "action": action,
+            "score": (judge_logs.get("_judge_last") or {}).get("score"),
+            "attempts": attempts,
+            "judge_sec": round(judge_sec, 3),
+            "request_sec": None if request_sec is None else round(request_sec, 3),
+        },
+    )
+
+
+def _judge_input(query: str, directive: str | None, tool_results: dict, output: str):
+    return json.dumps(
+        {
+            "user_query": query,
+            "system_directive": directive,
+            "tool_call_results": tool_results,
+            "first_response": output,
+        },
+        ensure_ascii=False,
+    )
+
+
+async def _run_judge_loop(
+    aclient: AsyncOpenAI,
     query: str,
     directive: str | None,
     session,
     first_output: str,
     tool_results: dict,
+    policy: str = "always",
+    started: float | None = None,
     status_callback=None,
+    stream_callback=None,
 ):
+    # 스트리밍 중이면 초안은 이미 화면에 나가 있음 → 재생성하면 "reset" 후 새 답변을 다시 스트리밍
+    # deadline/adaptive 정책은 마감 전에 끝낼 수 없는 평가·재생성을 건너뜀
+    if started is None:
+        started = time.time()
     update_status(status_callback, "🧪 LLM Judge가 답변 품질을 평가하고 있습니다...")
 
     current_attempt = 1
@@ -356,19 +881,17 @@ def _run_judge_loop(
     output = first_output
     last_judgement = None
     judge_logs = {}
+    action = "judged"
 
     while current_attempt <= max_retries:
-        judge_input_content = json.dumps(
-            {
-                "user_query": query,
-                "system_directive": directive,
-                "tool_call_results": tool_results,
-                "first_response": output,
-            },
-            ensure_ascii=False,
-        )
+        if not can_judge(policy, started):
+            action = "deadline_skipped" if current_attempt == 1 else "deadline_capped"
+            break
+        judge_input_content = _judge_input(query, directive, tool_results, output)
         try:
-            judgement_str = llm_as_a_judge(judge_input_content, client)
+            judge_started = time.time()
+            judgement_str = await llm_as_a_judge_async(judge_input_content, aclient)
+            observe("judge", time.time() - judge_started)
             if not judgement_str:
                 raise ValueError("Empty response from LLM")
 
@@ -385,6 +908,9 @@ def _run_judge_loop(
                 and score < 4.0
                 and current_attempt < max_retries
             ):
+                if not can_retry(policy, started):
+                    action = "deadline_capped"
+                    break
                 reason = judgement.get("reason", "사유 없음")
 
                 update_status(
@@ -400,9 +926,16 @@ def _run_judge_loop(
                 )
 
                 session.append({"role": "system", "content": retry_prompt})
-                retry_msg = call_llm(client, session)
+                if stream_callback is not None:
+                    stream_callback("reset", "")
+                regen_started = time.time()
+                retry_msg = await call_llm_async(
+                    aclient, session, stream_callback=stream_callback
+                )
+                observe("regen", time.time() - regen_started)
                 output = retry_msg.content
-                session.append({"role": "system", "content": output})
+                # 재생성한 답변도 assistant 로 기록 (지난 턴 요약·화면에는 마지막 답변만 사용)
+                session.append({"role": "assistant", "content": output})
 
                 current_attempt += 1
             else:
@@ -419,4 +952,4 @@ def _run_judge_loop(
     if last_judgement is not None:
         judge_logs["_judge_last"] = last_judgement
 
-    return output, judge_logs
+    return output, judge_logs, action
@@ -1,11 +1,22 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from openai.types.chat import (
+    ChatCompletionMessage,
+    ChatCompletionMessageFunctionToolCall,
+)
+from openai.types.chat.chat_completion_message_function_tool_call import Function
+
+from src.context_builder import DIRECTIVE_NAME, build_context, find_directives
 
 
 def init_session(session: list, directive: str | None, continuous: bool):
     if not continuous:
         session = []
         return session
-    session.append({"role": "system", "content": directive})
+    # 지시문이 바뀌었을 때만 다시 추가 (LLM 에는 build_context 가 최신 지시문 하나만 보냄)
+    # name 으로 표시해 플래너/재시도 등 다른 system 메시지와 구분
+    directives = find_directives(session)
+    if not directives or directives[-1].get("content") != directive:
+        session.append({"role": "system", "name": DIRECTIVE_NAME, "content": directive})
     return session
 
 
@@ -14,6 +25,60 @@ def call_llm(client: OpenAI, messages, **kwargs):
     return res.choices[0].message
 
 
+async def call_llm_async(
+    aclient: AsyncOpenAI, messages, stream_callback=None, **kwargs
+):
+    # stream_callback 이 있으면 스트리밍으로 받아 본문 조각을 바로 넘김
+    # stream_callback("delta", text): 답변 조각 / stream_callback("reset", ""): 지금까지 보낸 조각 폐기
+    # 세션 전체 대신 토큰 예산 안에서 구성한 컨텍스트를 보냄
+    messages = build_context(messages, model="gpt-4o")
+    if stream_callback is None:
+        res = await aclient.chat.completions.create(
+            model="gpt-4o", messages=messages, **kwargs
+        )
+        return res.choices[0].message
+    return await _stream_llm(aclient, messages, stream_callback, **kwargs)
+
+
+async def _stream_llm(aclient: AsyncOpenAI, messages, stream_callback, **kwargs):
+    # 다 받은 뒤 call_llm 과 같은 형태의 메시지로 조립 (tool_calls 는 index 별로 이어 붙임)
+    stream = await aclient.chat.completions.create(
+        model="gpt-4o", messages=messages, stream=True, **kwargs
+    )
+    content = []
+    calls = {}
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta.content:
+            content.append(delta.content)
+            stream_callback("delta", delta.content)
+        for tc in delta.tool_calls or []:
+            call = calls.setdefault(tc.index, {"id": None, "name": "", "arguments": ""})
+            call["id"] = tc.id or call["id"]
+            if tc.function is not None:
+                call["name"] += tc.function.name or ""
+                call["arguments"] += tc.function.arguments or ""
+
+    tool_calls = [
+        ChatCompletionMessageFunctionToolCall(
+            id=call["id"],
+            type="function",
+            function=Function(name=call["name"], arguments=call["arguments"]),
+        )
+        for _, call in sorted(calls.items())
+    ]
+    # 도구 호출 앞에 붙은 설명 문장은 답변이 아니므로 화면에서 지움
+    if tool_calls and content:
+        stream_callback("reset", "")
+    return ChatCompletionMessage(
+        role="assistant",
+        content="".join(content) or None,
+        tool_calls=tool_calls or None,
+    )
+
+
 def update_status(status_callback, text: str | None):
     if status_callback is not None and text:
         status_callback(text)
@@ -0,0 +1,80 @@
+import asyncio
+import functools
+import queue
+import threading
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+# 에이전트 파이프라인을 돌리는 프로세스 공용 이벤트 루프 (전용 스레드 1개)
+# 대화마다 스레드를 점유하지 않고 LLM/HTTP 대기는 모두 이 루프에서 처리하며,
+# Streamlit 같은 동기 코드는 run_sync 로 코루틴을 넘기고 결과만 기다림
+
+_lock = threading.Lock()
+_loop = None
+# 비동기 클라이언트의 연결 풀은 이벤트 루프에 묶이므로 루프별로 생성
+_async_clients = {}
+_http_clients = {}
+
+
+def get_loop():
+    global _loop
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="agent-loop", daemon=True
+            ).start()
+            _loop = loop
+    return _loop
+
+
+def get_async_client(client: OpenAI) -> AsyncOpenAI:
+    # 동기 클라이언트와 같은 키/엔드포인트의 AsyncOpenAI (현재 루프 안에서 호출)
+    key = (id(asyncio.get_running_loop()), client.api_key, str(client.base_url))
+    with _lock:
+        if key not in _async_clients:
+            _async_clients[key] = AsyncOpenAI(
+                api_key=client.api_key, base_url=client.base_url
+            )
+        return _async_clients[key]
+
+
+def get_http_client() -> httpx.AsyncClient:
+    # 외부 API(뉴스, 법령) 호출용 공유 httpx 클라이언트 (현재 루프 안에서 호출)
+    key = id(asyncio.get_running_loop())
+    with _lock:
+        if key not in _http_clients:
+            _http_clients[key] = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=100)
+            )
+        return _http_clients[key]
+
+
+def run_sync(coro_fn, *args, **kwargs):
+    # coro_fn(*args, **kwargs) 를 공용 루프에서 실행하고 결과 반환
+    # 콜백 인자(*_callback)는 루프 스레드에서 큐에 쌓고 호출한 스레드에서 순서대로 실행
+    # (Streamlit 요소는 스크립트 실행 스레드에서만 갱신 가능)
+    events = queue.SimpleQueue()
+    for name, fn in kwargs.items():
+        if name.endswith("_callback") and fn is not None:
+            kwargs[name] = functools.partial(_enqueue, events, fn)
+    future = asyncio.run_coroutine_threadsafe(coro_fn(*args, **kwargs), get_loop())
+    while not future.done():
+        try:
+            fn, fn_args = events.get(timeout=0.05)
+        except queue.Empty:
+            continue
+        fn(*fn_args)
+    # 대기 시간 초과와 완료 확인 사이에 쌓인 마지막 콜백까지 실행
+    while True:
+        try:
+            fn, fn_args = events.get_nowait()
+        except queue.Empty:
+            break
+        fn(*fn_args)
+    return future.result()
+
+
+def _enqueue(events, fn, *args):
+    events.put((fn, args))
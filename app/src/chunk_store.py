@@ -0,0 +1,220 @@
+import json
+import os
+
+import numpy as np
+
+# 청크 텍스트는 하나의 UTF-8 바이트열에 이어 붙이고, 오프셋 배열로 잘라 읽음
+TEXT_FILE = "chunk_text.bin"
+OFFSETS_FILE = "chunk_offsets.npy"
+IDS_FILE = "chunk_ids.npy"
+FILE_IDS_FILE = "chunk_file_ids.npy"
+PAGES_FILE = "chunk_pages.npy"
+CATEGORY_IDS_FILE = "chunk_category_ids.npy"
+DATES_FILE = "chunk_dates.npy"
+FILE_TABLE_FILE = "files.json"
+CATEGORY_TABLE_FILE = "categories.json"
+
+
+class ChunkStore:
+    # 디스크에서 메모리 매핑되는 읽기 전용 청크 저장소
+    # - ids: 청크 ID (오름차순, int64)
+    # - offsets: 텍스트 바이트열 내 시작/끝 위치 (int64, len = N+1)
+    # - file_ids: 청크별 원본 파일 번호 (int32) → files 테이블로 경로 조회
+    # - pages: 청크별 (시작 페이지, 끝 페이지) (int32, N x 2, 알 수 없으면 0)
+    # - category_ids: 청크별 문서 분류 번호 (int16) → categories 테이블로 이름 조회
+    # - dates: 청크별 문서 공표일 (int32, YYYYMMDD, 알 수 없으면 0)
+    # 여러 프로세스가 같은 파일을 매핑하면 OS 페이지 캐시를 공유함
+
+    def __init__(
+        self,
+        ids,
+        offsets,
+        blob,
+        file_ids,
+        files: list,
+        pages,
+        category_ids,
+        categories: list,
+        dates,
+    ):
+        self.ids = ids
+        self.offsets = offsets
+        self.blob = blob
+        self.file_ids = file_ids
+        self.files = files
+        self.pages = pages
+        self.category_ids = category_ids
+        self.categories = categories
+        self.dates = dates
+        # 원본 float32 벡터 (행 순서 = ids 순서), 서빙 시 index_store 에서 메모리 매핑으로 연결
+        self.vectors = None
+        self.metadatas = ChunkMetadataView(self)
+
+    @classmethod
+    def load(cls, store_dir: str, mmap: bool = True):
+        mode = "r" if mmap else None
+        ids = np.load(os.path.join(store_dir, IDS_FILE), mmap_mode=mode)
+        offsets = np.load(os.path.join(store_dir, OFFSETS_FILE), mmap_mode=mode)
+        file_ids = np.load(os.path.join(store_dir, FILE_IDS_FILE), mmap_mode=mode)
+        pages = np.load(os.path.join(store_dir, PAGES_FILE), mmap_mode=mode)
+        category_ids = np.load(
+            os.path.join(store_dir, CATEGORY_IDS_FILE), mmap_mode=mode
+        )
+        dates = np.load(os.path.join(store_dir, DATES_FILE), mmap_mode=mode)
+        text_path = os.path.join(store_dir, TEXT_FILE)
+        if os.path.getsize(text_path) == 0:
+            blob = np.zeros(0, dtype=np.uint8)
+        elif mmap:
+            blob = np.memmap(text_path, dtype=np.uint8, mode="r")
+        else:
+            blob = np.fromfile(text_path, dtype=np.uint8)
+        with open(os.path.join(store_dir, FILE_TABLE_FILE), "r", encoding="utf-8") as f:
+            files = json.load(f)
+        with open(
+            os.path.join(store_dir, CATEGORY_TABLE_FILE), "r", encoding="utf-8"
+        ) as f:
+            categories = json.load(f)
+        return cls(
+            ids, offsets, blob, file_ids, files, pages, category_ids, categories, dates
+        )
+
+    @staticmethod
+    def save(store_dir: str, chunks: dict, metadatas: dict):
+        # {chunk_id: text}, {chunk_id: {"source_file", "page", "page_end", "category", "date"}}
+        # → 배열 기반 저장소
+        os.makedirs(store_dir, exist_ok=True)
+        ids = np.array(sorted(chunks), dtype=np.int64)
+
+        files = []
+        file_index = {}
+        file_ids = np.empty(len(ids), dtype=np.int32)
+        pages = np.zeros((len(ids), 2), dtype=np.int32)
+        categories = []
+        category_index = {}
+        category_ids = np.empty(len(ids), dtype=np.int16)
+        dates = np.zeros(len(ids), dtype=np.int32)
+        offsets = np.empty(len(ids) + 1, dtype=np.int64)
+        offsets[0] = 0
+
+        with open(os.path.join(store_dir, TEXT_FILE), "wb") as f:
+            for row, chunk_id in enumerate(ids.tolist()):
+                data = chunks[chunk_id].encode("utf-8")
+                f.write(data)
+                offsets[row + 1] = offsets[row] + len(data)
+
+                meta = metadatas[chunk_id]
+                pages[row] = (meta.get("page", 0), meta.get("page_end", 0))
+                dates[row] = meta.get("date", 0)
+                category = meta.get("category", "")
+                if category not in category_index:
+                    category_index[category] = len(categories)
+                    categories.append(category)
+                category_ids[row] = category_index[category]
+                path = meta["source_file"]
+                if path not in file_index:
+                    file_index[path] = len(files)
+                    files.append(path)
+                file_ids[row] = file_index[path]
+
+        np.save(os.path.join(store_dir, IDS_FILE), ids)
+        np.save(os.path.join(store_dir, OFFSETS_FILE), offsets)
+        np.save(os.path.join(store_dir, FILE_IDS_FILE), file_ids)
+        np.save(os.path.join(store_dir, PAGES_FILE), pages)
+        np.save(os.path.join(store_dir, CATEGORY_IDS_FILE), category_ids)
+        np.save(os.path.join(store_dir, DATES_FILE), dates)
+        with open(os.path.join(store_dir, FILE_TABLE_FILE), "w", encoding="utf-8") as f:
+            json.dump(files, f, ensure_ascii=False)
+        with open(
+            os.path.join(store_dir, CATEGORY_TABLE_FILE), "w", encoding="utf-8"
+        ) as f:
+            json.dump(categories, f, ensure_ascii=False)
+
+    def row_of(self, chunk_id) -> int:
+        row = int(np.searchsorted(self.ids, chunk_id))
+        if row >= len(self.ids) or self.ids[row] != chunk_id:
+            raise KeyError(chunk_id)
+        return row
+
+    def text_at(self, row: int) -> str:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return bytes(self.blob[start:end]).decode("utf-8")
+
+    def source_at(self, row: int) -> str:
+        return self.files[int(self.file_ids[row])]
+
+    def metadata_at(self, row: int) -> dict:
+        page, page_end = (int(p) for p in self.pages[row])
+        return {
+            "source_file": self.source_at(row),
+            "page": page,
+            "page_end": page_end,
+            "category": self.categories[int(self.category_ids[row])],
+            "date": int(self.dates[row]),
+        }
+
+    def select(
+        self,
+        category: str | None = None,
+        date_from: int = 0,
+        date_to: int = 0,
+        source_file: str | None = None,
+    ):
+        # 조건에 맞는 행의 불리언 마스크 (조건이 없으면 None)
+        # 분류/파일명은 대소문자 무시 부분 일치, 날짜 조건이 있으면 공표일을 모르는 청크는 제외
+        if not (category or date_from or date_to or source_file):
+            return None
+        mask = np.ones(len(self.ids), dtype=bool)
+        if category:
+            codes = [
+                i
+                for i, name in enumerate(self.categories)
+                if category.lower() in name.lower()
+            ]
+            mask &= np.isin(self.category_ids, codes)
+        if date_from:
+            mask &= self.dates >= date_from
+        if date_to:
+            mask &= (self.dates > 0) & (self.dates <= date_to)
+        if source_file:
+            codes = [
+                i
+                for i, path in enumerate(self.files)
+                if source_file.lower() in os.path.basename(path).lower()
+            ]
+            mask &= np.isin(self.file_ids, codes)
+        return mask
+
+    def __getitem__(self, chunk_id) -> str:
+        return self.text_at(self.row_of(chunk_id))
+
+    def __contains__(self, chunk_id) -> bool:
+        try:
+            self.row_of(chunk_id)
+            return True
+        except KeyError:
+            return False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def to_dicts(self):
+        # 증분 갱신용: 수정 가능한 dict 형태로 변환
+        chunks = {}
+        metadatas = {}
+        for row, chunk_id in enumerate(self.ids.tolist()):
+            chunks[chunk_id] = self.text_at(row)
+            metadatas[chunk_id] = self.metadata_at(row)
+        return chunks, metadatas
+
+
+class ChunkMetadataView:
+    # metadatas[chunk_id]["source_file"] 형태의 기존 조회 방식을 그대로 지원 (page 포함)
+
+    def __init__(self, store: ChunkStore):
+        self.store = store
+
+    def __getitem__(self, chunk_id) -> dict:
+        return self.store.metadata_at(self.store.row_of(chunk_id))
+
+    def __len__(self) -> int:
+        return len(self.store)
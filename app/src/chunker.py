@@ -0,0 +1,183 @@
+import bisect
+import math
+import re
+
+from src.config import (
+    EMBEDDING_MODEL,
+    CHUNKER,
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    CHUNK_MAX_TOKENS,
+    CHUNK_OVERLAP_TOKENS,
+)
+from src.embedding import count_tokens
+
+CHUNKERS = ("sentence", "fixed")
+
+# 문단은 빈 줄, 문장은 종결 부호 뒤 공백, 표 행/목록은 줄바꿈 단위로 구분
+# ("1. 주택이란" 같은 번호 목록은 문장 끝으로 보지 않음)
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT = re.compile(r"(?<=[^\d\s][.?!。])\s+")
+
+
+def page_texts(pages: list):
+    # OCR 페이지 목록 → (페이지 번호, 텍스트), 텍스트가 비어 있으면 단어 목록으로 대체
+    for n, p in enumerate(pages, 1):
+        text = (p.get("text") or "").strip()
+        if not text:
+            text = " ".join(w.get("text", "") for w in p.get("words", [])).strip()
+        if text:
+            yield p.get("page", n), text
+
+
+def iter_sentences(pages: list):
+    # (페이지, 문장, 뒤에 붙일 구분자) — 구분자는 " "(문장), "\n"(줄), "\n\n"(문단)
+    for page, text in page_texts(pages):
+        for paragraph in _PARAGRAPH_SPLIT.split(text):
+            lines = [line.strip() for line in paragraph.split("\n") if line.strip()]
+            for li, line in enumerate(lines):
+                sentences = _SENTENCE_SPLIT.split(line)
+                for si, sentence in enumerate(sentences):
+                    if si < len(sentences) - 1:
+                        sep = " "
+                    elif li < len(lines) - 1:
+                        sep = "\n"
+                    else:
+                        sep = "\n\n"
+                    yield page, sentence, sep
+
+
+def _split_long(text: str, n_tokens: int, max_tokens: int):
+    # 예산보다 긴 한 문장(긴 표 행 등)은 글자 수 기준으로 균등 분할
+    parts = math.ceil(n_tokens / max_tokens)
+    size = math.ceil(len(text) / parts)
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def _make_chunk(units: list):
+    text = "".join(u[1] + u[2] for u in units).strip()
+    return {"text": text, "page": units[0][0], "page_end": units[-1][0]}
+
+
+def _paragraph_cut(units: list, total_tokens: int) -> int:
+    # 버퍼 후반부의 마지막 문단 경계 위치 (없으면 버퍼 전체)
+    cut = len(units)
+    acc = 0
+    for j, u in enumerate(units[:-1]):
+        acc += u[3]
+        if u[2] == "\n\n" and acc * 2 >= total_tokens:
+            cut = j + 1
+    return cut
+
+
+def _overlap_tail(units: list, overlap_tokens: int) -> list:
+    tail = []
+    tail_tokens = 0
+    for u in reversed(units):
+        if tail_tokens + u[3] > overlap_tokens:
+            break
+        tail.insert(0, u)
+        tail_tokens += u[3]
+    return tail
+
+
+def _iter_sized_units(pages: list, max_tokens: int, model: str):
+    for page, sentence, sep in iter_sentences(pages):
+        n = count_tokens(sentence, model)
+        if n <= max_tokens:
+            yield page, sentence, sep, n
+            continue
+        pieces = _split_long(sentence, n, max_tokens)
+        for j, piece in enumerate(pieces):
+            piece_sep = sep if j == len(pieces) - 1 else ""
+            yield page, piece, piece_sep, count_tokens(piece, model)
+
+
+def iter_sentence_chunks(
+    pages: list,
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+    model: str = EMBEDDING_MODEL,
+):
+    # 문장을 자르지 않고 토큰 예산까지 채워 청크를 하나씩 생성
+    # - 버퍼 후반부에 문단 경계가 있으면 그 지점에서 끊고 나머지는 다음 청크로 이월 (중복 없음)
+    # - 문단 중간에서 끊길 때만 직전 청크의 마지막 문장들(overlap_tokens 이내)을 겹쳐 문맥 유지
+    buf = []  # [(페이지, 문장, 구분자, 토큰 수)]
+    buf_tokens = 0
+    overlap_only = False
+
+    for unit in _iter_sized_units(pages, max_tokens, model):
+        while buf and buf_tokens + unit[3] > max_tokens:
+            if overlap_only:
+                # 겹침 문장과 합쳐도 넘치면 겹침 없이 새 청크 시작
+                buf = []
+                buf_tokens = 0
+                break
+            cut = _paragraph_cut(buf, buf_tokens)
+            yield _make_chunk(buf[:cut])
+            if cut < len(buf):
+                buf = buf[cut:]
+            elif buf[-1][2] == "\n\n":
+                # 문단 끝에서 끊긴 경우에는 겹침 없이 시작
+                buf = []
+            else:
+                buf = _overlap_tail(buf, overlap_tokens)
+                overlap_only = True
+            buf_tokens = sum(u[3] for u in buf)
+        buf.append(unit)
+        buf_tokens += unit[3]
+        overlap_only = False
+
+    if buf and not overlap_only:
+        yield _make_chunk(buf)
+
+
+def iter_fixed_chunks(
+    pages: list, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP
+):
+    # 기존 방식: 전체 텍스트를 (chunk_size - overlap) 글자 간격으로 chunk_size 글자씩 자름
+    texts = list(page_texts(pages))
+    starts = []
+    parts = []
+    pos = 0
+    for page, text in texts:
+        starts.append(pos)
+        parts.append(text)
+        pos += len(text) + 2
+    full_text = "\n\n".join(parts)
+    page_numbers = [page for page, _ in texts]
+
+    def page_at(offset: int):
+        return page_numbers[max(bisect.bisect_right(starts, offset) - 1, 0)]
+
+    step = chunk_size - overlap
+    for start in range(0, len(full_text), step):
+        end = min(start + chunk_size, len(full_text))
+        yield {
+            "text": full_text[start:end],
+            "page": page_at(start),
+            "page_end": page_at(end - 1),
+        }
+
+
+def chunker_params(name: str = CHUNKER):
+    # 매니페스트에 기록되는 청킹 파라미터 (바뀌면 전체 재임베딩)
+    if name == "sentence":
+        return {
+            "chunker": name,
+            "chunk_max_tokens": CHUNK_MAX_TOKENS,
+            "chunk_overlap_tokens": CHUNK_OVERLAP_TOKENS,
+        }
+    return {
+        "chunker": "fixed",
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+    }
+
+
+def get_chunker(name: str = CHUNKER):
+    if name == "sentence":
+        return iter_sentence_chunks
+    if name != "fixed":
+        print(f"알 수 없는 CHUNKER={name}, fixed 로 대체합니다.")
+    return iter_fixed_chunks
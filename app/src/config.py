@@ -19,5 +19,116 @@ SESSION_DIR = os.path.join(DATA_DIR, "sessions")
 ENV_PATH = os.path.join(BASE_DIR, ".env")
 APP_DIR = os.path.join(BASE_DIR, "app")
 RAG_DATA_DIR = os.path.join(DATA_DIR, "rag")
+RAG_INDEX_DIR = os.path.join(DATA_DIR, "rag_index")
+OCR_CACHE_DIR = os.path.join(DATA_DIR, "ocr_cache")
+TRACE_DIR = os.path.join(DATA_DIR, "traces")
+QUERY_EMBEDDING_DB_PATH = os.path.join(DATA_DIR, "query_embeddings.db")
+
+# Upstage OCR 모델 및 디스크 캐시 상한 (기본 1GB)
+OCR_MODEL = "ocr"
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_BYTES", str(1024**3)))
+
+# RAG 인덱싱 파라미터 (변경 시 디스크 인덱스가 자동으로 재생성됨)
+EMBEDDING_MODEL = "text-embedding-3-small"
+# 청킹 방식: fixed(기존 글자 수 고정 윈도우, 기본) | sentence(문단/문장 경계 + 토큰 예산)
+# 방식을 바꾸면 청크 ID 가 달라져 전체 문서를 다시 임베딩함
+CHUNKER = os.getenv("CHUNKER", "fixed")
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "400"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "40"))
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 100
+
+# 검색 인덱스 종류 (flat | ivf_flat | hnsw | ivf_pq | sq_fp16 | sq8) 및 질의 시점 파라미터
+RAG_INDEX_TYPE = os.getenv("RAG_INDEX_TYPE", "flat")
+RAG_NPROBE = int(os.getenv("RAG_NPROBE", "16"))
+RAG_EF_SEARCH = int(os.getenv("RAG_EF_SEARCH", "64"))
+# 양자화 인덱스(ivf_pq, sq_fp16, sq8)는 top_k * RAG_RESCORE_FACTOR 개 후보를 가져와
+# 디스크의 원본 float32 벡터로 거리를 다시 계산 (0 이면 인덱스 거리 그대로 사용)
+RAG_RESCORE_FACTOR = int(os.getenv("RAG_RESCORE_FACTOR", "4"))
+# 문서 검색 기본 모드 (vector / lexical / hybrid / auto)
+# auto: 키워드형 질의는 BM25 만으로 처리하고, 나머지는 hybrid
+RAG_SEARCH_MODE = os.getenv("RAG_SEARCH_MODE", "auto")
+RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+# 메타데이터 필터로 좁혀진 청크가 이 수 이하이면 인덱스 대신 원본 벡터로 직접 계산
+RAG_FILTER_SCAN_MAX = int(os.getenv("RAG_FILTER_SCAN_MAX", "4096"))
+# 인덱스 서빙 방식
+# inprocess: 프로세스마다 폴더를 확인하고 필요하면 인덱스 생성/갱신 (기본)
+# shared   : 미리 생성된 아티팩트를 읽기 전용 mmap 으로만 사용 (레플리카 간 페이지 캐시 공유)
+# service  : 로컬 검색 서비스(python -m src.retrieval_service)에 Unix 소켓으로 검색 요청
+RAG_SERVING_MODE = os.getenv("RAG_SERVING_MODE", "inprocess")
+RAG_SERVICE_SOCKET = os.getenv(
+    "RAG_SERVICE_SOCKET", os.path.join(DATA_DIR, "rag_service.sock")
+)
+RAG_SERVICE_TIMEOUT = float(os.getenv("RAG_SERVICE_TIMEOUT", "30"))
+# inprocess 백그라운드 인덱스 로드가 실패하면 이 시간(초)이 지난 뒤 다음 요청에서 다시 시도
+RAG_WARMUP_RETRY_SEC = float(os.getenv("RAG_WARMUP_RETRY_SEC", "60"))
+# 검색 결과 다양화 (off | mmr | dedup, 기본 off): top_k * RAG_DIVERSITY_FETCH 개 후보에서 top_k 선택
+# mmr: 관련도와 중복도를 RAG_MMR_LAMBDA 비율로 절충, dedup: 코사인 유사도 임계값 이상은 제외
+RAG_DIVERSITY = os.getenv("RAG_DIVERSITY", "off")
+RAG_DIVERSITY_FETCH = int(os.getenv("RAG_DIVERSITY_FETCH", "4"))
+RAG_MMR_LAMBDA = float(os.getenv("RAG_MMR_LAMBDA", "0.7"))
+RAG_DEDUP_THRESHOLD = float(os.getenv("RAG_DEDUP_THRESHOLD", "0.95"))
+# 같은 파일의 연속된 청크가 함께 선택되면 하나의 결과로 이어 붙임 (기본 off)
+# 묶여서 결과가 top_k 개보다 적어지면 다음 후보로 top_k 묶음을 채움
+RAG_MERGE_ADJACENT = os.getenv("RAG_MERGE_ADJACENT", "0") == "1"
+
+# 답변을 토큰 단위로 스트리밍해 채팅 화면에 바로 표시
+LLM_STREAMING = os.getenv("LLM_STREAMING", "1") == "1"
+
+# 질의 분류·플래너 방식 (split: 분류/플래너 각각 호출 | combined: JSON 스키마로 한 번에 호출)
+ROUTE_MODE = os.getenv("ROUTE_MODE", "split")
+# 질의 분류와 동시에 플래너·원문 질의 문서 검색을 미리 시작 (간단 질의면 결과를 버림)
+SPECULATIVE_PREFETCH = os.getenv("SPECULATIVE_PREFETCH", "1") == "1"
+
+# LLM 에 보내는 대화 컨텍스트 (모델별 토큰 예산, 원문 유지 턴 수, 요약 길이, 지난 도구 결과 미리보기 길이)
+CONTEXT_TOKEN_BUDGETS = {
+    "gpt-4o": int(os.getenv("CONTEXT_TOKEN_BUDGET_GPT4O", "16000")),
+    "gpt-4o-mini": int(os.getenv("CONTEXT_TOKEN_BUDGET_GPT4O_MINI", "8000")),
+}
+CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "3"))
+CONTEXT_SUMMARY_MAX_CHARS = int(os.getenv("CONTEXT_SUMMARY_MAX_CHARS", "1500"))
+TOOL_PAYLOAD_PREVIEW_CHARS = int(os.getenv("TOOL_PAYLOAD_PREVIEW_CHARS", "300"))
+
+# 도구 결과 요약본 크기 (Judge·다음 턴·세션 파일용, 원본은 TRACE_DIR 에 TRACE_RETENTION_DAYS 일 보관)
+TOOL_RESULT_MAX_CHARS = int(os.getenv("TOOL_RESULT_MAX_CHARS", "3000"))
+COMPACT_LAW_HITS = int(os.getenv("COMPACT_LAW_HITS", "5"))
+COMPACT_DOC_EXCERPT_CHARS = int(os.getenv("COMPACT_DOC_EXCERPT_CHARS", "400"))
+TRACE_RETENTION_DAYS = int(os.getenv("TRACE_RETENTION_DAYS", "14"))
+
+# Judge 정책 (always | grounded | deadline | adaptive | async), 요청당 마감 시간(초)
+# 마감 기준 재시도 판단에 쓰는 Judge 호출·재생성 1회 초기 예상 소요(초)
+JUDGE_POLICY = os.getenv("JUDGE_POLICY", "always")
+JUDGE_DEADLINE_SEC = float(os.getenv("JUDGE_DEADLINE_SEC", "40"))
+JUDGE_CALL_ESTIMATE_SEC = float(os.getenv("JUDGE_CALL_ESTIMATE_SEC", "3"))
+JUDGE_REGEN_ESTIMATE_SEC = float(os.getenv("JUDGE_REGEN_ESTIMATE_SEC", "10"))
+
+# 한 턴의 도구 호출 동시 실행 (동시 실행 수, 도구별 응답 대기 시간(초))
+TOOL_CONCURRENCY = int(os.getenv("TOOL_CONCURRENCY", "4"))
+TOOL_TIMEOUT_SEC = float(os.getenv("TOOL_TIMEOUT_SEC", "20"))
+TOOL_TIMEOUTS = {
+    "get_news": float(os.getenv("TOOL_TIMEOUT_NEWS", "10")),
+    "search_korean_law": float(os.getenv("TOOL_TIMEOUT_LAW", "15")),
+    "check_policy_and_safety": float(os.getenv("TOOL_TIMEOUT_POLICY", "30")),
+}
+
+# 임베딩 배치 요청 설정 (요청당 토큰/입력 수 상한, 동시 요청 수, 재시도 횟수)
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "100000"))
+EMBEDDING_BATCH_MAX_INPUTS = int(os.getenv("EMBEDDING_BATCH_MAX_INPUTS", "512"))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "5"))
+
+# 질의 임베딩 캐시 (메모리 LRU 크기, 만료 시간(초), 디스크 영속화 여부)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+QUERY_EMBEDDING_CACHE_TTL = int(os.getenv("QUERY_EMBEDDING_CACHE_TTL", str(7 * 86400)))
+QUERY_EMBEDDING_CACHE_PERSIST = os.getenv("QUERY_EMBEDDING_CACHE_PERSIST", "1") == "1"
+
+# 인덱싱 파이프라인 설정 (OCR 동시 작업 수, 스테이지 간 큐 크기)
+OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", "4"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "8"))
+# 인덱싱 비용 산정 단가 (USD, 임베딩 100만 토큰당 / OCR 페이지당)
+EMBEDDING_PRICE_PER_1M_TOKENS = float(
+    os.getenv("EMBEDDING_PRICE_PER_1M_TOKENS", "0.02")
+)
+OCR_PRICE_PER_PAGE = float(os.getenv("OCR_PRICE_PER_PAGE", "0.0015"))
 
 DB_PATH = "users.db"
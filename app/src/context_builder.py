@@ -0,0 +1,235 @@
+import json
+
+from openai import AsyncOpenAI
+
+from src.config import (
+    CONTEXT_KEEP_TURNS,
+    CONTEXT_TOKEN_BUDGETS,
+    CONTEXT_SUMMARY_MAX_CHARS,
+    TOOL_PAYLOAD_PREVIEW_CHARS,
+)
+from src.embedding import count_tokens
+from src.prompts import CONTEXT_SUMMARY_PROMPT_TEMPLATE
+
+# LLM 에 보낼 메시지를 모델별 토큰 예산 안에서 구성 (세션 자체는 그대로 보관)
+# [지시문 1개] + [이전 대화 요약] + [최근 CONTEXT_KEEP_TURNS 턴 원문] + [진행 중인 턴]
+# - 지시문은 name="directive" 로 표시된 system 메시지 중 가장 최근 것 하나만 사용
+# - 지난 턴의 플래너/재시도 system 메시지와 재생성 전 초안은 제외, 도구 결과는 앞부분만 남김
+# - 예산을 넘으면 오래된 턴부터 요약으로 넘기고, 그래도 넘으면 진행 중인 턴의 이전 도구 결과를 생략
+# - 요약은 답변이 끝난 뒤 update_session_summary 가 턴당 최대 한 번 만들어 세션에 저장
+#   (build_context 는 LLM 을 호출하지 않고, 아직 요약되지 않은 턴은 발췌 요약으로 대신함)
+
+# 메시지 하나당 역할/구분자 토큰 (OpenAI 권장 추정치)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# 세션 안의 특수 system 메시지 표시 (OpenAI 메시지의 name 필드)
+DIRECTIVE_NAME = "directive"
+SUMMARY_NAME = "context_summary"
+
+
+def _tool_call_text(tool_call) -> str:
+    if isinstance(tool_call, dict):
+        function = tool_call.get("function") or {}
+        return f"{function.get('name', '')}({function.get('arguments', '')})"
+    return f"{tool_call.function.name}({tool_call.function.arguments})"
+
+
+def count_message_tokens(messages: list, model: str = "gpt-4o") -> int:
+    total = 0
+    for msg in messages:
+        text = msg.get("content") or ""
+        if not isinstance(text, str):
+            text = json.dumps(text, ensure_ascii=False)
+        text += "".join(_tool_call_text(tc) for tc in msg.get("tool_calls") or [])
+        total += count_tokens(text, model) + MESSAGE_OVERHEAD_TOKENS
+    return total
+
+
+def split_turns(messages: list):
+    # (턴 이전 메시지, [턴 ...]) - 턴은 user 메시지부터 다음 user 메시지 전까지
+    preamble, turns = [], []
+    for msg in messages:
+        if msg.get("role") == "user":
+            turns.append([msg])
+        elif turns:
+            turns[-1].append(msg)
+        else:
+            preamble.append(msg)
+    return preamble, turns
+
+
+def _elide_tool_payload(msg: dict) -> dict:
+    content = msg.get("content") or ""
+    if len(content) <= TOOL_PAYLOAD_PREVIEW_CHARS:
+        return msg
+    return {
+        **msg,
+        "content": content[:TOOL_PAYLOAD_PREVIEW_CHARS] + " …(이전 도구 결과 생략)",
+    }
+
+
+def _compact_past_turn(turn: list) -> list:
+    # 지난 턴: 지시문·요약·플래너/재시도 system 메시지와 재생성 전 초안은 빼고 최종 답변만 남김
+    # 도구 호출 구조(assistant tool_calls ↔ tool)는 유지한 채 결과 본문만 줄임
+    final = final_answer_index(turn)
+    compact = []
+    for i, msg in enumerate(turn):
+        role = msg.get("role")
+        if role == "system" or (_is_answer(msg) and i != final):
+            continue
+        compact.append(_elide_tool_payload(msg) if role == "tool" else msg)
+    return compact
+
+
+def _is_answer(msg: dict) -> bool:
+    return (
+        msg.get("role") == "assistant"
+        and bool(msg.get("content"))
+        and not msg.get("tool_calls")
+    )
+
+
+def final_answer_index(turn: list) -> int | None:
+    # 턴의 최종 답변 위치 (Judge 재생성이 있으면 마지막 답변)
+    return max((i for i, msg in enumerate(turn) if _is_answer(msg)), default=None)
+
+
+def _turn_transcript(turns: list) -> str:
+    lines = []
+    for turn in turns:
+        for msg in turn:
+            role, content = msg.get("role"), msg.get("content")
+            if role == "user" and content:
+                lines.append(f"사용자: {content}")
+            elif role == "assistant" and content:
+                lines.append(f"상담사: {content}")
+            elif role == "tool" and content:
+                lines.append(
+                    f"[도구 {msg.get('name', '')}] {content[:TOOL_PAYLOAD_PREVIEW_CHARS]}"
+                )
+    return "\n".join(lines)
+
+
+def _fallback_summary(summary: str, turns: list) -> str:
+    # 요약 호출 실패 시: 질문과 답변 첫 줄만 이어 붙여 글자 수 상한 안에서 유지
+    lines = [summary] if summary else []
+    for turn in turns:
+        question = turn[0].get("content") or ""
+        answers = [m.get("content") for m in turn if m.get("role") == "assistant"]
+        answer = next((a for a in reversed(answers) if a), "")
+        lines.append(f"- 질문: {question[:120]} / 답변: {answer.strip()[:120]}")
+    return "\n".join(lines)[-CONTEXT_SUMMARY_MAX_CHARS:]
+
+
+async def _summarize(aclient: AsyncOpenAI, summary: str, turns: list) -> str:
+    prompt = CONTEXT_SUMMARY_PROMPT_TEMPLATE.format(
+        max_chars=CONTEXT_SUMMARY_MAX_CHARS,
+        summary=summary or "(없음)",
+        conversation=_turn_transcript(turns),
+    )
+    try:
+        res = await aclient.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}]
+        )
+        text = (res.choices[0].message.content or "").strip()
+        if not text:
+            raise ValueError("Empty response from LLM")
+        return text
+    except Exception as e:
+        print(f"이전 대화 요약 실패, 발췌 요약으로 대체합니다: {e}")
+        return _fallback_summary(summary, turns)
+
+
+def latest_summary(messages: list):
+    # 세션에 저장된 가장 최근 요약 → (요약, 요약에 포함된 앞쪽 턴 수)
+    for msg in reversed(messages):
+        if _is_summary(msg):
+            return msg.get("content") or "", msg.get("covered_turns", 0)
+    return "", 0
+
+
+async def update_session_summary(aclient: AsyncOpenAI, session: list):
+    # 답변을 보낸 뒤 호출: 최근 CONTEXT_KEEP_TURNS 턴 밖으로 밀려난 턴이 생겼으면
+    # 기존 요약에 그 턴들만 더해 갱신하고 세션 끝에 저장 (턴당 최대 한 번, 이미 최신이면 None)
+    _, turns = split_turns(session)
+    target = len(turns) - CONTEXT_KEEP_TURNS
+    summary, covered = latest_summary(session)
+    if target <= covered:
+        return None
+    new_turns = [_compact_past_turn(turn) for turn in turns[covered:target]]
+    msg = {
+        "role": "system",
+        "name": SUMMARY_NAME,
+        "content": await _summarize(aclient, summary, new_turns),
+        "covered_turns": target,
+    }
+    session.append(msg)
+    return msg
+
+
+def _is_summary(msg: dict) -> bool:
+    return msg.get("role") == "system" and msg.get("name") == SUMMARY_NAME
+
+
+def find_directives(messages: list) -> list:
+    # init_session 이 name="directive" 로 표시해 넣은 지시문
+    return [
+        msg
+        for msg in messages
+        if msg.get("role") == "system" and msg.get("name") == DIRECTIVE_NAME
+    ]
+
+
+def build_context(messages: list, model: str = "gpt-4o") -> list:
+    _, turns = split_turns(messages)
+    if not turns:
+        return messages
+
+    budget = CONTEXT_TOKEN_BUDGETS.get(model)
+    # 지시문은 가장 최근 것 하나만 맨 앞에 둠
+    directives = find_directives(messages)
+    head = directives[-1:]
+    # 저장된 요약 메시지(covered_turns 포함)는 API 로 보내지 않고 아래 요약 블록으로만 반영
+    current = [msg for msg in turns[-1] if not _is_summary(msg)]
+    past = [_compact_past_turn(turn) for turn in turns[:-1]]
+
+    # 요약 자리(최대 글자 수 ≈ 토큰 수)를 남겨 두고 예산 안에 들어가는 만큼 최근 턴을 원문으로 유지
+    keep = min(CONTEXT_KEEP_TURNS, len(past))
+    if budget is not None:
+        fixed = count_message_tokens(head + current, model) + CONTEXT_SUMMARY_MAX_CHARS
+        sizes = [count_message_tokens(turn, model) for turn in past]
+        while keep > 0 and fixed + sum(sizes[len(past) - keep :]) > budget:
+            keep -= 1
+
+    n_dropped = len(past) - keep
+    kept = past[n_dropped:]
+    summary = _context_summary(messages, past, n_dropped) if n_dropped else ""
+    prefix = head + (
+        [{"role": "system", "content": f"[이전 대화 요약]\n{summary}"}]
+        if summary
+        else []
+    )
+    context = prefix + [m for turn in kept for m in turn] + current
+
+    if budget is not None and count_message_tokens(context, model) > budget:
+        context = prefix + _elide_current_turn(current)
+    return context
+
+
+def _context_summary(messages: list, past: list, n_dropped: int) -> str:
+    # 저장된 요약 + 아직 요약되지 않은 밀려난 턴의 발췌 (LLM 호출 없음)
+    summary, covered = latest_summary(messages)
+    if covered < n_dropped:
+        summary = _fallback_summary(summary, past[covered:n_dropped])
+    return summary
+
+
+def _elide_current_turn(current: list) -> list:
+    # 진행 중인 턴도 예산을 넘으면 마지막 도구 호출 묶음을 제외한 이전 도구 결과를 생략
+    last_call = max(
+        (i for i, m in enumerate(current) if m.get("tool_calls")), default=len(current)
+    )
+    return [
+        _elide_tool_payload(m) if m.get("role") == "tool" and i < last_call else m
+        for i, m in enumerate(current)
+    ]
@@ -0,0 +1,105 @@
+import numpy as np
+
+# 인접 청크를 이어 붙일 때 겹침(오버랩)으로 판단할 최대 글자 수
+MAX_OVERLAP_CHARS = 600
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def cosine_relevance(query: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    # 질의와 후보들의 코사인 유사도 (검색 모드별 점수 척도와 무관하게 비교 가능)
+    q = np.asarray(query, dtype="float32").reshape(-1)
+    return _normalize(np.asarray(vectors, dtype="float32")) @ (
+        q / max(float(np.linalg.norm(q)), 1e-12)
+    )
+
+
+def mmr_select(relevance: np.ndarray, vectors: np.ndarray, k: int, lam: float = 0.7):
+    # Maximal Marginal Relevance: lam * 관련도 - (1 - lam) * 이미 고른 청크와의 최대 유사도
+    # 후보 간 코사인 유사도 행렬을 한 번에 계산하고, 선택 단계는 행렬 행 연산으로 갱신
+    n = len(relevance)
+    if n <= 1 or k <= 0:
+        return list(range(min(n, k)))
+    unit = _normalize(np.asarray(vectors, dtype="float32"))
+    sim = unit @ unit.T
+
+    selected = [int(np.argmax(relevance))]
+    max_sim = sim[selected[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < min(k, n):
+        scores = lam * relevance - (1 - lam) * max_sim
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        max_sim = np.maximum(max_sim, sim[pick])
+    return selected
+
+
+def dedup_select(vectors: np.ndarray, k: int, threshold: float = 0.95):
+    # 순위 순서대로 보며, 이미 고른 청크와 코사인 유사도가 threshold 이상이면 제외
+    n = len(vectors)
+    if n <= 1 or k <= 0:
+        return list(range(min(n, k)))
+    unit = _normalize(np.asarray(vectors, dtype="float32"))
+    sim = unit @ unit.T
+    # 자기보다 앞선 후보와의 유사도만 보도록 하삼각 부분만 사용
+    duplicate_of = np.tril(sim >= threshold, k=-1)
+
+    selected = []
+    kept = np.zeros(n, dtype=bool)
+    for j in range(n):
+        if duplicate_of[j][kept].any():
+            continue
+        selected.append(j)
+        kept[j] = True
+        if len(selected) >= k:
+            break
+    return selected
+
+
+def join_overlapping(first: str, second: str) -> str:
+    # 앞 청크의 끝과 뒤 청크의 시작이 겹치면 한 번만 남기고 이어 붙임
+    limit = min(len(first), len(second), MAX_OVERLAP_CHARS)
+    for size in range(limit, 0, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return first + "\n" + second
+
+
+def merge_adjacent(hits: list, metadatas):
+    # 같은 파일의 연속된 청크 ID(파일 단위로 연속 부여됨)를 하나의 결과로 묶음
+    # hits: [(청크 ID, 점수)] 순위 순서 → [([청크 ID...], 점수)]
+    # 묶음의 순위와 점수는 묶음 내에서 가장 앞선 청크를 따름
+    rank = {chunk_id: n for n, (chunk_id, _) in enumerate(hits)}
+    scores = dict(hits)
+    keyed = sorted((metadatas[i]["source_file"], i) for i in rank)
+
+    runs = []
+    for source, chunk_id in keyed:
+        if runs and runs[-1][0] == source and runs[-1][1][-1] == chunk_id - 1:
+            runs[-1][1].append(chunk_id)
+        else:
+            runs.append((source, [chunk_id]))
+
+    groups = []
+    for _, ids in runs:
+        best = min(ids, key=rank.get)
+        groups.append((rank[best], ids, scores[best]))
+    groups.sort(key=lambda g: g[0])
+    return [(ids, score) for _, ids, score in groups]
+
+
+def merge_adjacent_top_k(ranked: list, k: int, metadatas):
+    # 상위 k 개를 묶은 결과가 k 묶음보다 적으면 순위 순서대로 후보를 하나씩 더해 채움
+    # (후보가 부족하면 k 개보다 적을 수 있음)
+    n = min(k, len(ranked))
+    groups = merge_adjacent(ranked[:n], metadatas)
+    while len(groups) < k and n < len(ranked):
+        n += 1
+        groups = merge_adjacent(ranked[:n], metadatas)
+    return groups
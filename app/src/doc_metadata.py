@@ -0,0 +1,60 @@
+import os
+import re
+
+# 파일명에서 공표일 추출 (예: "2025-06-27", "2025.6.27", "20250627", "(25.6.27)", "2025년 6월")
+_DATE_PATTERNS = (
+    re.compile(
+        r"(?<!\d)(20\d{2})\s*[.\-_/년]\s*(\d{1,2})\s*[.\-_/월]\s*(\d{1,2})(?!\d)"
+    ),
+    re.compile(r"(?<!\d)(20\d{2})(\d{2})(\d{2})(?!\d)"),
+    re.compile(r"(?<!\d)(\d{2})\.(\d{1,2})\.(\d{1,2})(?!\d)"),
+    re.compile(r"(?<!\d)(20\d{2})\s*[.\-_/년]\s*(\d{1,2})(?!\d)"),
+    re.compile(r"(?<!\d)(20\d{2})(?!\d)"),
+)
+_DATE_BOUND = re.compile(r"(\d{4})(?:\D*(\d{1,2}))?(?:\D*(\d{1,2}))?")
+
+# 하위 폴더가 없는 파일의 분류
+UNCATEGORIZED = ""
+
+
+def document_category(rel_path: str) -> str:
+    # 데이터 폴더 바로 아래 하위 폴더명을 문서 분류로 사용 (예: "대출규제/2025-06-27 가계부채.pdf")
+    parts = os.path.normpath(rel_path).split(os.sep)
+    return parts[0] if len(parts) > 1 else UNCATEGORIZED
+
+
+def document_date(rel_path: str) -> int:
+    # YYYYMMDD 정수 (알 수 없으면 0, 월/일이 없으면 1로 채움)
+    name = os.path.basename(rel_path)
+    for pattern in _DATE_PATTERNS:
+        for match in pattern.finditer(name):
+            groups = [int(g) for g in match.groups()] + [1, 1]
+            year, month, day = groups[0], groups[1], groups[2]
+            if year < 100:
+                year += 2000
+            if 1 <= month <= 12 and 1 <= day <= 31:
+                return year * 10000 + month * 100 + day
+    return 0
+
+
+def document_metadata(rel_path: str) -> dict:
+    return {"category": document_category(rel_path), "date": document_date(rel_path)}
+
+
+def parse_date_bound(value, end: bool = False) -> int:
+    # "2025", "2025-06", "2025-06-27" → YYYYMMDD (end=True 이면 해당 기간의 마지막 날로 맞춤)
+    if not value:
+        return 0
+    match = _DATE_BOUND.search(str(value))
+    if not match:
+        return 0
+    year = int(match.group(1))
+    month = int(match.group(2) or (12 if end else 1))
+    day = int(match.group(3) or (31 if end else 1))
+    return year * 10000 + month * 100 + day
+
+
+def format_date(value: int) -> str | None:
+    if not value:
+        return None
+    return f"{value // 10000:04d}-{value // 100 % 100:02d}-{value % 100:02d}"
@@ -0,0 +1,135 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import openai
+import tiktoken
+from openai import OpenAI
+
+from src.config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_BATCH_MAX_TOKENS,
+    EMBEDDING_BATCH_MAX_INPUTS,
+    EMBEDDING_CONCURRENCY,
+    EMBEDDING_MAX_RETRIES,
+)
+
+# 임베딩 모델의 입력 1건당 최대 토큰 수
+MAX_INPUT_TOKENS = 8191
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str = EMBEDDING_MODEL):
+    # 토크나이저 파일을 받을 수 없는 환경에서는 None (UTF-8 바이트 수로 상한 추정)
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"tiktoken 인코딩 로드 실패, UTF-8 바이트 수로 토큰을 추정합니다: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str = EMBEDDING_MODEL) -> int:
+    encoding = get_encoding(model)
+    if encoding is None:
+        # BPE 토큰은 1바이트 이상이므로 UTF-8 바이트 수가 항상 상한 (한국어는 글자 수보다 토큰이 많음)
+        return len(text.encode("utf-8"))
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _prepare_input(text: str, model: str):
+    # 빈 문자열은 API 에서 거부되므로 공백으로 대체, 너무 긴 입력은 잘라냄
+    text = text or " "
+    encoding = get_encoding(model)
+    if encoding is None:
+        data = text.encode("utf-8")[:MAX_INPUT_TOKENS]
+        text = data.decode("utf-8", errors="ignore")
+        return text, len(text.encode("utf-8"))
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) > MAX_INPUT_TOKENS:
+        tokens = tokens[:MAX_INPUT_TOKENS]
+        return encoding.decode(tokens), len(tokens)
+    return text, len(tokens)
+
+
+def make_batches(
+    token_counts: list,
+    max_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+    max_inputs: int = EMBEDDING_BATCH_MAX_INPUTS,
+):
+    # 요청당 토큰/입력 수 상한을 넘지 않도록 입력 인덱스를 순서대로 묶음
+    batches = []
+    current = []
+    current_tokens = 0
+    for i, n in enumerate(token_counts):
+        if current and (current_tokens + n > max_tokens or len(current) >= max_inputs):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(i)
+        current_tokens += n
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _embed_batch(inputs: list, client: OpenAI, model: str, max_retries: int):
+    attempt = 0
+    while True:
+        try:
+            res = client.embeddings.create(model=model, input=inputs)
+            # 응답 순서는 index 필드 기준으로 정렬해 입력 순서와 맞춤
+            data = sorted(res.data, key=lambda d: d.index)
+            return np.array([d.embedding for d in data], dtype="float32")
+        except RETRYABLE_ERRORS as e:
+            attempt += 1
+            if attempt > max_retries:
+                raise
+            delay = min(2**attempt, 30) + random.uniform(0, 1)
+            print(f"임베딩 요청 재시도 {attempt}/{max_retries} ({delay:.1f}초 후): {e}")
+            time.sleep(delay)
+
+
+def embed_texts(
+    texts: list,
+    client: OpenAI,
+    model: str = EMBEDDING_MODEL,
+    max_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+    max_inputs: int = EMBEDDING_BATCH_MAX_INPUTS,
+    concurrency: int = EMBEDDING_CONCURRENCY,
+    max_retries: int = EMBEDDING_MAX_RETRIES,
+):
+    # 여러 청크를 input 리스트로 묶어 요청하고, 배치들은 동시에 전송
+    if not texts:
+        return np.zeros((0, 0), dtype="float32")
+
+    prepared = [_prepare_input(t, model) for t in texts]
+    inputs = [p[0] for p in prepared]
+    batches = make_batches([p[1] for p in prepared], max_tokens, max_inputs)
+
+    def run(batch):
+        return _embed_batch([inputs[i] for i in batch], client, model, max_retries)
+
+    if len(batches) == 1 or concurrency <= 1:
+        results = [run(b) for b in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as ex:
+            results = list(ex.map(run, batches))
+
+    embeddings = np.concatenate(results, axis=0)
+    return np.ascontiguousarray(embeddings, dtype="float32")
+
+
+def embed_text(text: str, client: OpenAI, model: str = EMBEDDING_MODEL):
+    return embed_texts([text], client, model=model)[0]
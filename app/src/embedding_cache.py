@@ -0,0 +1,197 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+from openai import OpenAI
+
+from src.config import (
+    EMBEDDING_MODEL,
+    QUERY_EMBEDDING_DB_PATH,
+    QUERY_EMBEDDING_CACHE_SIZE,
+    QUERY_EMBEDDING_CACHE_TTL,
+    QUERY_EMBEDDING_CACHE_PERSIST,
+)
+from src.embedding import embed_texts
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    # 전각/반각, 대소문자, 공백 차이만 있는 질의는 같은 키로 취급
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+class QueryEmbeddingCache:
+    # 질의 임베딩 캐시: 메모리 LRU + TTL, 선택적으로 SQLite 영속 계층
+
+    def __init__(
+        self,
+        max_entries: int = QUERY_EMBEDDING_CACHE_SIZE,
+        ttl_sec: int = QUERY_EMBEDDING_CACHE_TTL,
+        db_path: str | None = QUERY_EMBEDDING_DB_PATH,
+    ):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.db_path:
+            self._init_db()
+
+    def _get_connection(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _init_db(self):
+        db_dir = os.path.dirname(self.db_path or "")
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+        try:
+            with self._get_connection() as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS query_embedding (
+                        model TEXT,
+                        query TEXT,
+                        vector BLOB,
+                        created_at REAL,
+                        PRIMARY KEY (model, query)
+                    )
+                """
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"질의 임베딩 캐시 DB 초기화 실패, 메모리 캐시만 사용합니다: {e}")
+            self.db_path = None
+
+    def _expired(self, created_at: float) -> bool:
+        return bool(self.ttl_sec) and time.time() - created_at > self.ttl_sec
+
+    def get(self, query: str, model: str = EMBEDDING_MODEL):
+        key = (model, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                vector, created_at = entry
+                if not self._expired(created_at):
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return vector
+                del self._entries[key]
+
+        vector = self._get_from_db(key)
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+        return vector
+
+    def _get_from_db(self, key):
+        if not self.db_path:
+            return None
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute(
+                    "SELECT vector, created_at FROM query_embedding WHERE model = ? AND query = ?",
+                    key,
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"질의 임베딩 캐시 조회 실패: {e}")
+            return None
+        if row is None or self._expired(row[1]):
+            return None
+
+        vector = np.frombuffer(row[0], dtype="float32").copy()
+        self._put_memory(key, vector, row[1])
+        return vector
+
+    def _put_memory(self, key, vector, created_at: float):
+        with self._lock:
+            self._entries[key] = (vector, created_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, query: str, vector, model: str = EMBEDDING_MODEL):
+        key = (model, normalize_query(query))
+        vector = np.asarray(vector, dtype="float32")
+        created_at = time.time()
+        self._put_memory(key, vector, created_at)
+
+        if not self.db_path:
+            return
+        try:
+            with self._get_connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO query_embedding (model, query, vector, created_at) VALUES (?, ?, ?, ?)",
+                    (key[0], key[1], vector.tobytes(), created_at),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"질의 임베딩 캐시 저장 실패: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (
+                    round((self.memory_hits + self.disk_hits) / total, 4)
+                    if total
+                    else 0.0
+                ),
+            }
+
+
+_query_cache = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache():
+    global _query_cache
+    with _query_cache_lock:
+        if _query_cache is None:
+            _query_cache = QueryEmbeddingCache(
+                db_path=(
+                    QUERY_EMBEDDING_DB_PATH if QUERY_EMBEDDING_CACHE_PERSIST else None
+                )
+            )
+    return _query_cache
+
+
+def embed_queries(queries: list, client: OpenAI, model: str = EMBEDDING_MODEL):
+    # 캐시에 없는 질의만 모아 한 번의 임베딩 요청으로 처리 (정규화 기준 중복 제거)
+    # 정규화는 캐시 키에만 쓰고, 임베딩 API 에는 사용자 질의 원문을 보냄
+    cache = get_query_embedding_cache()
+    vectors = [cache.get(q, model) for q in queries]
+    missing = [n for n, v in enumerate(vectors) if v is None]
+    if missing:
+        originals = {}
+        for n in missing:
+            originals.setdefault(normalize_query(queries[n]), queries[n])
+        keys = list(originals)
+        texts = [originals[key] for key in keys]
+        embedded = dict(zip(keys, embed_texts(texts, client, model=model)))
+        for n in missing:
+            vectors[n] = embedded[normalize_query(queries[n])]
+            cache.put(queries[n], vectors[n], model)
+    return (
+        np.vstack(vectors).astype("float32") if vectors else np.zeros((0, 0), "float32")
+    )
+
+
+def embed_query(query: str, client: OpenAI, model: str = EMBEDDING_MODEL):
+    # 같은(정규화 기준) 질의는 임베딩 API 호출 없이 캐시에서 반환
+    return embed_queries([query], client, model=model)[0]
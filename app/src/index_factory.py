@@ -0,0 +1,164 @@
+import math
+
+import faiss
+import numpy as np
+
+from src.config import RAG_INDEX_TYPE, RAG_NPROBE, RAG_EF_SEARCH
+
+# 지원하는 인덱스 종류
+# - flat     : 전수 탐색 (정확, O(N))
+# - ivf_flat : 역색인 클러스터 탐색 (nprobe 로 정확도/속도 조절)
+# - hnsw     : 그래프 탐색 (efSearch 로 정확도/속도 조절, 삭제 시 재생성 필요)
+# - ivf_pq   : 역색인 + Product Quantization (메모리 최소)
+# - sq_fp16  : 전수 탐색 + float16 저장 (메모리 1/2)
+# - sq8      : 전수 탐색 + 차원별 8비트 스칼라 양자화 (메모리 1/4)
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq", "sq_fp16", "sq8")
+
+# IVF 학습 시 클러스터당 최소 학습 벡터 수 (faiss 권장값)
+MIN_POINTS_PER_CENTROID = 39
+HNSW_M = 32
+PQ_SUBQUANTIZERS = 64
+
+
+def _ivf_nlist(n_vectors: int) -> int:
+    # 일반적인 권장치 4*sqrt(N), 학습 데이터가 부족하면 줄임
+    nlist = int(4 * math.sqrt(max(n_vectors, 1)))
+    return max(1, min(nlist, n_vectors // MIN_POINTS_PER_CENTROID))
+
+
+def _pq_params(dim: int, n_vectors: int):
+    m = PQ_SUBQUANTIZERS
+    while dim % m:
+        m -= 1
+    # 코드북(2^nbits)을 학습할 데이터가 부족하면 비트 수를 낮춤
+    nbits = int(math.log2(max(n_vectors // MIN_POINTS_PER_CENTROID, 2)))
+    return m, max(4, min(8, nbits))
+
+
+def factory_string(kind: str, dim: int, n_vectors: int) -> str:
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 인덱스 종류입니다: {kind}")
+
+    nlist = _ivf_nlist(n_vectors)
+    # 학습 데이터가 너무 적으면 클러스터링/양자화 효과가 없으므로 전수 탐색으로 대체
+    if kind in ("ivf_flat", "ivf_pq") and nlist < 2:
+        kind = "flat"
+    if kind == "ivf_pq" and n_vectors < MIN_POINTS_PER_CENTROID * 2**4:
+        kind = "flat"
+
+    if kind == "flat":
+        return "IDMap2,Flat"
+    if kind == "ivf_flat":
+        return f"IVF{nlist},Flat"
+    if kind == "hnsw":
+        return f"IDMap2,HNSW{HNSW_M}"
+    if kind == "sq_fp16":
+        return "IDMap2,SQfp16"
+    if kind == "sq8":
+        return "IDMap2,SQ8"
+    m, nbits = _pq_params(dim, n_vectors)
+    return f"IVF{nlist},PQ{m}x{nbits}"
+
+
+def build_index(kind: str, vectors: np.ndarray, ids: np.ndarray):
+    # 보관 중인 원본 float32 벡터로 학습 후 고정 ID 와 함께 추가
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    ids = np.ascontiguousarray(ids, dtype="int64")
+    dim = vectors.shape[1]
+    index = faiss.index_factory(dim, factory_string(kind, dim, len(vectors)))
+    if not index.is_trained:
+        index.train(vectors)  # type: ignore
+    if len(vectors):
+        index.add_with_ids(vectors, ids)  # type: ignore
+    apply_search_params(index)
+    return index
+
+
+def supports_remove(kind: str) -> bool:
+    return kind != "hnsw"
+
+
+def apply_search_params(index, nprobe: int | None = None, ef_search: int | None = None):
+    # 질의 시점 파라미터 (해당 인덱스 종류에만 적용되고 나머지는 무시)
+    nprobe = RAG_NPROBE if nprobe is None else nprobe
+    ef_search = RAG_EF_SEARCH if ef_search is None else ef_search
+    ps = faiss.ParameterSpace()
+    for name, value in (("nprobe", nprobe), ("efSearch", ef_search)):
+        if not value:
+            continue
+        try:
+            ps.set_index_parameter(index, name, value)
+        except RuntimeError:
+            pass
+    return index
+
+
+def search_with_ids(index, queries: np.ndarray, k: int, ids: np.ndarray):
+    # 지정한 ID 만 후보로 두고 검색 (필터를 거리 계산 전에 적용)
+    sel = faiss.IDSelectorBatch(np.ascontiguousarray(ids, dtype="int64"))
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        ivf = None
+    if ivf is None:
+        params = faiss.SearchParameters(sel=sel)
+    else:
+        # 허용된 비율만큼 클러스터당 후보가 줄어드므로 탐색 클러스터 수를 늘려 보정
+        fraction = max(len(ids) / max(index.ntotal, 1), 1e-3)
+        nprobe = min(ivf.nlist, int(math.ceil(ivf.nprobe / fraction)))
+        params = faiss.SearchParametersIVF(sel=sel, nprobe=nprobe)
+    return index.search(queries, k, params=params)
+
+
+def reconstruct_vectors(index, ids: np.ndarray):
+    # ID 로 저장된 벡터 복원 (IVF 는 ID→위치 맵을 처음 한 번 생성, PQ 는 근사 벡터)
+    ids = np.ascontiguousarray(ids, dtype="int64")
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        ivf = None
+    if ivf is not None and ivf.direct_map.type != faiss.DirectMap.Hashtable:
+        ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+    return index.reconstruct_batch(ids)
+
+
+def stores_exact_vectors(index) -> bool:
+    # 인덱스가 원본 float32 벡터를 그대로 보관하는지 (양자화 인덱스는 거리가 근사값)
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        ivf = None
+    if ivf is not None:
+        return isinstance(faiss.downcast_index(ivf), faiss.IndexIVFFlat)
+    inner = index
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        inner = faiss.downcast_index(index.index)
+    return isinstance(inner, (faiss.IndexFlat, faiss.IndexHNSWFlat))
+
+
+def rescore_exact(
+    queries: np.ndarray, candidate_ids: np.ndarray, vectors, vector_ids, k: int
+):
+    # 양자화 인덱스가 고른 후보를 원본 float32 벡터(디스크 mmap)로 다시 계산해 상위 k 선택
+    # vector_ids 는 오름차순, 반환 형식은 index.search 와 같음 (빈 자리는 거리 inf, ID -1)
+    dist = np.full((len(queries), k), np.inf, dtype="float32")
+    ids = np.full((len(queries), k), -1, dtype="int64")
+    for row, (q, found) in enumerate(zip(queries, candidate_ids)):
+        found = found[found >= 0]
+        if not len(found):
+            continue
+        candidates = np.asarray(
+            vectors[np.searchsorted(vector_ids, found)], dtype="float32"
+        )
+        exact = ((candidates - q) ** 2).sum(axis=1)
+        order = np.argsort(exact)[:k]
+        dist[row, : len(order)] = exact[order]
+        ids[row, : len(order)] = found[order]
+    return dist, ids
+
+
+def configured_index_type() -> str:
+    if RAG_INDEX_TYPE not in INDEX_TYPES:
+        print(f"알 수 없는 RAG_INDEX_TYPE={RAG_INDEX_TYPE}, flat 으로 대체합니다.")
+        return "flat"
+    return RAG_INDEX_TYPE
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+
+import faiss
+import numpy as np
+
+from src.chunk_store import ChunkStore
+from src.index_factory import apply_search_params
+from src.lexical_index import LexicalIndex
+
+# 아티팩트 포맷이 바뀌면 올려서 기존 디스크 인덱스를 무효화
+ARTIFACT_VERSION = 7
+
+INDEX_FILE = "index.faiss"
+MANIFEST_FILE = "manifest.json"
+# 인덱스 재학습/재생성용 원본 float32 벡터 (청크 ID 오름차순)
+VECTORS_FILE = "vectors.npy"
+VECTOR_IDS_FILE = "vector_ids.npy"
+CURRENT_POINTER = "CURRENT"
+
+# 디스크에 남겨둘 이전 버전 수 (롤백용)
+KEEP_VERSIONS = 2
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+def scan_files(folder_path: str, pdf_files: list, previous: dict | None = None):
+    # size/mtime 이 이전 매니페스트와 같으면 저장된 해시를 재사용 (재해시 생략)
+    previous = previous or {}
+    files = {}
+    for path in pdf_files:
+        rel = os.path.relpath(path, folder_path)
+        stat = os.stat(path)
+        prev = previous.get(rel)
+        if (
+            prev
+            and prev.get("size") == stat.st_size
+            and prev.get("mtime") == stat.st_mtime
+        ):
+            sha = prev["sha256"]
+        else:
+            sha = file_sha256(path)
+        files[rel] = {"sha256": sha, "size": stat.st_size, "mtime": stat.st_mtime}
+    return files
+
+
+def build_manifest(
+    files: dict,
+    params: dict,
+    num_chunks: int,
+    dim: int | None,
+    next_id: int = 0,
+    index_type: str = "flat",
+    last_ingest: dict | None = None,
+):
+    # files[rel] 에는 해시 정보와 함께 해당 파일의 청크 ID 목록(chunk_ids)이 기록됨
+    # index_type 은 params 와 달리 바뀌어도 재임베딩 없이 저장된 벡터로 인덱스만 재생성
+    # last_ingest: 이 버전을 만든 인덱싱 실행의 처리량·비용 산정 수치 (통계 조회용)
+    return {
+        "version": ARTIFACT_VERSION,
+        "params": params,
+        "index_type": index_type,
+        "files": files,
+        "num_chunks": num_chunks,
+        "dim": dim,
+        "next_id": next_id,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "last_ingest": last_ingest or {},
+    }
+
+
+def manifest_compatible(manifest: dict | None, params: dict) -> bool:
+    # 포맷/파라미터가 같으면 파일 단위 증분 갱신이 가능
+    if not manifest:
+        return False
+    return (
+        manifest.get("version") == ARTIFACT_VERSION and manifest.get("params") == params
+    )
+
+
+def diff_files(stored: dict, files: dict):
+    added = [rel for rel in files if rel not in stored]
+    changed = [
+        rel
+        for rel in files
+        if rel in stored and stored[rel]["sha256"] != files[rel]["sha256"]
+    ]
+    deleted = [rel for rel in stored if rel not in files]
+    return added, changed, deleted
+
+
+def manifest_matches(manifest: dict | None, files: dict, params: dict) -> bool:
+    if not manifest_compatible(manifest, params):
+        return False
+    assert manifest is not None
+
+    added, changed, deleted = diff_files(manifest.get("files", {}), files)
+    return not (added or changed or deleted)
+
+
+def current_version_dir(artifact_dir: str) -> str | None:
+    pointer = os.path.join(artifact_dir, CURRENT_POINTER)
+    try:
+        with open(pointer, "r", encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    version_dir = os.path.join(artifact_dir, name)
+    if not name or not os.path.isdir(version_dir):
+        return None
+    return version_dir
+
+
+def load_manifest(artifact_dir: str) -> dict | None:
+    version_dir = current_version_dir(artifact_dir)
+    if version_dir is None:
+        return None
+    try:
+        with open(os.path.join(version_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"매니페스트 로드 실패 ({version_dir}): {e}")
+        return None
+
+
+def read_index(path: str, mmap: bool = False):
+    # 읽기 전용 메모리 매핑으로 로드하면 여러 프로세스가 같은 페이지를 공유함
+    if mmap:
+        for flag_name in ("IO_FLAG_MMAP_IFC", "IO_FLAG_MMAP"):
+            flag = getattr(faiss, flag_name, None)
+            if flag is None:
+                continue
+            try:
+                return faiss.read_index(path, flag | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                continue
+    return faiss.read_index(path)
+
+
+def load_index_artifact(artifact_dir: str, mmap: bool = True):
+    # mmap=True: 서빙용 (읽기 전용), mmap=False: 증분 갱신용 (수정 가능)
+    version_dir = current_version_dir(artifact_dir)
+    if version_dir is None:
+        return None
+
+    store = ChunkStore.load(version_dir, mmap=mmap)
+    index = read_index(os.path.join(version_dir, INDEX_FILE), mmap=mmap)
+    if mmap:
+        # 필터로 좁혀진 소수의 청크는 원본 벡터만 읽어 직접 계산 (청크 저장소와 같은 ID 순서)
+        store.vectors = np.load(os.path.join(version_dir, VECTORS_FILE), mmap_mode="r")
+    lexical_index = LexicalIndex.load(version_dir, mmap=mmap)
+
+    return index, store, store.metadatas, lexical_index
+
+
+def load_shared_index(artifact_dir: str):
+    # 미리 생성된 아티팩트를 읽기 전용 mmap 으로만 로드 (폴더 스캔/생성/갱신 없음)
+    # 같은 파일을 여는 모든 프로세스가 OS 페이지 캐시를 공유하므로 레플리카별 상주 메모리가 작음
+    loaded = load_index_artifact(artifact_dir, mmap=True)
+    if loaded is None:
+        print(
+            f"공유할 인덱스 아티팩트가 없습니다. 먼저 인덱스를 생성하세요: {artifact_dir}"
+        )
+        return None, [], [], None
+    apply_search_params(loaded[0])
+    return loaded
+
+
+def load_vector_store(artifact_dir: str):
+    version_dir = current_version_dir(artifact_dir)
+    if version_dir is None:
+        return None
+    ids = np.load(os.path.join(version_dir, VECTOR_IDS_FILE))
+    vectors = np.load(os.path.join(version_dir, VECTORS_FILE), mmap_mode="r")
+    return ids, vectors
+
+
+def save_index_artifact(
+    artifact_dir: str,
+    index,
+    chunks: dict,
+    metadatas: dict,
+    manifest: dict,
+    vector_ids: np.ndarray,
+    vectors: np.ndarray,
+) -> str:
+    # 새 버전 폴더에 모두 기록한 뒤 CURRENT 포인터만 원자적으로 교체
+    os.makedirs(artifact_dir, exist_ok=True)
+    name = (
+        f"v{ARTIFACT_VERSION}-{time.strftime('%Y%m%d_%H%M%S')}"
+        f"-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    )
+    version_dir = os.path.join(artifact_dir, name)
+    os.makedirs(version_dir, exist_ok=True)
+
+    faiss.write_index(index, os.path.join(version_dir, INDEX_FILE))
+    np.save(os.path.join(version_dir, VECTOR_IDS_FILE), vector_ids)
+    np.save(os.path.join(version_dir, VECTORS_FILE), vectors)
+    ChunkStore.save(version_dir, chunks, metadatas)
+    # 키워드 검색용 BM25 역색인도 같은 청크 집합으로 함께 생성
+    LexicalIndex.build(chunks).save(version_dir)
+    with open(os.path.join(version_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    pointer_tmp = os.path.join(artifact_dir, f"{CURRENT_POINTER}.tmp-{os.getpid()}")
+    with open(pointer_tmp, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(pointer_tmp, os.path.join(artifact_dir, CURRENT_POINTER))
+
+    _prune_old_versions(artifact_dir, keep=name)
+    return version_dir
+
+
+def _prune_old_versions(artifact_dir: str, keep: str):
+    versions = sorted(
+        d
+        for d in os.listdir(artifact_dir)
+        if d.startswith("v") and os.path.isdir(os.path.join(artifact_dir, d))
+    )
+    stale = [d for d in versions if d != keep][: -(KEEP_VERSIONS - 1) or None]
+    for d in stale:
+        shutil.rmtree(os.path.join(artifact_dir, d), ignore_errors=True)
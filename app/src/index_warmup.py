@@ -0,0 +1,100 @@
+import threading
+import time
+
+# 로드 전/실패 시 반환하는 빈 RAG 리소스 (index, chunks, metadatas, lexical_index)
+EMPTY_RESOURCES = (None, None, None, None)
+
+
+class IndexWarmup:
+    # RAG 인덱스를 백그라운드 스레드에서 로드/생성하고 진행 상황을 공유
+    # 완료 전까지 resources() 는 EMPTY_RESOURCES 를 돌려주고,
+    # 완료 시 네 리소스를 한 번에 교체하므로 요청마다 일관된 묶음만 보임
+
+    def __init__(self, load_fn):
+        # load_fn(progress_callback) -> (index, chunks, metadatas, lexical_index)
+        self._load_fn = load_fn
+        self._lock = threading.Lock()
+        self._thread = None
+        self._resources = EMPTY_RESOURCES
+        self.status = "pending"  # pending | loading | ready | failed
+        self.progress = {}
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self.status = "loading"
+            self.started_at = time.time()
+            self._thread = threading.Thread(
+                target=self._run, name="rag-index-warmup", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def retry_if_failed(self, min_interval: float = 0.0):
+        # 실패한 워밍업은 min_interval 초가 지난 뒤 다음 요청에서 다시 시작
+        # (프로세스 캐시에 실패 상태가 남아 재시작 전까지 문서 검색이 꺼지는 것을 방지)
+        with self._lock:
+            if self.status != "failed":
+                return self
+            if time.time() - (self.finished_at or 0) < min_interval:
+                return self
+            print(f"RAG 인덱스 로드 재시도 (이전 오류: {self.error})")
+            self._thread = None
+            self.progress = {}
+            self.error = None
+            self.finished_at = None
+        return self.start()
+
+    def _run(self):
+        try:
+            resources = self._load_fn(self._on_progress)
+        except Exception as e:
+            print(f"RAG 인덱스 로드 실패: {e}")
+            with self._lock:
+                self.error = str(e)
+                self.status = "failed"
+                self.finished_at = time.time()
+            return
+        with self._lock:
+            if resources[0] is None:
+                self.status = "failed"
+                self.error = "인덱싱할 문서가 없습니다."
+            else:
+                self._resources = tuple(resources)
+                self.status = "ready"
+            self.finished_at = time.time()
+
+    def _on_progress(self, progress: dict):
+        with self._lock:
+            self.progress = {**self.progress, **progress}
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("ready", "failed")
+
+    def resources(self):
+        with self._lock:
+            return self._resources
+
+    def wait(self, timeout: float | None = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.resources()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            end = self.finished_at or time.time()
+            chunks = self._resources[1]
+            return {
+                "status": self.status,
+                "progress": dict(self.progress),
+                "error": self.error,
+                "elapsed_sec": (
+                    round(end - self.started_at, 1) if self.started_at else 0.0
+                ),
+                "num_chunks": len(chunks) if chunks is not None else 0,
+            }
@@ -0,0 +1,188 @@
+import argparse
+import os
+import time
+
+import numpy as np
+from openai import OpenAI
+
+from src.config import (
+    OPENAI_API_KEY,
+    RAG_DATA_DIR,
+    RAG_INDEX_DIR,
+    EMBEDDING_PRICE_PER_1M_TOKENS,
+    OCR_PRICE_PER_PAGE,
+)
+from src.index_store import (
+    ARTIFACT_VERSION,
+    current_version_dir,
+    load_index_artifact,
+    load_manifest,
+    load_vector_store,
+)
+from src.rag_pipeline import artifact_is_current, scan_folder, sync_index_artifact
+
+# Streamlit 없이 인덱스 아티팩트를 만드는 오프라인 인덱싱 CLI (빌드 단계·크론용)
+#   cd app && python -m src.ingest build   # 기존 아티팩트 무시하고 전체 생성
+#   cd app && python -m src.ingest update  # 변경된 파일만 반영 (변경 없으면 그대로 종료)
+#   cd app && python -m src.ingest verify  # 아티팩트 정합성·폴더 최신 여부 확인 (문제 시 종료 코드 1)
+#   cd app && python -m src.ingest stats   # 현재 버전 요약과 마지막 인덱싱 처리량·비용
+
+
+def ingest_cost(last_ingest: dict) -> dict:
+    embedding_usd = (
+        last_ingest.get("embedding_tokens", 0) / 1e6 * EMBEDDING_PRICE_PER_1M_TOKENS
+    )
+    ocr_usd = last_ingest.get("ocr_pages", 0) * OCR_PRICE_PER_PAGE
+    return {
+        "embedding_usd": round(embedding_usd, 4),
+        "ocr_usd": round(ocr_usd, 4),
+        "total_usd": round(embedding_usd + ocr_usd, 4),
+    }
+
+
+def format_ingest_summary(last_ingest: dict) -> str:
+    if not last_ingest:
+        return "인덱싱 기록이 없습니다."
+    cost = ingest_cost(last_ingest)
+    wall = last_ingest.get("wall_sec") or 0.0
+    chunks = last_ingest.get("chunks_embedded", 0)
+    lines = [
+        f"파일: 추가 {last_ingest.get('files_added', 0)}개, "
+        f"변경 {last_ingest.get('files_changed', 0)}개, "
+        f"삭제 {last_ingest.get('files_deleted', 0)}개, "
+        f"실패 {last_ingest.get('files_failed', 0)}개",
+        f"임베딩: 청크 {chunks}개, 토큰 {last_ingest.get('embedding_tokens', 0):,}개"
+        + (f" ({chunks / wall:.1f} 청크/s)" if wall else ""),
+        f"OCR: 새로 처리한 페이지 {last_ingest.get('ocr_pages', 0)}개 (캐시 적중 제외)",
+        f"소요: {wall:.1f}초",
+        f"비용(추정): 임베딩 ${cost['embedding_usd']:.4f} + OCR ${cost['ocr_usd']:.4f}"
+        f" = ${cost['total_usd']:.4f}",
+    ]
+    return "\n".join(lines)
+
+
+def run_sync(folder: str, artifact_dir: str, rebuild: bool) -> int:
+    manifest = None if rebuild else load_manifest(artifact_dir)
+    files = scan_folder(folder, manifest)
+    if not files:
+        print(f"PDF 파일이 없습니다: {folder}")
+        return 1
+    if not rebuild and artifact_is_current(manifest, files):
+        print(f"변경 없음: {current_version_dir(artifact_dir)}")
+        return 0
+
+    client = OpenAI(api_key=OPENAI_API_KEY)
+    index, _, _, manifest, saved = sync_index_artifact(
+        folder, client, artifact_dir, rebuild=rebuild, files=files
+    )
+    if index is None:
+        print("인덱싱할 청크가 없어 아티팩트를 만들지 않았습니다.")
+        return 1
+    if not saved:
+        return 1
+    print(f"아티팩트 저장: {current_version_dir(artifact_dir)}")
+    print(format_ingest_summary(manifest.get("last_ingest", {})))
+    return 1 if manifest["last_ingest"].get("files_failed") else 0
+
+
+def verify_artifact(folder: str, artifact_dir: str, n_probe: int = 20) -> list:
+    # 문제 목록 반환 (비어 있으면 정상)
+    manifest = load_manifest(artifact_dir)
+    if manifest is None:
+        return [f"현재 버전 아티팩트가 없습니다: {artifact_dir}"]
+    problems = []
+    if manifest.get("version") != ARTIFACT_VERSION:
+        problems.append(
+            f"아티팩트 포맷 버전 불일치: {manifest.get('version')} != {ARTIFACT_VERSION}"
+        )
+
+    try:
+        index, store, _, lexical_index = load_index_artifact(artifact_dir, mmap=True)
+        vector_ids, vectors = load_vector_store(artifact_dir)
+    except Exception as e:
+        return problems + [f"아티팩트 로드 실패: {e}"]
+
+    n = len(store)
+    counts = {
+        "manifest": manifest.get("num_chunks"),
+        "index": index.ntotal,
+        "vectors": len(vector_ids),
+        "lexical": len(lexical_index),
+    }
+    if any(count != n for count in counts.values()):
+        problems.append(f"청크 수 불일치: chunk_store={n}, {counts}")
+    if not np.array_equal(vector_ids, store.ids):
+        problems.append("원본 벡터 ID 와 청크 ID 가 다릅니다.")
+    if vectors.shape[1:] != (manifest.get("dim"),):
+        problems.append(
+            f"벡터 차원 불일치: {vectors.shape[1:]} != {manifest.get('dim')}"
+        )
+    file_ids = sorted(
+        i for info in manifest["files"].values() for i in info["chunk_ids"]
+    )
+    if not np.array_equal(np.array(file_ids, dtype="int64"), store.ids):
+        problems.append("매니페스트 파일별 청크 ID 와 청크 저장소가 다릅니다.")
+
+    if not problems and n:
+        # 저장된 벡터로 자기 자신을 찾는 비율 (근사 인덱스는 1 보다 약간 낮을 수 있음)
+        rows = np.linspace(0, n - 1, min(n_probe, n)).astype(int)
+        _, found = index.search(np.ascontiguousarray(vectors[rows], dtype="float32"), 1)
+        self_hit = float(np.mean(found[:, 0] == vector_ids[rows]))
+        print(f"자기 검색 적중률: {self_hit:.2%} ({len(rows)}건)")
+
+    if os.path.isdir(folder) and not artifact_is_current(
+        manifest, scan_folder(folder, manifest)
+    ):
+        problems.append(f"폴더 내용이 아티팩트와 다릅니다 (update 필요): {folder}")
+    return problems
+
+
+def _dir_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(path, name))
+        for name in os.listdir(path)
+        if os.path.isfile(os.path.join(path, name))
+    )
+
+
+def print_stats(artifact_dir: str) -> int:
+    manifest = load_manifest(artifact_dir)
+    if manifest is None:
+        print(f"현재 버전 아티팩트가 없습니다: {artifact_dir}")
+        return 1
+    version_dir = current_version_dir(artifact_dir)
+    print(f"버전: {os.path.basename(version_dir)} (생성 {manifest.get('created_at')})")
+    print(f"인덱스 종류: {manifest.get('index_type')}, 차원 {manifest.get('dim')}")
+    print(f"파라미터: {manifest.get('params')}")
+    print(
+        f"파일 {len(manifest.get('files', {}))}개, 청크 {manifest.get('num_chunks')}개, "
+        f"디스크 {_dir_size(version_dir) / 1024**2:.1f}MB"
+    )
+    print("마지막 인덱싱:")
+    print(format_ingest_summary(manifest.get("last_ingest", {})))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="오프라인 RAG 인덱싱")
+    parser.add_argument("command", choices=("build", "update", "verify", "stats"))
+    parser.add_argument("--folder", default=RAG_DATA_DIR)
+    parser.add_argument("--artifact-dir", default=RAG_INDEX_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command in ("build", "update"):
+        started = time.time()
+        code = run_sync(args.folder, args.artifact_dir, rebuild=args.command == "build")
+        print(f"전체 소요: {time.time() - started:.1f}초")
+        return code
+    if args.command == "verify":
+        problems = verify_artifact(args.folder, args.artifact_dir)
+        for problem in problems:
+            print(f"- {problem}")
+        print("검증 실패" if problems else "검증 통과")
+        return 1 if problems else 0
+    return print_stats(args.artifact_dir)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
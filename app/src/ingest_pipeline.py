@@ -0,0 +1,304 @@
+import queue
+import threading
+import time
+
+from openai import OpenAI
+
+from src.config import (
+    EMBEDDING_BATCH_MAX_TOKENS,
+    EMBEDDING_BATCH_MAX_INPUTS,
+    EMBEDDING_CONCURRENCY,
+    OCR_CONCURRENCY,
+    INGEST_QUEUE_SIZE,
+)
+from src.embedding import embed_texts, count_tokens
+
+# 스테이지 종료 신호
+_DONE = object()
+
+# 배치가 다 차지 않아도 입력이 이 시간(초) 이상 끊기면 바로 전송
+BATCH_IDLE_FLUSH_SEC = 0.5
+
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def record(self, items: int, seconds: float):
+        with self._lock:
+            now = time.time()
+            if self.started is None:
+                self.started = now - seconds
+            self.finished = now
+            self.items += items
+            self.busy += seconds
+
+    def as_dict(self):
+        wall = (self.finished - self.started) if self.started and self.finished else 0.0
+        return {
+            "stage": self.name,
+            "items": self.items,
+            "busy_sec": round(self.busy, 2),
+            "wall_sec": round(wall, 2),
+            "items_per_sec": round(self.items / wall, 2) if wall > 0 else None,
+        }
+
+
+def ingest_files(
+    jobs: list,
+    client: OpenAI,
+    ocr_fn,
+    chunk_fn,
+    on_vectors,
+    next_id: int = 0,
+    progress_callback=None,
+    ocr_workers: int = OCR_CONCURRENCY,
+    embed_workers: int = EMBEDDING_CONCURRENCY,
+    queue_size: int = INGEST_QUEUE_SIZE,
+    max_batch_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+    max_batch_inputs: int = EMBEDDING_BATCH_MAX_INPUTS,
+):
+    # OCR 워커 → 청커 → 임베딩 배처 → 인덱스 기록(호출 스레드)이 동시에 동작하는 파이프라인
+    # 각 스테이지 사이는 크기 제한 큐로 연결되어 느린 스테이지가 앞 스테이지를 자연스럽게 멈춤(backpressure)
+    # jobs: [(rel, path)], ocr_fn(path) -> pages, chunk_fn(pages) -> iter({"text", "page", "page_end"})
+    # on_vectors(ids, texts, metas, embeddings) 는 호출 스레드에서만 실행됨
+    # (metas: 청크별 {"source_file", "page", "page_end"})
+    stats = {name: StageStats(name) for name in ("ocr", "chunk", "embed", "index")}
+    file_q = queue.Queue()
+    for job in jobs:
+        file_q.put(job)
+    ocr_q = queue.Queue(maxsize=queue_size)
+    chunk_q = queue.Queue(maxsize=queue_size * max(max_batch_inputs, 1))
+    result_q = queue.Queue(maxsize=max(embed_workers, 1) * 2)
+
+    ocr_workers = max(1, min(ocr_workers, len(jobs) or 1))
+    id_counter = {"next_id": next_id}
+    # 인덱스 기록 스테이지가 실패하면 설정: 앞 스테이지는 새 작업 없이 종료 신호만 흘려보냄
+    cancel = threading.Event()
+
+    def ocr_worker():
+        try:
+            while not cancel.is_set():
+                try:
+                    rel, path = file_q.get_nowait()
+                except queue.Empty:
+                    break
+                started = time.time()
+                try:
+                    pages = ocr_fn(path)
+                    ocr_q.put((rel, path, pages, None))
+                except Exception as e:
+                    ocr_q.put((rel, path, None, e))
+                stats["ocr"].record(1, time.time() - started)
+        finally:
+            ocr_q.put(_DONE)
+
+    def chunker():
+        remaining_workers = ocr_workers
+        try:
+            while remaining_workers:
+                item = ocr_q.get()
+                if item is _DONE:
+                    remaining_workers -= 1
+                    continue
+                rel, path, pages, error = item
+                if cancel.is_set():
+                    continue
+                if error is not None:
+                    # 실패한 파일은 기록하지 않아 다음 갱신 때 재시도됨 (진행률에는 처리 완료로 집계)
+                    print(f"파일 처리 중 에러 발생 ({path}): {error}")
+                    result_q.put(("file_failed", rel))
+                    continue
+
+                started = time.time()
+                try:
+                    file_chunks = list(chunk_fn(pages)) if pages else []
+                except Exception as e:
+                    print(f"청킹 중 에러 발생 ({path}): {e}")
+                    result_q.put(("file_failed", rel))
+                    continue
+                # 파일 단위로 연속된 청크 ID 부여
+                start_id = id_counter["next_id"]
+                ids = list(range(start_id, start_id + len(file_chunks)))
+                id_counter["next_id"] += len(file_chunks)
+                stats["chunk"].record(len(file_chunks), time.time() - started)
+
+                # 인덱스 기록 스테이지가 파일 완료 여부를 판단할 수 있도록 먼저 등록
+                result_q.put(("file", rel, path, ids))
+                for i, ch in zip(ids, file_chunks):
+                    meta = {
+                        "source_file": path,
+                        "page": ch.get("page", 0),
+                        "page_end": ch.get("page_end", ch.get("page", 0)),
+                    }
+                    chunk_q.put((i, ch["text"], meta))
+        finally:
+            chunk_q.put(_DONE)
+
+    def embed_batch(batch):
+        started = time.time()
+        ids = [b[0] for b in batch]
+        texts = [b[1] for b in batch]
+        metas = [b[2] for b in batch]
+        try:
+            embeddings = embed_texts(texts, client, concurrency=1)
+            stats["embed"].record(len(batch), time.time() - started)
+            result_q.put(("vectors", ids, texts, metas, embeddings))
+        except Exception as e:
+            print(f"임베딩 생성 중 에러: {e}")
+            result_q.put(("failed", ids))
+
+    def batcher():
+        in_flight = threading.Semaphore(max(embed_workers, 1))
+        threads = []
+        batch = []
+        batch_tokens = 0
+
+        def flush():
+            nonlocal batch, batch_tokens
+            if not batch:
+                return
+            current = batch
+            batch = []
+            batch_tokens = 0
+            in_flight.acquire()
+
+            def run():
+                try:
+                    embed_batch(current)
+                finally:
+                    in_flight.release()
+
+            t = threading.Thread(target=run, daemon=True)
+            t.start()
+            threads.append(t)
+
+        try:
+            while True:
+                try:
+                    item = chunk_q.get(timeout=BATCH_IDLE_FLUSH_SEC)
+                except queue.Empty:
+                    flush()
+                    continue
+                if item is _DONE:
+                    break
+                if cancel.is_set():
+                    continue
+                n_tokens = count_tokens(item[1])
+                if batch and (
+                    batch_tokens + n_tokens > max_batch_tokens
+                    or len(batch) >= max_batch_inputs
+                ):
+                    flush()
+                batch.append(item)
+                batch_tokens += n_tokens
+            flush()
+        except Exception as e:
+            # 배처가 중단되어도 청커가 막히지 않도록 남은 청크를 비움 (해당 파일은 미완료로 남아 재시도됨)
+            print(f"임베딩 배처 중단: {e}")
+            while chunk_q.get() is not _DONE:
+                pass
+        finally:
+            for t in threads:
+                t.join()
+            result_q.put(_DONE)
+
+    workers = [
+        threading.Thread(target=ocr_worker, daemon=True) for _ in range(ocr_workers)
+    ]
+    workers.append(threading.Thread(target=chunker, daemon=True))
+    workers.append(threading.Thread(target=batcher, daemon=True))
+    wall_started = time.time()
+    for t in workers:
+        t.start()
+
+    # 인덱스 기록 스테이지 (호출 스레드)
+    id_to_file = {}
+    remaining = {}
+    file_ids = {}
+    failed = set()
+    completed = {}
+    chunks_embedded = 0
+
+    def report_progress():
+        if progress_callback is not None:
+            progress_callback(
+                {
+                    "files_total": len(jobs),
+                    "files_done": len(completed) + len(failed),
+                    "chunks_embedded": chunks_embedded,
+                }
+            )
+
+    def complete_if_done(rel):
+        if rel not in failed and remaining.get(rel) == 0 and rel not in completed:
+            completed[rel] = file_ids[rel]
+            report_progress()
+
+    try:
+        while True:
+            item = result_q.get()
+            if item is _DONE:
+                break
+            kind = item[0]
+            if kind == "file":
+                _, rel, path, ids = item
+                file_ids[rel] = ids
+                remaining[rel] = len(ids)
+                for i in ids:
+                    id_to_file[i] = rel
+                complete_if_done(rel)
+            elif kind == "vectors":
+                _, ids, texts, metas, embeddings = item
+                started = time.time()
+                on_vectors(ids, texts, metas, embeddings)
+                stats["index"].record(len(ids), time.time() - started)
+                chunks_embedded += len(ids)
+                for i in ids:
+                    rel = id_to_file[i]
+                    remaining[rel] -= 1
+                    complete_if_done(rel)
+            elif kind == "failed":
+                _, ids = item
+                for i in ids:
+                    failed.add(id_to_file[i])
+                report_progress()
+            elif kind == "file_failed":
+                failed.add(item[1])
+                report_progress()
+    except BaseException:
+        # on_vectors 등이 실패하면 앞 스테이지를 멈추고, 가득 찬 큐에 막힌 워커가 끝나도록 결과를 비움
+        cancel.set()
+        while result_q.get() is not _DONE:
+            pass
+        raise
+    finally:
+        for t in workers:
+            t.join()
+
+    # 일부 배치만 실패한 파일은 이미 기록된 벡터도 되돌릴 수 있도록 ID 목록을 돌려줌
+    rollback_ids = [i for rel in failed for i in file_ids.get(rel, [])]
+
+    report = [stats[name].as_dict() for name in ("ocr", "chunk", "embed", "index")]
+    wall = time.time() - wall_started
+    print(f"인덱싱 파이프라인 완료: {wall:.1f}초, 파일 {len(completed)}/{len(jobs)}개")
+    for row in report:
+        print(
+            f"  - {row['stage']:<6} {row['items']:>7}건 "
+            f"busy {row['busy_sec']:>7.1f}s wall {row['wall_sec']:>7.1f}s "
+            f"({row['items_per_sec'] or 0:.1f}/s)"
+        )
+
+    return {
+        "completed": completed,
+        "failed": sorted(failed),
+        "rollback_ids": rollback_ids,
+        "next_id": id_counter["next_id"],
+        "wall_sec": round(wall, 2),
+        "stages": report,
+    }
@@ -0,0 +1,82 @@
+import os
+import time
+
+from src.config import (
+    JUDGE_POLICY,
+    JUDGE_DEADLINE_SEC,
+    JUDGE_CALL_ESTIMATE_SEC,
+    JUDGE_REGEN_ESTIMATE_SEC,
+)
+
+# Judge 실행 정책
+# - always   : 항상 평가, 4점 미만이면 최대 2회 재생성 (기존 동작)
+# - grounded : 답변이 검색 결과를 출처로 인용하고 도구가 모두 성공했으면 평가 생략
+# - deadline : 요청 시작 후 JUDGE_DEADLINE_SEC 안에 끝날 수 있을 때만 평가/재생성
+# - adaptive : grounded + deadline
+# - async    : 초안을 바로 확정하고 평가는 백그라운드에서 기록만
+JUDGE_POLICIES = ("always", "grounded", "deadline", "adaptive", "async")
+
+# 최근 소요 시간 반영 비율 (지수 이동 평균)
+ESTIMATE_ALPHA = 0.3
+
+# Judge 호출·재생성 1회 예상 소요(초), 실제 소요로 계속 갱신
+_estimates = {"judge": JUDGE_CALL_ESTIMATE_SEC, "regen": JUDGE_REGEN_ESTIMATE_SEC}
+
+
+def configured_judge_policy() -> str:
+    if JUDGE_POLICY not in JUDGE_POLICIES:
+        print(f"알 수 없는 JUDGE_POLICY={JUDGE_POLICY}, always 로 대체합니다.")
+        return "always"
+    return JUDGE_POLICY
+
+
+def observe(kind: str, seconds: float):
+    _estimates[kind] += ESTIMATE_ALPHA * (seconds - _estimates[kind])
+
+
+def estimate(kind: str) -> float:
+    return _estimates[kind]
+
+
+def time_left(started: float, deadline_sec: float = JUDGE_DEADLINE_SEC) -> float:
+    return deadline_sec - (time.time() - started)
+
+
+def can_judge(policy: str, started: float) -> bool:
+    if policy not in ("deadline", "adaptive"):
+        return True
+    return time_left(started) >= estimate("judge")
+
+
+def can_retry(policy: str, started: float) -> bool:
+    # 재생성 후 다시 평가까지 마칠 시간이 남아 있어야 재시도
+    if policy not in ("deadline", "adaptive"):
+        return True
+    return time_left(started) >= estimate("regen") + estimate("judge")
+
+
+def _citations(tool_results: dict) -> set:
+    # 답변에서 찾을 출처 표기 (문서 파일명, 법령해석례 안건번호·안건명)
+    names = set()
+    for item in tool_results.get("search_vector_store") or []:
+        if isinstance(item, dict) and item.get("source"):
+            names.add(item["source"])
+            names.add(os.path.splitext(item["source"])[0])
+    law = tool_results.get("search_korean_law")
+    if isinstance(law, dict):
+        for hit in law.get("hits") or []:
+            names.update(
+                str(hit[field]) for field in ("안건번호", "안건명") if hit.get(field)
+            )
+    return {name for name in names if len(name) >= 2}
+
+
+def is_well_grounded(answer: str, tool_results: dict) -> bool:
+    # 도구 결과가 모두 성공(오류·빈 결과 없음)하고 답변이 검색된 출처를 하나 이상 인용
+    results = {k: v for k, v in tool_results.items() if not k.startswith("_")}
+    if not results or not answer:
+        return False
+    for result in results.values():
+        if not result or (isinstance(result, dict) and "error" in result):
+            return False
+    return any(name in answer for name in _citations(tool_results))
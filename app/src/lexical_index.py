@@ -0,0 +1,189 @@
+import json
+import math
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+# 한글은 음절 bigram 으로, 숫자/영문은 토큰 그대로 색인
+# (예: "투기과열지구" → "투기", "기과", "과열", "열지", "지구" / "21-0624", "dsr")
+# 형태소 분석기 없이도 조사가 붙은 어절과 복합명사를 부분 일치로 찾을 수 있음
+# 조문 번호("제7조", "제3조의2")는 하나의 용어로 취급
+_ARTICLE = re.compile(r"제\d+[조항호](?:의\d+)?")
+_TOKEN = re.compile(rf"{_ARTICLE.pattern}|[0-9a-z]+(?:[-.][0-9a-z]+)*|[가-힣]+")
+# 조문 번호, 안건 번호처럼 정확한 표현을 찾는 질의 (임베딩 없이 BM25 만으로 충분)
+_KEYWORD_PATTERN = re.compile(r"제\s*\d+\s*[조항호]|\d+-\d+|\d{4}\.\s*\d{1,2}\.")
+# 따옴표로 묶은 검색어
+_QUOTED = re.compile(r'"[^"]+"|“[^”]+”|「[^」]+」|『[^』]+』')
+# 조사·어미로 끝나는 어절은 자연어 질문으로 봄 (명사로 끝나는 경우를 일부 놓쳐도 hybrid 로 처리되므로 안전)
+# 끝 음절 하나로만 보면 "토지", "택지", "보고서", "한도" 같은 명사까지 걸리므로
+# 명사의 끝 음절로 거의 쓰이지 않는 한 음절 조사와, 두 음절 이상의 조사·어미만 확인
+_NOUN_WORD = re.compile(r"[0-9a-z가-힣]+(?:[-.][0-9a-z]+)*")
+_PARTICLES = "은 는 을 를 에 와 죠 까 며 줘".split()
+_ENDINGS = (
+    # 조사
+    "에서 으로 에게 부터 까지 처럼 보다 이나 이란 이랑 이고 이며 이면".split()
+    # 어미
+    + "려면 하면 되면 는지 은지 인지 할지 인가 는가 한가 나요 가요 까요 세요 해요".split()
+    + "어요 아요 에요 예요 네요 데요 니다 거나 해서 하고 하지 하는 되는".split()
+)
+_NON_NOUN_ENDING = re.compile(f"(?:{'|'.join(_ENDINGS + _PARTICLES)})$")
+
+VOCAB_FILE = "lexical_vocab.json"
+TERM_OFFSETS_FILE = "lexical_term_offsets.npy"
+POSTING_ROWS_FILE = "lexical_posting_rows.npy"
+POSTING_TFS_FILE = "lexical_posting_tfs.npy"
+DOC_IDS_FILE = "lexical_doc_ids.npy"
+DOC_LENS_FILE = "lexical_doc_lens.npy"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> list:
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    terms = []
+    for token in _TOKEN.findall(text):
+        if token[0] >= "가" and not _ARTICLE.fullmatch(token):
+            if len(token) == 1:
+                terms.append(token)
+            else:
+                terms.extend(token[i : i + 2] for i in range(len(token) - 1))
+        else:
+            terms.append(token)
+    return terms
+
+
+def _is_noun_word(word: str) -> bool:
+    return bool(_NOUN_WORD.fullmatch(word)) and not (
+        word[-1] >= "가" and _NON_NOUN_ENDING.search(word)
+    )
+
+
+def is_keyword_query(query: str, max_words: int = 2) -> bool:
+    # 조문/안건 번호·따옴표 검색어가 있거나, 명사만으로 된 짧은 키워드 나열이면 키워드 검색
+    # ("전세사기 예방법은?" 처럼 짧아도 조사·어미·물음표가 있으면 자연어 질문)
+    query = unicodedata.normalize("NFKC", query or "").strip()
+    if not query:
+        return False
+    if _KEYWORD_PATTERN.search(query) or _QUOTED.search(query):
+        return True
+    words = query.lower().split()
+    return len(words) <= max_words and all(_is_noun_word(w) for w in words)
+
+
+class LexicalIndex:
+    # 청크 텍스트에 대한 BM25 역색인 (CSR 형태의 배열로 저장, 메모리 매핑 로드 가능)
+    # - term_offsets[t]:term_offsets[t+1] 구간이 용어 t 의 posting 목록
+    # - posting_rows: 문서 행 번호(int32), posting_tfs: 용어 빈도(float32)
+    # - doc_ids: 행 번호 → 청크 ID, doc_lens: 문서 길이(용어 수)
+
+    def __init__(
+        self, vocab: dict, term_offsets, posting_rows, posting_tfs, doc_ids, doc_lens
+    ):
+        self.vocab = vocab
+        self.term_offsets = term_offsets
+        self.posting_rows = posting_rows
+        self.posting_tfs = posting_tfs
+        self.doc_ids = doc_ids
+        self.doc_lens = doc_lens
+        self.avgdl = float(np.mean(doc_lens)) if len(doc_lens) else 0.0
+
+    @classmethod
+    def build(cls, chunks: dict):
+        doc_ids = np.array(sorted(chunks), dtype=np.int64)
+        vocab = {}
+        postings = []
+        doc_lens = np.zeros(len(doc_ids), dtype=np.int32)
+
+        for row, chunk_id in enumerate(doc_ids.tolist()):
+            terms = tokenize(chunks[chunk_id])
+            doc_lens[row] = len(terms)
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                term_id = vocab.setdefault(term, len(vocab))
+                postings.append((term_id, row, tf))
+
+        postings.sort()
+        term_ids = np.array([p[0] for p in postings], dtype=np.int64)
+        posting_rows = np.array([p[1] for p in postings], dtype=np.int32)
+        posting_tfs = np.array([p[2] for p in postings], dtype=np.float32)
+        term_offsets = np.searchsorted(
+            term_ids, np.arange(len(vocab) + 1, dtype=np.int64)
+        ).astype(np.int64)
+        return cls(vocab, term_offsets, posting_rows, posting_tfs, doc_ids, doc_lens)
+
+    def save(self, store_dir: str):
+        os.makedirs(store_dir, exist_ok=True)
+        terms = [None] * len(self.vocab)
+        for term, term_id in self.vocab.items():
+            terms[term_id] = term
+        with open(os.path.join(store_dir, VOCAB_FILE), "w", encoding="utf-8") as f:
+            json.dump(terms, f, ensure_ascii=False)
+        np.save(os.path.join(store_dir, TERM_OFFSETS_FILE), self.term_offsets)
+        np.save(os.path.join(store_dir, POSTING_ROWS_FILE), self.posting_rows)
+        np.save(os.path.join(store_dir, POSTING_TFS_FILE), self.posting_tfs)
+        np.save(os.path.join(store_dir, DOC_IDS_FILE), self.doc_ids)
+        np.save(os.path.join(store_dir, DOC_LENS_FILE), self.doc_lens)
+
+    @classmethod
+    def load(cls, store_dir: str, mmap: bool = True):
+        mode = "r" if mmap else None
+        with open(os.path.join(store_dir, VOCAB_FILE), "r", encoding="utf-8") as f:
+            vocab = {term: i for i, term in enumerate(json.load(f))}
+        return cls(
+            vocab,
+            np.load(os.path.join(store_dir, TERM_OFFSETS_FILE), mmap_mode=mode),
+            np.load(os.path.join(store_dir, POSTING_ROWS_FILE), mmap_mode=mode),
+            np.load(os.path.join(store_dir, POSTING_TFS_FILE), mmap_mode=mode),
+            np.load(os.path.join(store_dir, DOC_IDS_FILE), mmap_mode=mode),
+            np.load(os.path.join(store_dir, DOC_LENS_FILE), mmap_mode=mode),
+        )
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def search(self, query: str, top_k: int = 3, allowed=None):
+        # 반환: [(청크 ID, BM25 점수)] 점수 내림차순
+        # allowed: 문서 행 순서(청크 ID 오름차순)의 불리언 마스크, 허용된 posting 만 점수 계산
+        n_docs = len(self.doc_ids)
+        if not n_docs:
+            return []
+
+        scores = np.zeros(n_docs, dtype=np.float32)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * np.asarray(self.doc_lens) / self.avgdl)
+        for term in set(tokenize(query)):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = int(self.term_offsets[term_id]), int(
+                self.term_offsets[term_id + 1]
+            )
+            rows = np.asarray(self.posting_rows[start:end])
+            tfs = np.asarray(self.posting_tfs[start:end])
+            df = end - start
+            if allowed is not None:
+                keep = allowed[rows]
+                rows, tfs = rows[keep], tfs[keep]
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            scores[rows] += idf * tfs * (BM25_K1 + 1) / (tfs + norm[rows])
+
+        hit_rows = np.flatnonzero(scores)
+        if not len(hit_rows):
+            return []
+        k = min(top_k, len(hit_rows))
+        top = hit_rows[np.argpartition(-scores[hit_rows], k - 1)[:k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self.doc_ids[r]), float(scores[r])) for r in top]
+
+
+def reciprocal_rank_fusion(rankings: list, k: int = 60):
+    # 여러 검색 결과(ID 목록)의 순위를 1/(k + rank) 합으로 결합
+    fused = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking, 1):
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda x: x[1], reverse=True)
@@ -0,0 +1,158 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+from src.config import OCR_CACHE_DIR, OCR_CACHE_MAX_BYTES
+
+# 상한을 넘으면 상한의 이 비율까지 줄여, 상한 근처에서 저장할 때마다 축출(전체 스캔)하지 않도록 함
+EVICT_TARGET_RATIO = 0.9
+
+
+class OcrCache:
+    # 파일 SHA-256 + OCR 모델 기준의 디스크 캐시 (페이지별 텍스트와 단어 박스 저장)
+    # 청킹 파라미터와 무관하므로 재시작·재배포·청킹 변경 후에도 재사용됨
+
+    def __init__(
+        self, cache_dir: str = OCR_CACHE_DIR, max_bytes: int = OCR_CACHE_MAX_BYTES
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # 이 프로세스에서 새로 OCR 해 저장한 페이지 수 (비용 산정용)
+        self.ocr_pages = 0
+        # 캐시 전체 크기: 처음 필요할 때 한 번 스캔하고 이후에는 저장·삭제 때마다 증감
+        # (다른 프로세스가 쓴 항목은 축출 시 다시 스캔하며 반영)
+        self._total_bytes = None
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def hash_bytes(file_bytes: bytes) -> str:
+        return hashlib.sha256(file_bytes).hexdigest()
+
+    def _path(self, sha256: str, model: str) -> str:
+        return os.path.join(self.cache_dir, sha256[:2], f"{sha256}.{model}.json.gz")
+
+    def get(self, sha256: str, model: str):
+        path = self._path(sha256, model)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            print(f"OCR 캐시 항목 손상, 삭제합니다 ({path}): {e}")
+            freed = self._remove(path)
+            with self._lock:
+                self.misses += 1
+                if self._total_bytes is not None:
+                    self._total_bytes -= freed
+            return None
+
+        # 최근 사용 시각 갱신 (LRU 축출 기준)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return entry.get("pages", [])
+
+    def put(self, sha256: str, model: str, pages: list):
+        path = self._path(sha256, model)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "sha256": sha256,
+            "model": model,
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "pages": pages,
+        }
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        old_size = self._size(path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.ocr_pages += len(pages)
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            else:
+                self._total_bytes += self._size(path) - old_size
+            over_limit = bool(self.max_bytes) and self._total_bytes > self.max_bytes
+
+        if over_limit:
+            self.evict(target_bytes=int(self.max_bytes * EVICT_TARGET_RATIO))
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _entries(self):
+        entries = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if not name.endswith(".json.gz"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _remove(self, path: str) -> int:
+        # 삭제한 항목의 크기 (이미 없으면 0)
+        size = self._size(path)
+        try:
+            os.remove(path)
+        except OSError:
+            return 0
+        return size
+
+    def evict(
+        self, max_bytes: int | None = None, target_bytes: int | None = None
+    ) -> int:
+        # 전체 크기가 상한을 넘으면 가장 오래 사용되지 않은 항목부터 target_bytes(기본: 상한)까지 삭제
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        target = limit if target_bytes is None else min(target_bytes, limit)
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            if total > limit:
+                for _, size, path in entries:
+                    if total <= target:
+                        break
+                    self._remove(path)
+                    total -= size
+                    removed += 1
+            self._total_bytes = total
+        if removed:
+            print(f"OCR 캐시 {removed}개 항목 축출")
+        return removed
+
+    def clear(self) -> int:
+        return self.evict(max_bytes=0)
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        with self._lock:
+            hits, misses, ocr_pages = self.hits, self.misses, self.ocr_pages
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "ocr_pages": ocr_pages,
+        }
@@ -95,6 +95,38 @@ PLAN_PROMPT_TEMPLATE = """
 }}
 """
 
+ROUTE_AND_PLAN_PROMPT_TEMPLATE = """
+당신은 부동산 초보자의 질문을 받아서,
+1) '부동산 전문 툴/법령/뉴스/RAG'까지 써야 하는지 판단하고,
+2) 질문을 정제하고,
+3) 툴이 필요하면 어떤 툴들을 어떤 순서로 쓸지 계획을 세우는 라우터 겸 플래너입니다.
+
+[툴이 필요한 경우 예시]
+- 특정 법 조항/제도/규제 여부를 정확히 확인해야 함
+- 최신 뉴스, 정책 발표, 최근 시장 상황 등 시점 의존 정보
+- 업로드된 계약서/문서 내용 기반 분석이 필요해 보이는 경우
+- 구체적인 세법·규제 적용 여부, 지역별 규제 상황 등
+
+[툴이 필요 없는 경우 예시]
+- 개념 설명, 용어 정의, 간단한 계산/비교, 일반 상식 질문
+- 예: "전세랑 월세 차이 설명해줘", "LTV가 뭐예요?", "중도금이 뭔지 알려줘"
+
+사용할 수 있는 툴:
+- search_vector_store : 계약서·문서 내용 검색 (args: query, top_k)
+- search_korean_law   : 국가법령정보 검색 (args: query, 단일 키워드로 작성할 것)
+- get_news            : 부동산 관련 뉴스 검색 (args: topic)
+- get_current_datetime: 현재 시각 조회
+
+출력 규칙:
+- need_tools: 툴이 필요하면 true, 아니면 false
+- reason: 판단 근거 한 줄
+- refine_question: 사용자의 질문을 부동산/법령 검색에 적합하게 정제한 문장
+- intention: 사용자의 의도 요약 (예: 전세 계약서 위험요소 확인)
+- tool_plan: need_tools 가 false 면 빈 배열, 쓰지 않는 args 항목은 null
+
+사용자 질문: {query}
+"""
+
 JUDGE_PROMPT_TEMPLATE = """
 당신은 부동산 전문 LLM Judge입니다.
 당신의 역할은 다음 네 가지 기준으로 1차 응답의 품질을 평가하는 것입니다.
@@ -170,3 +202,19 @@ Output: {"update_needed": true, "memory_content": "사용자는 마포구 30평
 Input: '요즘 날씨가 참 좋네. 부동산 공부하기 딱이다.'
 Output: {"update_needed": false, "memory_content": ""}
 """
+
+CONTEXT_SUMMARY_PROMPT_TEMPLATE = """
+당신은 상담 대화의 '이전 대화 요약'을 관리합니다.
+기존 요약에 새로 밀려난 대화를 반영해 하나의 요약으로 갱신하세요.
+
+규칙:
+- 사용자의 상황·조건(예산, 지역, 계약 형태 등), 이미 답한 핵심 결론, 아직 해결되지 않은 질문을 우선 보존
+- 도구 결과의 세부 수치·원문은 결론에 필요한 것만 남김
+- 한국어 글머리표로 {max_chars}자 이내, 요약 외의 말은 쓰지 말 것
+
+[기존 요약]
+{summary}
+
+[새로 밀려난 대화]
+{conversation}
+"""
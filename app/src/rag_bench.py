@@ -0,0 +1,430 @@
+import argparse
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import time
+
+import faiss
+import numpy as np
+from openai import OpenAI
+
+from src.config import RAG_INDEX_DIR, RAG_DATA_DIR, OPENAI_API_KEY
+from src.chunker import CHUNKERS, get_chunker, iter_sentences, page_texts
+from src.embedding import count_tokens, embed_texts
+from src.index_store import load_index_artifact, load_vector_store
+from src.lexical_index import LexicalIndex
+from src.retrieval_service import RetrievalClient, serve
+from src.index_factory import (
+    INDEX_TYPES,
+    build_index,
+    apply_search_params,
+    factory_string,
+    rescore_exact,
+)
+
+# 종류별로 바꿔가며 측정할 질의 시점 파라미터
+SWEEPS = {
+    "flat": [{}],
+    "ivf_flat": [{"nprobe": n} for n in (1, 4, 16, 64)],
+    "hnsw": [{"ef_search": n} for n in (16, 64, 128, 256)],
+    "ivf_pq": [{"nprobe": n} for n in (1, 4, 16, 64)] + [{"nprobe": 16, "rescore": 4}],
+    # rescore: 후보를 k * rescore 개 가져와 원본 float32 벡터로 다시 계산
+    "sq_fp16": [{}, {"rescore": 4}],
+    "sq8": [{}, {"rescore": 2}, {"rescore": 4}],
+}
+
+
+def _sample_rows(n_rows: int, n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(n_rows, size=min(n, n_rows), replace=False))
+
+
+def sample_queries(vectors: np.ndarray, n_queries: int, seed: int = 0):
+    # 실제 청크 벡터를 질의로 사용 (검색 부하용, 질의가 인덱스 안에 그대로 있음)
+    rows = _sample_rows(len(vectors), n_queries, seed)
+    return np.ascontiguousarray(vectors[rows], dtype="float32")
+
+
+def hold_out_queries(
+    vectors: np.ndarray, ids: np.ndarray, n_queries: int, k: int, seed: int = 0
+):
+    # recall 측정용: 질의로 쓸 청크 벡터를 인덱스에서 빼 둠
+    # (인덱스 안의 벡터로 질의하면 자기 자신이 항상 1위가 되어 recall 이 부풀려짐)
+    # 코퍼스가 작아도 인덱스에 k 개 이상, 전체의 절반 이상은 남김
+    n = max(0, min(n_queries, len(vectors) // 2, len(vectors) - k))
+    held = np.zeros(len(vectors), dtype=bool)
+    held[_sample_rows(len(vectors), n, seed)] = True
+    queries = np.ascontiguousarray(vectors[held], dtype="float32")
+    return queries, np.ascontiguousarray(vectors[~held]), ids[~held]
+
+
+def exact_neighbors(vectors: np.ndarray, ids: np.ndarray, queries: np.ndarray, k: int):
+    flat = faiss.IndexFlatL2(vectors.shape[1])
+    flat.add(np.ascontiguousarray(vectors, dtype="float32"))  # type: ignore
+    _, rows = flat.search(queries, k)  # type: ignore
+    return ids[rows]
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / (len(truth) * k)
+
+
+def measure_latency(index, queries: np.ndarray, k: int, rescore=None):
+    # 실서비스와 같이 질의 1건씩 검색한 지연 시간 분포
+    # rescore: (원본 벡터, ID 배열, 후보 배수) — 재계산 시간까지 포함해 측정
+    latencies = []
+    found = []
+    for q in queries:
+        q = q.reshape(1, -1)
+        started = time.perf_counter()
+        if rescore is None:
+            _, ids = index.search(q, k)
+        else:
+            vectors, vector_ids, factor = rescore
+            _, candidates = index.search(q, k * factor)
+            _, ids = rescore_exact(q, candidates, vectors, vector_ids, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found.append(ids[0])
+    return np.array(found), np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def evaluate_index_types(
+    vectors: np.ndarray,
+    ids: np.ndarray,
+    kinds=INDEX_TYPES,
+    k: int = 5,
+    n_queries: int = 200,
+):
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    queries, vectors, ids = hold_out_queries(vectors, ids, n_queries, k)
+    if not len(queries):
+        return []
+    truth = exact_neighbors(vectors, ids, queries, k)
+
+    # 메모리 비교 기준: float32 원본 벡터를 그대로 담는 Flat 인덱스 크기
+    flat_mb = vectors.nbytes / 1024**2
+    report = []
+    for kind in kinds:
+        started = time.perf_counter()
+        index = build_index(kind, vectors, ids)
+        build_sec = time.perf_counter() - started
+        size_mb = len(faiss.serialize_index(index)) / 1024**2
+
+        for params in SWEEPS.get(kind, [{}]):
+            search_params = {key: v for key, v in params.items() if key != "rescore"}
+            apply_search_params(index, **search_params)
+            rescore = (vectors, ids, params["rescore"]) if "rescore" in params else None
+            found, p50, p99 = measure_latency(index, queries, k, rescore)
+            report.append(
+                {
+                    "kind": kind,
+                    "factory": factory_string(kind, vectors.shape[1], len(vectors)),
+                    "params": params,
+                    f"recall@{k}": round(recall_at_k(found, truth), 4),
+                    "p50_ms": round(float(p50), 3),
+                    "p99_ms": round(float(p99), 3),
+                    "build_sec": round(build_sec, 2),
+                    "size_mb": round(size_mb, 2),
+                    "vs_flat": round(size_mb / flat_mb, 3) if flat_mb else None,
+                }
+            )
+    return report
+
+
+def format_report(report: list) -> str:
+    if not report:
+        return "측정 결과가 없습니다."
+    recall_key = next(key for key in report[0] if key.startswith("recall@"))
+    lines = [
+        f"{'kind':<9} {'params':<20} {recall_key:>9} {'p50(ms)':>9} "
+        f"{'p99(ms)':>9} {'build(s)':>9} {'size(MB)':>9} {'vs_flat':>8}"
+    ]
+    for row in report:
+        params = ",".join(f"{k}={v}" for k, v in row["params"].items()) or "-"
+        vs_flat = "-" if row["vs_flat"] is None else f"{row['vs_flat']:.2f}x"
+        lines.append(
+            f"{row['kind']:<9} {params:<20} {row[recall_key]:>9.4f} "
+            f"{row['p50_ms']:>9.3f} {row['p99_ms']:>9.3f} "
+            f"{row['build_sec']:>9.2f} {row['size_mb']:>9.2f} {vs_flat:>8}"
+        )
+    lines.append(
+        "rescore 행은 인덱스 외에 디스크의 float32 원본(vectors.npy)을 후보 수만큼만 읽음"
+    )
+    return "\n".join(lines)
+
+
+def _squash(text: str) -> str:
+    return re.sub(r"\s+", "", text)
+
+
+def sample_sentences(docs: list, n_queries: int, seed: int = 0, min_chars: int = 30):
+    # 코퍼스의 실제 문장을 질의로 사용하고, 그 문장을 온전히 담은 청크를 정답으로 봄
+    # (문장이 청크 경계에서 잘리면 어느 청크도 정답이 되지 못함)
+    sentences = [
+        s
+        for _, pages in docs
+        for _, s, _ in iter_sentences(pages)
+        if len(s) >= min_chars
+    ]
+    rng = np.random.default_rng(seed)
+    n = min(n_queries, len(sentences))
+    rows = rng.choice(len(sentences), size=n, replace=False)
+    return [sentences[r] for r in sorted(rows)]
+
+
+def hit_rate(results: list, texts: list, queries: list) -> float:
+    squashed = [_squash(t) for t in texts]
+    hits = sum(
+        any(_squash(q) in squashed[r] for r in rows)
+        for q, rows in zip(queries, results)
+    )
+    return hits / len(queries) if queries else 0.0
+
+
+def evaluate_chunkers(
+    docs: list,
+    kinds=CHUNKERS,
+    k: int = 5,
+    n_queries: int = 100,
+    client: OpenAI | None = None,
+):
+    # docs: [(경로, OCR 페이지 목록)]
+    # 청크 수, 임베딩 토큰 합계, 중복(겹침) 비율, 문장 단위 hit@k (BM25 / 임베딩) 비교
+    corpus_tokens = sum(
+        count_tokens(text) for _, pages in docs for _, text in page_texts(pages)
+    )
+    queries = sample_sentences(docs, n_queries)
+    query_vectors = embed_texts(queries, client) if client and queries else None
+
+    report = []
+    for kind in kinds:
+        chunker = get_chunker(kind)
+        started = time.perf_counter()
+        texts = [c["text"] for _, pages in docs for c in chunker(pages)]
+        chunk_sec = time.perf_counter() - started
+        tokens = np.array([count_tokens(t) for t in texts] or [0])
+
+        lexical = LexicalIndex.build(dict(enumerate(texts)))
+        lexical_results = [[i for i, _ in lexical.search(q, k)] for q in queries]
+        row = {
+            "chunker": kind,
+            "chunks": len(texts),
+            "tokens": int(tokens.sum()),
+            "mean_tokens": round(float(tokens.mean()), 1),
+            "p95_tokens": int(np.percentile(tokens, 95)),
+            "overlap": (
+                round(tokens.sum() / corpus_tokens - 1, 4) if corpus_tokens else 0.0
+            ),
+            "chunk_sec": round(chunk_sec, 2),
+            f"bm25_hit@{k}": round(hit_rate(lexical_results, texts, queries), 4),
+            f"dense_hit@{k}": None,
+        }
+
+        if query_vectors is not None and texts:
+            vectors = embed_texts(texts, client)
+            flat = faiss.IndexFlatL2(vectors.shape[1])
+            flat.add(vectors)  # type: ignore
+            _, rows = flat.search(query_vectors, k)  # type: ignore
+            dense_results = [[int(r) for r in found if r >= 0] for found in rows]
+            row[f"dense_hit@{k}"] = round(hit_rate(dense_results, texts, queries), 4)
+        report.append(row)
+    return report
+
+
+def format_chunker_report(report: list) -> str:
+    if not report:
+        return "측정 결과가 없습니다."
+    bm25_key = next(key for key in report[0] if key.startswith("bm25_hit@"))
+    dense_key = next(key for key in report[0] if key.startswith("dense_hit@"))
+    lines = [
+        f"{'chunker':<9} {'chunks':>7} {'tokens':>9} {'mean':>7} {'p95':>6} "
+        f"{'overlap':>8} {bm25_key:>11} {dense_key:>12}"
+    ]
+    for row in report:
+        dense = "-" if row[dense_key] is None else f"{row[dense_key]:.4f}"
+        lines.append(
+            f"{row['chunker']:<9} {row['chunks']:>7} {row['tokens']:>9} "
+            f"{row['mean_tokens']:>7.1f} {row['p95_tokens']:>6} "
+            f"{row['overlap']:>8.2%} {row[bm25_key]:>11.4f} {dense:>12}"
+        )
+    return "\n".join(lines)
+
+
+def resident_memory_mb() -> dict:
+    # 리눅스 /proc 기준 상주 메모리: anon 은 프로세스 전용, file 은 mmap 된 파일(프로세스 간 공유)
+    usage = {"anon_mb": None, "file_mb": None}
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("RssAnon", "RssFile"):
+                    name = "anon_mb" if key == "RssAnon" else "file_mb"
+                    usage[name] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        pass
+    return usage
+
+
+def _serving_probe(
+    artifact_dir: str, mode: str, texts: list, k: int, queue, socket_path=None
+):
+    # 새 프로세스에서 인덱스를 열고 (service 는 검색 서비스에 연결만) 같은 질의를 돌린 뒤의
+    # 상주 메모리 측정 (레플리카 1개에 해당)
+    before = resident_memory_mb()
+    try:
+        if mode == "service":
+            client = RetrievalClient(socket_path)
+            # 키워드 검색 요청이라 서비스 쪽에서도 임베딩 API 를 호출하지 않음
+            for text in texts:
+                client.search([{"query": text, "top_k": k, "mode": "lexical"}])
+        else:
+            index, _, _, lexical_index = load_index_artifact(
+                artifact_dir, mmap=mode == "mmap"
+            )
+            _, vectors = load_vector_store(artifact_dir)
+            for q in sample_queries(vectors, len(texts)):
+                index.search(q.reshape(1, -1), k)
+            for text in texts:
+                lexical_index.search(text, k)
+    except Exception as e:
+        # 부모 프로세스가 결과를 기다리며 멈추지 않도록 실패도 결과로 전달
+        queue.put({"mode": mode, "error": str(e)})
+        return
+    after = resident_memory_mb()
+    queue.put(
+        {
+            "mode": mode,
+            "anon_mb": round((after["anon_mb"] or 0) - (before["anon_mb"] or 0), 1),
+            "file_mb": round((after["file_mb"] or 0) - (before["file_mb"] or 0), 1),
+        }
+    )
+
+
+def _start_service(ctx, artifact_dir: str, socket_path: str, timeout: float = 60):
+    # 측정용 검색 서비스를 별도 프로세스로 띄우고 소켓이 생길 때까지 대기
+    proc = ctx.Process(target=serve, args=(socket_path, artifact_dir), daemon=True)
+    proc.start()
+    deadline = time.time() + timeout
+    while not os.path.exists(socket_path):
+        if not proc.is_alive() or time.time() > deadline:
+            proc.terminate()
+            raise RuntimeError("검색 서비스를 시작하지 못했습니다.")
+        time.sleep(0.1)
+    return proc
+
+
+def evaluate_serving_memory(
+    artifact_dir: str, modes=("heap", "mmap", "service"), n_queries: int = 50
+):
+    # heap: 아티팩트 전체를 힙에 적재, mmap: 읽기 전용 mmap (shared 모드),
+    # service: 검색 서비스 클라이언트만 보유 (인덱스는 서비스 프로세스 1곳에만 존재)
+    # 모든 모드가 같은 키워드 질의 n_queries 개를 검색 (heap/mmap 은 벡터 검색도 함께)
+    _, chunks, _, _ = load_index_artifact(artifact_dir, mmap=True)
+    texts = [chunks[int(chunk_id)][:50] for chunk_id in chunks.ids[:n_queries]]
+    ctx = multiprocessing.get_context("spawn")
+    report = []
+    for mode in modes:
+        service, tmp_dir, socket_path = None, None, None
+        if mode == "service":
+            tmp_dir = tempfile.mkdtemp(prefix="rag_bench_")
+            socket_path = os.path.join(tmp_dir, "service.sock")
+            service = _start_service(ctx, artifact_dir, socket_path)
+        try:
+            queue = ctx.Queue()
+            proc = ctx.Process(
+                target=_serving_probe,
+                args=(artifact_dir, mode, texts, 5, queue, socket_path),
+            )
+            proc.start()
+            report.append(queue.get())
+            proc.join()
+        finally:
+            if service is not None:
+                service.terminate()
+                service.join()
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+    return report
+
+
+def format_serving_report(report: list) -> str:
+    if not report:
+        return "측정 결과가 없습니다."
+    lines = [f"{'mode':<10} {'anon(MB)':>9} {'file(MB)':>9}"]
+    for row in report:
+        if "error" in row:
+            lines.append(f"{row['mode']:<10} 측정 실패: {row['error']}")
+            continue
+        lines.append(f"{row['mode']:<10} {row['anon_mb']:>9.1f} {row['file_mb']:>9.1f}")
+    lines.append(
+        "anon: 레플리카 전용 메모리, file: mmap 페이지 (같은 아티팩트를 여는 프로세스끼리 공유)"
+    )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RAG 인덱스 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_index = sub.add_parser("index-types", help="인덱스 종류별 recall/지연시간 비교")
+    p_index.add_argument("--artifact-dir", default=RAG_INDEX_DIR)
+    p_index.add_argument("--kinds", nargs="+", default=list(INDEX_TYPES))
+    p_index.add_argument("--k", type=int, default=5)
+    p_index.add_argument("--queries", type=int, default=200)
+
+    p_chunk = sub.add_parser("chunkers", help="청킹 방식별 청크 수/토큰/검색 품질 비교")
+    p_chunk.add_argument("--folder", default=RAG_DATA_DIR)
+    p_chunk.add_argument("--kinds", nargs="+", default=list(CHUNKERS))
+    p_chunk.add_argument("--k", type=int, default=5)
+    p_chunk.add_argument("--queries", type=int, default=100)
+    p_chunk.add_argument(
+        "--embed", action="store_true", help="임베딩 검색 품질도 측정 (API 호출 발생)"
+    )
+
+    p_serve = sub.add_parser("serving", help="서빙 방식별 레플리카당 상주 메모리 비교")
+    p_serve.add_argument("--artifact-dir", default=RAG_INDEX_DIR)
+    p_serve.add_argument("--queries", type=int, default=50)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "index-types":
+        store = load_vector_store(args.artifact_dir)
+        if store is None:
+            print(f"인덱스 아티팩트가 없습니다: {args.artifact_dir}")
+            return 1
+        ids, vectors = store
+        print(f"청크 {len(ids)}개, 차원 {vectors.shape[1]}")
+        report = evaluate_index_types(vectors, ids, args.kinds, args.k, args.queries)
+        print(format_report(report))
+    elif args.command == "chunkers":
+        # OCR 결과는 디스크 캐시를 사용하므로 이미 인덱싱한 코퍼스는 API 호출 없이 로드됨
+        from src.rag_pipeline import list_pdf_files, read_pdf_pages
+
+        pdf_files = list_pdf_files(args.folder)
+        if not pdf_files:
+            print(f"PDF 파일이 없습니다: {args.folder}")
+            return 1
+        docs = []
+        for path in pdf_files:
+            try:
+                docs.append((path, read_pdf_pages(path)))
+            except Exception as e:
+                print(f"파일 로드 실패 ({path}): {e}")
+        client = OpenAI(api_key=OPENAI_API_KEY) if args.embed else None
+        print(f"문서 {len(docs)}개")
+        report = evaluate_chunkers(docs, args.kinds, args.k, args.queries, client)
+        print(format_chunker_report(report))
+    elif args.command == "serving":
+        if load_vector_store(args.artifact_dir) is None:
+            print(f"인덱스 아티팩트가 없습니다: {args.artifact_dir}")
+            return 1
+        report = evaluate_serving_memory(args.artifact_dir, n_queries=args.queries)
+        print(format_serving_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
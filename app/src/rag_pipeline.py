@@ -1,89 +1,453 @@
 import glob
 import os
+import tempfile
+import threading
 import faiss
 import numpy as np
 import requests
-import streamlit as st
 
 from openai import OpenAI
 
-from src.config import UPSTAGE_API_KEY
+from src.config import (
+    UPSTAGE_API_KEY,
+    RAG_INDEX_DIR,
+    EMBEDDING_MODEL,
+    OCR_MODEL,
+)
+from src.ocr_cache import OcrCache
+from src.embedding import count_tokens, embed_texts, embed_text
+from src.ingest_pipeline import ingest_files
+from src.chunker import chunker_params, get_chunker, page_texts
+from src.doc_metadata import document_metadata
+from src.lexical_index import LexicalIndex
+from src.index_store import (
+    scan_files,
+    build_manifest,
+    manifest_matches,
+    manifest_compatible,
+    diff_files,
+    load_manifest,
+    load_index_artifact,
+    load_vector_store,
+    save_index_artifact,
+)
+from src.index_factory import (
+    build_index,
+    apply_search_params,
+    supports_remove,
+    configured_index_type,
+)
 
 
-@st.cache_resource(show_spinner=True)
-def build_index_from_folder(folder_path: str, _client: OpenAI):
-    # 파일 탐색 및 텍스트 청킹
-    pdf_files = glob.glob(os.path.join(folder_path, "**", "*.pdf"), recursive=True)
-    all_chunks = []
-    metadatas = []
+def list_pdf_files(folder_path: str):
+    return sorted(glob.glob(os.path.join(folder_path, "**", "*.pdf"), recursive=True))
+
+
+def index_params():
+    return {"embedding_model": EMBEDDING_MODEL, **chunker_params()}
+
+
+def _report_progress(progress_callback, **progress):
+    if progress_callback is not None:
+        progress_callback(progress)
+
+
+def artifact_is_current(manifest: dict | None, files: dict) -> bool:
+    # 폴더 파일·청킹/임베딩 파라미터·인덱스 종류가 모두 아티팩트와 같은지
+    return (
+        manifest_matches(manifest, files, index_params())
+        and (manifest or {}).get("index_type") == configured_index_type()
+    )
+
+
+def scan_folder(folder_path: str, manifest: dict | None = None):
+    # 이전 매니페스트의 해시를 재사용해 변경되지 않은 파일은 다시 읽지 않음
+    pdf_files = list_pdf_files(folder_path)
+    return scan_files(folder_path, pdf_files, previous=(manifest or {}).get("files"))
 
-    for path in pdf_files:
+
+def load_or_build_index(
+    folder_path: str,
+    _client: OpenAI,
+    artifact_dir: str = RAG_INDEX_DIR,
+    progress_callback=None,
+):
+    # 디스크 아티팩트의 매니페스트가 현재 폴더/파라미터와 일치하면 그대로 로드
+    # (프로세스 단위 캐시와 백그라운드 실행은 session_manager 의 IndexWarmup 이 담당)
+    # progress_callback({"stage": scan | load | ingest | save, ...}) 로 진행 상황 전달
+    manifest = load_manifest(artifact_dir)
+    _report_progress(
+        progress_callback, stage="scan", files_total=len(list_pdf_files(folder_path))
+    )
+    files = scan_folder(folder_path, manifest)
+
+    if artifact_is_current(manifest, files):
+        _report_progress(progress_callback, stage="load")
         try:
-            with open(path, "rb") as f:
-                file_bytes = f.read()
-            text = extract_text_from_pdf(file_bytes)
-
-            # 텍스트가 비어있으면 건너뜀
-            if not text:
-                continue
-
-            file_chunks = chunk_text(text)
-            for ch in file_chunks:
-                all_chunks.append(ch)
-                metadatas.append({"source_file": path})
+            loaded = load_index_artifact(artifact_dir, mmap=True)
+            if loaded is not None:
+                apply_search_params(loaded[0])
+                return loaded
         except Exception as e:
-            print(f"파일 처리 중 에러 발생 ({path}): {e}")
-            continue
+            print(f"디스크 인덱스 로드 실패, 재생성합니다: {e}")
 
-    # 청크가 하나도 없으면 여기서 종료 (빈값 리턴)
-    if not all_chunks:
-        print("경고: 처리할 텍스트 청크가 없습니다.")
-        return None, [], []
+    index, chunks, metadatas, _, saved = sync_index_artifact(
+        folder_path,
+        _client,
+        artifact_dir,
+        files=files,
+        progress_callback=progress_callback,
+    )
+    if index is None:
+        return None, [], [], None
 
-    # 임베딩 생성
-    try:
-        # 리스트 컴프리헨션으로 임베딩 생성
-        embeddings_list = [get_embedding(ch, _client) for ch in all_chunks]
+    if saved:
+        try:
+            # 저장한 아티팩트를 메모리 매핑으로 다시 열어 상주 메모리를 줄임
+            reloaded = load_index_artifact(artifact_dir, mmap=True)
+            if reloaded is not None:
+                apply_search_params(reloaded[0])
+                return reloaded
+        except Exception as e:
+            print(f"디스크 인덱스 로드 실패: {e}")
+
+    return index, chunks, metadatas, LexicalIndex.build(chunks)
 
-        # FAISS 호환성을 위한 Numpy 변환 및 메모리 정렬
-        embeddings = np.array(embeddings_list, dtype="float32")
-        embeddings = np.ascontiguousarray(embeddings)
+
+def sync_index_artifact(
+    folder_path: str,
+    client: OpenAI,
+    artifact_dir: str = RAG_INDEX_DIR,
+    rebuild: bool = False,
+    files: dict | None = None,
+    progress_callback=None,
+):
+    # 폴더 내용을 반영한 새 버전 아티팩트를 저장하고 CURRENT 를 교체 (Streamlit 없이 CLI/크론에서도 사용)
+    # 호환되는 아티팩트가 있으면 변경분만 증분 갱신, 없거나 rebuild=True 이면 전체 생성
+    # (인덱스 종류만 바뀐 경우에는 저장된 벡터로 인덱스만 재생성)
+    # 반환: (index, chunks, metadatas, manifest, 저장 성공 여부) — 청크가 없으면 index 는 None
+    manifest = None if rebuild else load_manifest(artifact_dir)
+    if files is None:
+        files = scan_folder(folder_path, manifest)
+
+    index, chunks, metadatas, vector_store = None, {}, {}, None
+    if manifest_compatible(manifest, index_params()):
+        try:
+            loaded = load_index_artifact(artifact_dir, mmap=False)
+            vector_store = load_vector_store(artifact_dir)
+            if loaded is not None and vector_store is not None:
+                index = loaded[0]
+                chunks, metadatas = loaded[1].to_dicts()
+        except Exception as e:
+            print(f"디스크 인덱스 로드 실패, 전체 재생성합니다: {e}")
+            index, chunks, metadatas, vector_store = None, {}, {}, None
+    if vector_store is None:
+        manifest = None
+
+    index, chunks, metadatas, new_manifest, vector_store = update_index_from_folder(
+        folder_path,
+        client,
+        index=index,
+        chunks=chunks,
+        metadatas=metadatas,
+        manifest=manifest,
+        files=files,
+        vector_store=vector_store,
+        progress_callback=progress_callback,
+    )
+    if index is None:
+        return None, {}, {}, None, False
+
+    _report_progress(progress_callback, stage="save")
+    try:
+        assert vector_store is not None
+        save_index_artifact(
+            artifact_dir, index, chunks, metadatas, new_manifest, *vector_store
+        )
     except Exception as e:
-        print(f"임베딩 생성 중 에러: {e}")
+        print(f"디스크 인덱스 저장 실패: {e}")
+        return index, chunks, metadatas, new_manifest, False
+    return index, chunks, metadatas, new_manifest, True
+
+
+# 벡터 저장소 병합 시 한 번에 복사하는 행 수 (병합 중 추가 메모리 상한)
+MERGE_BLOCK_ROWS = 65536
+
+
+class _VectorSpool:
+    # 새로 임베딩한 벡터를 배치마다 임시 파일에 이어 써서 메모리에 쌓지 않음 (ID 만 메모리에 유지)
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()
+        self.id_batches = []
+        self.dim = None
+
+    def append(self, ids: np.ndarray, embeddings: np.ndarray):
+        embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+        self.dim = embeddings.shape[1]
+        self._file.write(embeddings.tobytes())
+        self.id_batches.append(ids)
+
+    def __len__(self):
+        return sum(len(ids) for ids in self.id_batches)
+
+    def arrays(self):
+        # (ID 배열, 임시 파일에 매핑된 벡터 행렬) — 기록한 벡터가 없으면 (None, None)
+        if not len(self):
+            return None, None
+        self._file.flush()
+        vectors = np.memmap(
+            self._file, dtype="float32", mode="r", shape=(len(self), self.dim)
+        )
+        return np.concatenate(self.id_batches), vectors
+
+
+def _merge_vector_store(parts: list, drop_ids):
+    # parts: [(ID 배열, 벡터 행렬)] 에서 drop_ids 를 빼고 ID 오름차순으로 합침
+    # 결과는 임시 파일에 매핑된 행렬에 블록 단위로 기록 (기존/신규 벡터를 메모리에 함께 올리지 않음)
+    parts = [(ids, vecs) for ids, vecs in parts if ids is not None]
+    if not parts:
+        return None, None
+    all_ids = np.concatenate([ids for ids, _ in parts])
+    source = np.concatenate([np.full(len(ids), n) for n, (ids, _) in enumerate(parts)])
+    rows = np.concatenate([np.arange(len(ids)) for ids, _ in parts])
+    keep = np.flatnonzero(~np.isin(all_ids, np.asarray(drop_ids, dtype="int64")))
+    order = keep[np.argsort(all_ids[keep], kind="stable")]
+    dim = parts[0][1].shape[1]
+    if not len(order):
+        return np.empty(0, dtype="int64"), np.empty((0, dim), dtype="float32")
+    merged = np.memmap(
+        tempfile.TemporaryFile(), dtype="float32", mode="w+", shape=(len(order), dim)
+    )
+    for start in range(0, len(order), MERGE_BLOCK_ROWS):
+        block = order[start : start + MERGE_BLOCK_ROWS]
+        for n, (_, vecs) in enumerate(parts):
+            mask = source[block] == n
+            if mask.any():
+                merged[start + np.flatnonzero(mask)] = vecs[rows[block[mask]]]
+    return all_ids[order], merged
+
+
+def build_index_from_folder(folder_path: str, _client: OpenAI):
+    index, chunks, metadatas, _, _ = update_index_from_folder(folder_path, _client)
+    if index is None:
         return None, [], []
+    return index, chunks, metadatas
 
-    # FAISS 인덱스 생성
-    # 데이터가 있으면 차원(dimension)을 구함
-    dim = embeddings.shape[1]
 
-    # L2(유클리드 거리) 기반 인덱스 생성
-    index = faiss.IndexFlatL2(dim)
+def update_index_from_folder(
+    folder_path: str,
+    client: OpenAI,
+    index=None,
+    chunks: dict | None = None,
+    metadatas: dict | None = None,
+    manifest: dict | None = None,
+    files: dict | None = None,
+    vector_store: tuple | None = None,
+    progress_callback=None,
+):
+    # 파일별 해시를 비교해 추가/변경 파일만 임베딩하고 삭제된 파일의 벡터는 제거
+    # 청크 ID 는 파일 단위로 고정 부여되므로 다른 파일의 벡터는 건드리지 않음
+    # vector_store: (청크 ID 배열, float32 벡터 행렬) — 인덱스 학습/재생성의 원본
+    chunks = chunks if chunks is not None else {}
+    metadatas = metadatas if metadatas is not None else {}
+    stored_files = (manifest or {}).get("files", {})
+    next_id = (manifest or {}).get("next_id", 0)
+    index_type = configured_index_type()
+    if (manifest or {}).get("index_type") != index_type:
+        index = None
 
-    # 0부터 순차적 ID 자동 부여
-    index.add(embeddings)  # type: ignore
+    if files is None:
+        files = scan_files(folder_path, list_pdf_files(folder_path), stored_files)
 
-    return index, all_chunks, metadatas
+    added, changed, deleted = diff_files(stored_files, files)
+    print(
+        f"인덱스 갱신: 추가 {len(added)}개, 변경 {len(changed)}개, 삭제 {len(deleted)}개"
+    )
 
+    vector_ids, vectors = vector_store if vector_store is not None else (None, None)
 
-@st.cache_data(show_spinner=False)
-def extract_text_from_pdf(file_bytes: bytes):
+    # 삭제/변경 파일의 기존 벡터 제거 (원본 벡터 저장소에서는 마지막 병합 때 제외)
+    stale_ids = []
+    for rel in changed + deleted:
+        stale_ids.extend(stored_files[rel].get("chunk_ids", []))
+    if stale_ids and index is not None:
+        if supports_remove(index_type):
+            index.remove_ids(np.array(stale_ids, dtype="int64"))
+        else:
+            # 삭제를 지원하지 않는 인덱스(HNSW)는 남은 벡터로 재생성
+            index = None
+    for i in stale_ids:
+        chunks.pop(i, None)
+        metadatas.pop(i, None)
+
+    new_files = {
+        rel: info
+        for rel, info in stored_files.items()
+        if rel not in changed and rel not in deleted
+    }
+
+    # 추가/변경 파일만 OCR → 청킹 → 임베딩 → 인덱스 기록 (스테이지 병렬 처리)
+    # 기존 인덱스가 있으면 바로 추가하고, 없으면 벡터만 모아 마지막에 학습/생성
+    # 신규 벡터는 배치가 도착할 때마다 임시 파일에 기록 (메모리에는 ID 만 유지)
+    spool = _VectorSpool()
+    # 파일별 분류(하위 폴더)와 공표일(파일명)
+    doc_metas = {
+        os.path.join(folder_path, rel): document_metadata(rel)
+        for rel in added + changed
+    }
+
+    # 비용 산정용: 새로 임베딩한 토큰 수, 새로 OCR 한 페이지 수(캐시 적중 제외)
+    embedding_tokens = 0
+    ocr_pages_before = get_ocr_cache().ocr_pages
+
+    def add_vectors(ids, texts, metas, embeddings):
+        nonlocal embedding_tokens
+        embedding_tokens += sum(count_tokens(t) for t in texts)
+        id_array = np.array(ids, dtype="int64")
+        if index is not None:
+            index.add_with_ids(embeddings, id_array)
+        spool.append(id_array, embeddings)
+        for i, ch, meta in zip(ids, texts, metas):
+            chunks[i] = ch
+            metadatas[i] = {**meta, **doc_metas.get(meta["source_file"], {})}
+
+    jobs = [(rel, os.path.join(folder_path, rel)) for rel in added + changed]
+    _report_progress(
+        progress_callback,
+        stage="ingest",
+        files_total=len(jobs),
+        files_done=0,
+        chunks_embedded=0,
+    )
+    result = ingest_files(
+        jobs,
+        client,
+        ocr_fn=read_pdf_pages,
+        chunk_fn=get_chunker(),
+        on_vectors=add_vectors,
+        next_id=next_id,
+        progress_callback=progress_callback,
+    )
+    next_id = result["next_id"]
+
+    # 임베딩이 일부 실패한 파일은 기록된 벡터를 되돌리고 매니페스트에서 제외 (다음 갱신 때 재시도)
+    rollback_ids = np.array(result["rollback_ids"], dtype="int64")
+    if len(rollback_ids) and index is not None:
+        if supports_remove(index_type):
+            index.remove_ids(rollback_ids)
+        else:
+            index = None
+
+    # 원본 벡터 저장소에 신규 벡터 병합 (삭제·되돌린 벡터 제외, ID 오름차순 유지)
+    n_embedded = len(spool)
+    vector_ids, vectors = _merge_vector_store(
+        [(vector_ids, vectors), spool.arrays()],
+        np.concatenate([np.array(stale_ids, dtype="int64"), rollback_ids]),
+    )
+    for i in result["rollback_ids"]:
+        chunks.pop(i, None)
+        metadatas.pop(i, None)
+
+    for rel, ids in result["completed"].items():
+        new_files[rel] = {**files[rel], "chunk_ids": ids}
+
+    if vector_ids is None or not chunks:
+        print("경고: 처리할 텍스트 청크가 없습니다.")
+        return None, {}, {}, None, None
+
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    if index is None:
+        index = build_index(index_type, vectors, vector_ids)
+    apply_search_params(index)
+
+    last_ingest = {
+        "files_added": len(added),
+        "files_changed": len(changed),
+        "files_deleted": len(deleted),
+        "files_failed": len(result["failed"]),
+        "chunks_embedded": n_embedded - len(rollback_ids),
+        "embedding_tokens": embedding_tokens,
+        "ocr_pages": get_ocr_cache().ocr_pages - ocr_pages_before,
+        "wall_sec": result["wall_sec"],
+        "stages": result["stages"],
+    }
+    new_manifest = build_manifest(
+        new_files,
+        index_params(),
+        len(chunks),
+        index.d,
+        next_id=next_id,
+        index_type=index_type,
+        last_ingest=last_ingest,
+    )
+    return index, chunks, metadatas, new_manifest, (vector_ids, vectors)
+
+
+def read_pdf_pages(path: str):
+    with open(path, "rb") as f:
+        file_bytes = f.read()
+    return extract_pages_from_pdf(file_bytes)
+
+
+_ocr_cache = None
+_ocr_cache_lock = threading.Lock()
+
+
+def get_ocr_cache():
+    global _ocr_cache
+    with _ocr_cache_lock:
+        if _ocr_cache is None:
+            _ocr_cache = OcrCache()
+    return _ocr_cache
+
+
+def ocr_pdf_pages(file_bytes: bytes, model: str = OCR_MODEL):
     api_key = UPSTAGE_API_KEY
     url = "https://api.upstage.ai/v1/document-digitization"
     headers = {"Authorization": f"Bearer {api_key}"}
     files = {"document": ("document.pdf", file_bytes, "application/pdf")}
-    data = {"model": "ocr"}
+    data = {"model": model}
     response = requests.post(url, headers=headers, files=files, data=data)
+    # 실패 응답은 캐시에 남지 않도록 예외로 처리
+    response.raise_for_status()
     result = response.json()
-    pages = result.get("pages", [])
-    texts = [p.get("text", "").strip() for p in pages if p.get("text")]
-    if not texts:
-        for p in pages:
-            words = [w.get("text", "") for w in p.get("words", [])]
-            texts.append(" ".join(words))
-    full_text = "\n\n".join(texts)
+
+    pages = []
+    for n, p in enumerate(result.get("pages", []), 1):
+        pages.append(
+            {
+                "page": p.get("id", n),
+                "text": p.get("text", ""),
+                "words": [
+                    {"text": w.get("text", ""), "boundingBox": w.get("boundingBox")}
+                    for w in p.get("words", [])
+                ],
+            }
+        )
+    return pages
+
+
+def extract_pages_from_pdf(file_bytes: bytes, model: str = OCR_MODEL):
+    # 동일 파일(SHA-256)·모델 조합은 디스크 캐시에서 바로 반환
+    cache = get_ocr_cache()
+    sha256 = cache.hash_bytes(file_bytes)
+    pages = cache.get(sha256, model)
+    if pages is None:
+        pages = ocr_pdf_pages(file_bytes, model)
+        cache.put(sha256, model, pages)
+    return pages
+
+
+def pages_to_text(pages: list):
+    full_text = "\n\n".join(text for _, text in page_texts(pages))
     return full_text
 
 
+def extract_text_from_pdf(file_bytes: bytes):
+    return pages_to_text(extract_pages_from_pdf(file_bytes))
+
+
 def chunk_text(text, chunk_size=500, overlap=100):
     chunks = []
     start = 0
@@ -98,14 +462,11 @@ def chunk_text(text, chunk_size=500, overlap=100):
 
 
 def get_embedding(text, client: OpenAI):
-    res = client.embeddings.create(model="text-embedding-3-small", input=text)
-    return np.array(res.data[0].embedding, dtype="float32")
+    return embed_text(text, client)
 
 
 def build_faiss_index(chunks, client: OpenAI):
-    embeddings = np.array([get_embedding(ch, client) for ch in chunks]).astype(
-        "float32"
-    )
+    embeddings = embed_texts(chunks, client)
     dim = embeddings.shape[1]
     index = faiss.IndexFlatL2(dim)
     index.add(embeddings)  # type: ignore
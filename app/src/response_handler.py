@@ -6,10 +6,10 @@ from datetime import datetime
 import os
 from openai import OpenAI
 
-from src.agent_core import get_response
+from src.agent_core import get_response, update_context_summary
 from components.chat_renderer import render_tool_data_for_display
 from src.session_manager import save_new_session_items
-from src.config import SESSION_DIR
+from src.config import SESSION_DIR, LLM_STREAMING
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +33,7 @@ def handle_user_query(
     metadatas: list,
     user_id: str,
     session_file: str | None,
+    lexical_index=None,
 ):
     # 사용자 메시지 버블
     _session_file = session_file
@@ -56,12 +57,29 @@ def handle_user_query(
         # 이 assistant 버블 안에서만 쓰는 placeholder
         status_placeholder = st.empty()
         timer_placeholder = st.empty()
+        # 도구 결과는 답변 위에 표시되도록 자리를 먼저 잡아 둠
+        tool_container = st.container()
+        answer_placeholder = st.empty()
 
         # core에서 상태 업데이트 요청이 오면 이 버블 안에 표시
         def status_callback(text: str, ph=status_placeholder):
             ph.markdown(text)
 
         start_time = time.time()
+        # 스트리밍 중인 답변 (Judge 재생성 시 "reset" 으로 비우고 새 답변을 다시 받음)
+        # 첫 토큰 시각도 함께 지워 최종 답변 스트림의 첫 토큰 기준으로 기록
+        streamed = {"text": "", "first_token_at": None}
+
+        def stream_callback(kind: str, text: str, ph=answer_placeholder):
+            if kind == "reset":
+                streamed["text"] = ""
+                streamed["first_token_at"] = None
+                ph.empty()
+                return
+            if streamed["first_token_at"] is None:
+                streamed["first_token_at"] = time.time()
+            streamed["text"] += text
+            ph.markdown(streamed["text"] + "▌")
 
         user_id = st.session_state["user_id"]
 
@@ -74,17 +92,29 @@ def handle_user_query(
                 index=index,
                 chunks=chunks,
                 metadatas=metadatas,
+                lexical_index=lexical_index,
                 session=st.session_state.get("session", []),
                 status_callback=status_callback,
+                stream_callback=stream_callback if LLM_STREAMING else None,
             )
 
-        # 결과 저장 및 출력
         # 최신 세션 session_state에 저장
         st.session_state["session"] = new_session
-        # 파일에 세션 히스토리 저장
-        save_new_session_items(new_session, previous_session_size, _session_file)
 
         elapsed = time.time() - start_time
+        # 첫 토큰까지 걸린 시간 (체감 지연)과 전체 처리 시간을 따로 기록
+        ttft = (
+            streamed["first_token_at"] - start_time
+            if streamed["first_token_at"] is not None
+            else None
+        )
+        logger.info(
+            f"⏱️ 응답 완료: 전체 {elapsed:.2f}초"
+            + (f", 첫 토큰 {ttft:.2f}초" if ttft is not None else "")
+        )
+        timing = f"처리 시간: 약 {elapsed:.1f}초"
+        if ttft is not None:
+            timing = f"첫 토큰 {ttft:.1f}초 · " + timing
 
         # 처리 시간 표시
         timer_placeholder.markdown(
@@ -97,8 +127,8 @@ def handle_user_query(
                 padding:4px 10px;
                 border-radius:8px;
                 margin:0 0 6px 0;
-                max-width:180px;
-            ">⏱️ 처리 시간: 약 {elapsed:.1f}초</div>
+                max-width:260px;
+            ">⏱️ {timing}</div>
             """,
             unsafe_allow_html=True,
         )
@@ -111,7 +141,21 @@ def handle_user_query(
                     tool_data = json.loads(content)
                 except Exception:
                     tool_data = content
-                render_tool_data_for_display(tool_name, tool_data)
+                with tool_container:
+                    render_tool_data_for_display(tool_name, tool_data)
+
+        # 최종 답변 출력 (스트리밍한 내용을 최종 답변으로 교체)
+        answer_placeholder.markdown(reply)
+
+        # 파일에 이번 턴 세션 히스토리를 먼저 저장 (요약이 실패해도 턴은 남김)
+        save_new_session_items(new_session, previous_session_size, _session_file)
 
-        # 최종 답변 출력
-        st.markdown(reply)
+        # 답변을 화면에 보낸 뒤 이전 대화 요약 갱신
+        # 처리 시간·첫 토큰 측정에는 빠지지만, 요약 호출이 끝나야 다음 질문을 받음
+        summary_start = len(new_session)
+        try:
+            update_context_summary(client, new_session)
+        except Exception as e:
+            logger.warning(f"이전 대화 요약 갱신 실패 (다음 턴에 발췌 요약 사용): {e}")
+        else:
+            save_new_session_items(new_session, summary_start, _session_file)
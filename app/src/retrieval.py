@@ -0,0 +1,264 @@
+import numpy as np
+from openai import OpenAI
+
+from src.config import (
+    RAG_SEARCH_MODE,
+    RAG_RRF_K,
+    RAG_FILTER_SCAN_MAX,
+    RAG_RESCORE_FACTOR,
+    RAG_DIVERSITY,
+    RAG_DIVERSITY_FETCH,
+    RAG_MMR_LAMBDA,
+    RAG_DEDUP_THRESHOLD,
+    RAG_MERGE_ADJACENT,
+)
+from src.diversity import (
+    cosine_relevance,
+    mmr_select,
+    dedup_select,
+    join_overlapping,
+    merge_adjacent_top_k,
+)
+from src.doc_metadata import parse_date_bound, format_date
+from src.embedding_cache import embed_queries
+from src.index_factory import (
+    search_with_ids,
+    reconstruct_vectors,
+    rescore_exact,
+    stores_exact_vectors,
+)
+from src.lexical_index import is_keyword_query, reciprocal_rank_fusion
+
+FILTER_KEYS = ("category", "date_from", "date_to", "source_file")
+
+
+def search_documents(
+    client: OpenAI,
+    requests: list,
+    index,
+    chunks,
+    metadatas,
+    lexical_index=None,
+):
+    # 여러 문서 검색 요청을 한 번에 처리: 질의 임베딩 1회 요청 + 인덱스 다중 행 검색 1회
+    # requests: [{"query", "top_k", "mode", "filters"}] → 요청 순서대로 결과 목록 반환
+    plans = [_plan_search(req, chunks, lexical_index) for req in requests]
+
+    pending = [p for p in plans if p["hits"] is None]
+    if pending:
+        q_embs = embed_queries([p["query"] for p in pending], client)
+        vector_hits = _vector_search_many(index, q_embs, chunks, pending)
+        for n, (plan, hits) in enumerate(zip(pending, vector_hits)):
+            if plan["mode"] == "hybrid":
+                # 두 검색기에서 후보를 넉넉히 가져온 뒤 순위만으로 결합 (점수 척도 차이 무관)
+                lexical_hits = lexical_index.search(
+                    plan["query"], plan["n_candidates"], plan["allowed"]
+                )
+                hits = reciprocal_rank_fusion(
+                    [[i for i, _ in hits], [i for i, _ in lexical_hits]], k=RAG_RRF_K
+                )
+            plan["hits"] = hits[: plan["fetch_k"]]
+            plan["q_emb"] = q_embs[n]
+
+    results = []
+    for plan in plans:
+        hits = diversify(plan, index, chunks, metadatas)
+        results.append(format_results(hits, chunks, metadatas, plan["mode"]))
+    return results
+
+
+def _plan_search(request: dict, chunks, lexical_index):
+    # mode: vector(임베딩 검색) / lexical(BM25, 임베딩 호출 없음) /
+    #       hybrid(두 결과를 RRF 로 결합) / auto(키워드형 질의는 lexical, 나머지는 hybrid)
+    # 임베딩 없이 끝나는 요청은 hits 를 바로 채우고, 나머지는 벡터 검색 대상으로 남김
+    # 다양화·인접 청크 병합이 켜져 있으면 top_k * RAG_DIVERSITY_FETCH 개 후보를 가져옴
+    query = request["query"]
+    top_k = int(request.get("top_k") or 3)
+    mode = request.get("mode") or RAG_SEARCH_MODE
+    if lexical_index is None or not len(lexical_index):
+        mode = "vector"
+    fetch_k = (
+        top_k * max(RAG_DIVERSITY_FETCH, 1)
+        if RAG_DIVERSITY != "off" or RAG_MERGE_ADJACENT
+        else top_k
+    )
+
+    plan = {
+        "query": query,
+        "top_k": top_k,
+        "fetch_k": fetch_k,
+        "mode": mode,
+        "allowed": filter_mask(chunks, request.get("filters")),
+        "n_candidates": fetch_k,
+        "hits": None,
+        "q_emb": None,
+    }
+    if plan["allowed"] is not None and not plan["allowed"].any():
+        plan["hits"] = []
+        return plan
+
+    if mode == "auto":
+        if is_keyword_query(query):
+            hits = lexical_index.search(query, fetch_k, plan["allowed"])
+            if hits:
+                plan["hits"] = hits
+                plan["mode"] = "lexical"
+                return plan
+        mode = plan["mode"] = "hybrid"
+
+    if mode == "lexical":
+        hits = lexical_index.search(query, fetch_k, plan["allowed"])
+        if hits:
+            plan["hits"] = hits
+            return plan
+        # BM25 결과가 없으면 벡터 검색으로 대체
+        mode = "vector"
+    if mode == "hybrid":
+        plan["n_candidates"] = max(fetch_k, top_k * 4, 20)
+    else:
+        plan["mode"] = "vector"
+    return plan
+
+
+def filter_mask(chunks, filters: dict | None):
+    filters = {k: v for k, v in (filters or {}).items() if v}
+    if not filters:
+        return None
+    if not hasattr(chunks, "select"):
+        print(
+            "메타데이터 필터를 지원하지 않는 청크 저장소입니다. 필터 없이 검색합니다."
+        )
+        return None
+    return chunks.select(
+        category=filters.get("category"),
+        date_from=parse_date_bound(filters.get("date_from")),
+        date_to=parse_date_bound(filters.get("date_to"), end=True),
+        source_file=filters.get("source_file"),
+    )
+
+
+def _rescore_factor(index, chunks) -> int:
+    # 양자화 인덱스이고 원본 벡터가 있을 때만 재계산
+    if RAG_RESCORE_FACTOR <= 1 or getattr(chunks, "vectors", None) is None:
+        return 0
+    return 0 if stores_exact_vectors(index) else RAG_RESCORE_FACTOR
+
+
+def _search_index(index, queries: np.ndarray, k: int, chunks, ids=None):
+    # ids 가 있으면 해당 ID 만 후보로 검색, 양자화 인덱스는 후보를 늘려 원본 벡터로 재계산
+    factor = _rescore_factor(index, chunks)
+    search_k = k * factor if factor else k
+    if ids is None:
+        dist, found = index.search(queries, search_k)
+    else:
+        dist, found = search_with_ids(index, queries, search_k, ids)
+    if factor:
+        dist, found = rescore_exact(queries, found, chunks.vectors, chunks.ids, k)
+    return dist, found
+
+
+def _vector_search_many(index, q_embs: np.ndarray, chunks, plans: list):
+    # 필터가 없는 질의들은 한 번의 다중 행 index.search 로, 필터가 있는 질의는 개별 검색
+    ks = [p["n_candidates"] for p in plans]
+    results = [None] * len(plans)
+    unfiltered = [n for n, p in enumerate(plans) if p["allowed"] is None]
+    if unfiltered:
+        k = max(ks[n] for n in unfiltered)
+        dist, ids = _search_index(
+            index, np.ascontiguousarray(q_embs[unfiltered]), k, chunks
+        )
+        for row, n in enumerate(unfiltered):
+            hits = [(int(i), float(d)) for d, i in zip(dist[row], ids[row]) if i != -1]
+            results[n] = hits[: ks[n]]
+
+    for n, plan in enumerate(plans):
+        if results[n] is None:
+            results[n] = _filtered_vector_search(
+                index, q_embs[n : n + 1], ks[n], chunks, plan["allowed"]
+            )
+    return results
+
+
+def _filtered_vector_search(index, q_emb: np.ndarray, top_k: int, chunks, allowed):
+    rows = np.flatnonzero(allowed)
+    vectors = getattr(chunks, "vectors", None)
+    if vectors is not None and len(rows) <= RAG_FILTER_SCAN_MAX:
+        # 좁혀진 청크의 원본 벡터만 읽어 L2 거리를 직접 계산
+        candidates = np.asarray(vectors[rows], dtype="float32")
+        dist = ((candidates - q_emb) ** 2).sum(axis=1)
+        order = np.argsort(dist)[:top_k]
+        return [(int(chunks.ids[rows[o]]), float(dist[o])) for o in order]
+
+    dist, ids = _search_index(index, q_emb, top_k, chunks, chunks.ids[rows])
+    return [(int(i), float(d)) for d, i in zip(dist[0], ids[0]) if i != -1]
+
+
+def candidate_vectors(index, chunks, ids: list):
+    # 보관 중인 float32 원본 벡터(청크 저장소와 같은 ID 순서)를 우선 사용하고,
+    # 없으면 인덱스에서 복원 (둘 다 불가하면 None)
+    vectors = getattr(chunks, "vectors", None)
+    if vectors is not None:
+        rows = np.searchsorted(chunks.ids, ids)
+        return np.asarray(vectors[rows], dtype="float32")
+    try:
+        return reconstruct_vectors(index, np.array(ids))
+    except RuntimeError as e:
+        print(f"후보 벡터 복원 실패, 다양화 없이 반환합니다: {e}")
+        return None
+
+
+def diversity_order(relevance: np.ndarray, vectors: np.ndarray, k: int):
+    # 후보 순위 위치 목록 (RAG_DIVERSITY=off 또는 알 수 없는 값이면 상위 k 그대로)
+    if RAG_DIVERSITY == "mmr":
+        return mmr_select(relevance, vectors, k, RAG_MMR_LAMBDA)
+    if RAG_DIVERSITY == "dedup":
+        return dedup_select(vectors, k, RAG_DEDUP_THRESHOLD)
+    return list(range(min(k, len(relevance))))
+
+
+def diversify(plan: dict, index, chunks, metadatas):
+    # 과다 수집한 후보를 중복이 적은 순서로 다시 정렬한 뒤 top_k 를 고르고,
+    # 인접 청크 병합이 켜져 있으면 같은 파일의 연속 청크를 묶되 top_k 묶음이 되도록 후보를 더 씀
+    # 반환: [([청크 ID...], 점수)]
+    hits = plan["hits"]
+    top_k = plan["top_k"]
+    if len(hits) > top_k and RAG_DIVERSITY != "off":
+        ids = [i for i, _ in hits]
+        vectors = candidate_vectors(index, chunks, ids)
+        if vectors is not None:
+            if plan["q_emb"] is not None:
+                relevance = cosine_relevance(plan["q_emb"], vectors)
+            else:
+                # 임베딩 없이 검색한 lexical 결과는 순위로 관련도를 대신함
+                relevance = 1.0 - np.arange(len(hits)) / len(hits)
+            hits = [hits[j] for j in diversity_order(relevance, vectors, len(hits))]
+
+    if RAG_MERGE_ADJACENT:
+        return merge_adjacent_top_k(hits, top_k, metadatas)
+    return [([i], score) for i, score in hits[:top_k]]
+
+
+def format_results(groups, chunks, metadatas, retrieval: str):
+    # groups: [([청크 ID...], 점수)] — 여러 ID 는 같은 파일의 연속 청크로, 텍스트를 이어 붙임
+    # score: vector 는 L2 거리(작을수록 유사), lexical 은 BM25, hybrid 는 RRF 점수(클수록 유사)
+    results = []
+    for ids, score in groups:
+        meta = metadatas[ids[0]]
+        text = chunks[ids[0]]
+        for i in ids[1:]:
+            text = join_overlapping(text, chunks[i])
+        page = meta.get("page", 0)
+        page_end = metadatas[ids[-1]].get("page_end", page)
+        results.append(
+            {
+                "text": text,
+                "source_file": meta["source_file"],
+                "page": page,
+                "page_end": page_end,
+                "category": meta.get("category", ""),
+                "date": format_date(meta.get("date", 0)),
+                "score": score,
+                "retrieval": retrieval,
+            }
+        )
+    return results
@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import threading
+
+from openai import OpenAI
+
+from src.config import (
+    OPENAI_API_KEY,
+    RAG_INDEX_DIR,
+    RAG_SERVICE_SOCKET,
+    RAG_SERVICE_TIMEOUT,
+)
+from src.index_store import current_version_dir, load_shared_index
+from src.retrieval import search_documents
+
+# 로컬 검색 서비스: 미리 생성된 아티팩트를 한 프로세스만 열고,
+# 각 Streamlit 레플리카는 Unix 소켓으로 검색 요청만 보냄
+# 프로토콜: 한 줄짜리 JSON 요청 {"requests": [...]} → 한 줄짜리 JSON 응답 {"results": [...]} | {"error"}
+
+
+class SharedIndex:
+    # CURRENT 포인터가 바뀌면 (새 버전 배포) 다음 요청에서 새 버전으로 교체
+
+    def __init__(self, artifact_dir: str = RAG_INDEX_DIR):
+        self.artifact_dir = artifact_dir
+        self.version_dir = None
+        self.loaded = (None, [], [], None)
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        version_dir = current_version_dir(self.artifact_dir)
+        if version_dir == self.version_dir:
+            return self.loaded
+        with self._lock:
+            if version_dir != self.version_dir:
+                self.loaded = load_shared_index(self.artifact_dir)
+                self.version_dir = version_dir
+                print(f"검색 서비스 인덱스 로드: {version_dir}")
+        return self.loaded
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                requests = json.loads(line)["requests"]
+                index, chunks, metadatas, lexical_index = self.server.shared.refresh()
+                if index is None:
+                    raise RuntimeError("인덱스 아티팩트가 없습니다.")
+                results = search_documents(
+                    self.server.client,
+                    requests,
+                    index,
+                    chunks,
+                    metadatas,
+                    lexical_index,
+                )
+                response = {"results": results}
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write(
+                json.dumps(response, ensure_ascii=False, default=float).encode("utf-8")
+                + b"\n"
+            )
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path: str = RAG_SERVICE_SOCKET, artifact_dir: str = RAG_INDEX_DIR):
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+    with _Server(socket_path, _Handler) as server:
+        server.shared = SharedIndex(artifact_dir)
+        server.client = OpenAI(api_key=OPENAI_API_KEY)
+        print(f"검색 서비스 시작: {socket_path}")
+        try:
+            server.serve_forever()
+        finally:
+            os.remove(socket_path)
+
+
+# 다시 연결하면 성공할 수 있는 오류 (서비스 재시작 중 거부 / 끊긴 연결에 쓰기·읽기)
+RETRYABLE_ERRORS = (ConnectionRefusedError, ConnectionResetError, BrokenPipeError)
+
+
+class RetrievalClient:
+    # search_vector_store 가 인덱스 대신 받는 원격 핸들 (연결은 스레드별로 재사용)
+
+    def __init__(
+        self,
+        socket_path: str = RAG_SERVICE_SOCKET,
+        timeout: float = RAG_SERVICE_TIMEOUT,
+    ):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            conn = self._local.conn = (sock, sock.makefile("rb"))
+        return conn
+
+    def _close(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+
+    def search(self, requests: list):
+        payload = json.dumps({"requests": requests}, ensure_ascii=False) + "\n"
+        # 서비스 재시작 등으로 끊긴 연결만 한 번 다시 연결해 재시도
+        # (시간 초과 등 다른 오류는 같은 요청을 다시 보내지 않고 그대로 전달)
+        for attempt in range(2):
+            try:
+                sock, reader = self._connection()
+                sock.sendall(payload.encode("utf-8"))
+                line = reader.readline()
+                if not line:
+                    raise ConnectionResetError("검색 서비스 연결이 끊어졌습니다.")
+                break
+            except RETRYABLE_ERRORS:
+                self._close()
+                if attempt:
+                    raise
+            except OSError:
+                self._close()
+                raise
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(f"검색 서비스 오류: {response['error']}")
+        return response["results"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 RAG 검색 서비스 (Unix 소켓)")
+    parser.add_argument("--socket", default=RAG_SERVICE_SOCKET)
+    parser.add_argument("--artifact-dir", default=RAG_INDEX_DIR)
+    args = parser.parse_args(argv)
+    serve(args.socket, args.artifact_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,38 +1,78 @@
 import os
 import json
 import streamlit as st
-import time
 import logging
 from datetime import datetime
-from src.rag_pipeline import build_index_from_folder
+from src.config import (
+    RAG_INDEX_DIR,
+    RAG_SERVING_MODE,
+    RAG_SERVICE_SOCKET,
+    RAG_WARMUP_RETRY_SEC,
+)
+from src.index_store import current_version_dir, load_shared_index
+from src.index_warmup import IndexWarmup, EMPTY_RESOURCES
+from src.rag_pipeline import load_or_build_index
+from src.retrieval_service import RetrievalClient
 
 logger = logging.getLogger(__name__)
 
+# 세션 상태에 보관하는 RAG 리소스 키 (load_rag_resources 반환 순서)
+RAG_STATE_KEYS = ("index", "chunks", "metadatas", "lexical_index")
+
+
+@st.cache_resource(show_spinner=False)
+def _load_shared_index(artifact_dir: str, version_dir: str | None):
+    # version_dir 를 캐시 키에 포함해 새 버전이 배포되면 다음 세션부터 새로 로드
+    return load_shared_index(artifact_dir)
+
+
+def load_rag_resources(client, data_directory, progress_callback=None):
+    # RAG_SERVING_MODE 에 따라 (index, chunks, metadatas, lexical_index) 반환
+    # service 모드는 index 자리에 검색 서비스 클라이언트만 두고 나머지는 None
+    if RAG_SERVING_MODE == "service":
+        return RetrievalClient(RAG_SERVICE_SOCKET), None, None, None
+    if RAG_SERVING_MODE == "shared":
+        return _load_shared_index(RAG_INDEX_DIR, current_version_dir(RAG_INDEX_DIR))
+    if RAG_SERVING_MODE != "inprocess":
+        logger.warning(
+            f"알 수 없는 RAG_SERVING_MODE={RAG_SERVING_MODE}, inprocess 로 대체합니다."
+        )
+    return load_or_build_index(
+        data_directory, client, progress_callback=progress_callback
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_index_warmup(data_directory: str, _client) -> IndexWarmup:
+    # 프로세스당 하나: 첫 세션이 시작시키고 이후 세션은 진행 중인 워밍업을 함께 봄
+    # 실패해도 캐시는 그대로 두고 initialize_rag_index 에서 retry_if_failed 로 다시 시작
+    return IndexWarmup(
+        lambda progress: load_rag_resources(_client, data_directory, progress)
+    ).start()
+
 
 def initialize_rag_index(client, data_directory):
-    index = st.session_state.get("index", None)
-    chunks = st.session_state.get("chunks", None)
-    metadatas = st.session_state.get("metadatas", None)
-
-    if "index" not in st.session_state:
-        logger.info("RAG 인덱스 로드 중...")
-        with st.spinner("📚 임베딩된 문서를 불러오는 중입니다..."):
-            start_time = time.time()
-            try:
-                index, chunks, metadatas = build_index_from_folder(
-                    data_directory, client
-                )
-                st.session_state["index"] = index
-                st.session_state["chunks"] = chunks
-                st.session_state["metadatas"] = metadatas
-                logger.info(
-                    f"RAG 인덱스 로드 완료. 시간: {time.time() - start_time:.2f}초"
-                )
-            except Exception as e:
-                st.error(f"RAG 인덱스 로드 실패: {e}")
-                logger.error(f"RAG 인덱스 로드 실패: {e}")
-
-    return index, chunks, metadatas
+    # inprocess 모드는 인덱스 로드/생성을 백그라운드로 돌리고 페이지를 막지 않음
+    # 준비 전에는 빈 리소스를 돌려주어 문서 검색 없이 답변하고,
+    # 준비가 끝나면 다음 실행부터 네 리소스가 한 번에 바뀜
+    resources = EMPTY_RESOURCES
+    if RAG_SERVING_MODE in ("shared", "service"):
+        st.session_state.pop("rag_warmup", None)
+        try:
+            resources = load_rag_resources(client, data_directory)
+        except Exception as e:
+            st.error(f"RAG 인덱스 로드 실패: {e}")
+            logger.error(f"RAG 인덱스 로드 실패: {e}")
+    else:
+        warmup = get_index_warmup(data_directory, client).retry_if_failed(
+            RAG_WARMUP_RETRY_SEC
+        )
+        st.session_state["rag_warmup"] = warmup
+        resources = warmup.resources()
+
+    for key, value in zip(RAG_STATE_KEYS, resources):
+        st.session_state[key] = value
+    return resources
 
 
 def load_session_from_file(filepath):
@@ -0,0 +1,110 @@
+import json
+import os
+
+from src.config import (
+    TOOL_RESULT_MAX_CHARS,
+    COMPACT_LAW_HITS,
+    COMPACT_DOC_EXCERPT_CHARS,
+)
+
+# 도구 결과를 크기가 제한된 요약본으로 변환 (Judge 입력·다음 턴·세션 파일용)
+# 원본 결과는 트레이스 저장소에 따로 보관
+
+# 법령해석례 검색 결과에서 남길 항목
+LAW_FIELDS = (
+    "안건명",
+    "안건번호",
+    "질의기관명",
+    "회신기관명",
+    "회신일자",
+    "법령해석례상세링크",
+)
+NEWS_TITLE_CHARS = 120
+
+
+def _truncate(text, limit: int) -> str:
+    text = str(text or "")
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def _compact_law(result):
+    # {"Expc": {"totalCnt": N, "expc": [...] 또는 {...}}} → 건수 + 상위 사례 주요 항목
+    if not isinstance(result, dict) or "error" in result:
+        return _compact_error(result)
+    body = result.get("Expc") or {}
+    hits = body.get("expc") or []
+    if isinstance(hits, dict):
+        hits = [hits]
+    return {
+        "total": body.get("totalCnt", len(hits)),
+        "hits": [
+            {field: hit[field] for field in LAW_FIELDS if hit.get(field)}
+            for hit in hits[:COMPACT_LAW_HITS]
+            if isinstance(hit, dict)
+        ],
+    }
+
+
+def _compact_news(result):
+    if not isinstance(result, dict) or "error" in result:
+        return _compact_error(result)
+    return {
+        "topic": result.get("topic"),
+        "headlines": [
+            _truncate(title, NEWS_TITLE_CHARS) for title in result.get("headlines", [])
+        ],
+    }
+
+
+def _compact_documents(result):
+    # 청크 본문은 앞부분만, 출처(파일·페이지·날짜)는 그대로 유지
+    if not isinstance(result, list):
+        return _compact_error(result)
+    compact = []
+    for item in result:
+        if not isinstance(item, dict):
+            continue
+        page, page_end = item.get("page"), item.get("page_end")
+        compact.append(
+            {
+                "text": _truncate(item.get("text"), COMPACT_DOC_EXCERPT_CHARS),
+                "source_file": item.get("source_file"),
+                "source": os.path.basename(item.get("source_file") or ""),
+                "page": (
+                    page
+                    if page == page_end or page_end is None
+                    else f"{page}-{page_end}"
+                ),
+                "date": item.get("date", ""),
+            }
+        )
+    return compact
+
+
+def _compact_error(result):
+    if isinstance(result, dict) and "error" in result:
+        return {"error": _truncate(result["error"], 300)}
+    return _compact_generic(result)
+
+
+def _compact_generic(result):
+    # 이미 잘라 낸 미리보기는 그대로 (감싼 키 때문에 상한을 넘어도 다시 감싸지 않음)
+    if isinstance(result, dict) and result.get("truncated") is True:
+        return result
+    text = json.dumps(result, ensure_ascii=False, default=str)
+    if len(text) <= TOOL_RESULT_MAX_CHARS:
+        return result
+    return {"truncated": True, "preview": text[:TOOL_RESULT_MAX_CHARS]}
+
+
+COMPACTORS = {
+    "search_korean_law": _compact_law,
+    "get_news": _compact_news,
+    "search_vector_store": _compact_documents,
+}
+
+
+def compact_tool_result(func_name: str, result):
+    compact = COMPACTORS.get(func_name, _compact_generic)(result)
+    # 도구별 요약 후에도 상한을 넘으면 일반 규칙으로 한 번 더 자름
+    return _compact_generic(compact)
@@ -1,28 +1,53 @@
 import json
-import numpy as np
+import re
+import unicodedata
+import httpx
 import requests
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from typing import Optional
 
 from src.personal_memory import MemoryManager
 from src.config import NEWS_API_KEY, KOREAN_LAW_OC
+from src.embedding import embed_text
+from src.retrieval import search_documents
+from src.retrieval_service import RetrievalClient
 from src.prompts import (
     CLASSIFY_PROMPT_TEMPLATE,
     PLAN_PROMPT_TEMPLATE,
     JUDGE_PROMPT_TEMPLATE,
     POLICY_SAFETY_PROMPT_TEMPLATE,
+    ROUTE_AND_PLAN_PROMPT_TEMPLATE,
 )
+from src.agent_constants import ROUTE_AND_PLAN_SCHEMA
 
+LAW_SEARCH_URL = "http://www.law.go.kr/DRF/lawSearch.do"
 
-def get_news(topic: str):
-    url = f"https://newsapi.org/v2/everything?q={topic}&sortBy=publishedAt&apiKey={NEWS_API_KEY}&language=ko"
-    r = requests.get(url)
+
+def _news_url(topic: str) -> str:
+    return f"https://newsapi.org/v2/everything?q={topic}&sortBy=publishedAt&apiKey={NEWS_API_KEY}&language=ko"
+
+
+def _news_result(topic: str, r):
+    # requests / httpx 응답 공통 처리
     if r.status_code != 200:
         return {"error": "뉴스 정보를 가져올 수 없습니다."}
     arts = r.json().get("articles", [])[:5]
     return {"topic": topic, "headlines": [a["title"] for a in arts]}
 
 
+def get_news(topic: str):
+    r = requests.get(_news_url(topic))
+    return _news_result(topic, r)
+
+
+async def get_news_async(topic: str, http: httpx.AsyncClient):
+    try:
+        r = await http.get(_news_url(topic), timeout=10)
+    except httpx.HTTPError:
+        return {"error": "뉴스 정보를 가져올 수 없습니다."}
+    return _news_result(topic, r)
+
+
 def search_korean_law(
     query: str,
     search: int = 1,  # 검색범위 (기본 : 1 법령해석례명) 2 : 본문검색
@@ -33,7 +58,35 @@ def search_korean_law(
     regYd: str | None = None,  # 등록일자 검색(20090101~20090130)
     explYd: str | None = None,  # 해석일자 검색(20090101~20090130)
 ):
-    base_url = "http://www.law.go.kr/DRF/lawSearch.do"
+    params = _law_params(query, search, inq, rpl, gana, itmno, regYd, explYd)
+    try:
+        r = requests.get(LAW_SEARCH_URL, params=params, timeout=10)
+        return _law_result(r, params)
+    except requests.RequestException as e:
+        return {"error": f"요청 중 오류 발생: {e}", "params": params}
+
+
+async def search_korean_law_async(
+    http: httpx.AsyncClient,
+    query: str,
+    search: int = 1,
+    inq: str | None = None,
+    rpl: str | None = None,
+    gana: str | None = None,
+    itmno: str | None = None,
+    regYd: str | None = None,
+    explYd: str | None = None,
+):
+    # search_korean_law 와 같은 인자/결과, httpx 비동기 요청
+    params = _law_params(query, search, inq, rpl, gana, itmno, regYd, explYd)
+    try:
+        r = await http.get(LAW_SEARCH_URL, params=params, timeout=10)
+        return _law_result(r, params)
+    except httpx.HTTPError as e:
+        return {"error": f"요청 중 오류 발생: {e}", "params": params}
+
+
+def _law_params(query, search, inq, rpl, gana, itmno, regYd, explYd):
     params = {
         "OC": KOREAN_LAW_OC,
         "target": "expc",
@@ -52,28 +105,38 @@ def search_korean_law(
     for key, value in optional_params.items():
         if value is not None:
             params[key] = value
+    return params
+
+
+def _law_result(r, params: dict):
+    # requests / httpx 응답 공통 처리
+    if r.status_code != 200:
+        return {"error": f"HTTP 오류: {r.status_code}", "params": params}
     try:
-        r = requests.get(base_url, params=params, timeout=10)
-        if r.status_code != 200:
-            return {"error": f"HTTP 오류: {r.status_code}", "params": params}
-        try:
-            data = r.json()
-        except ValueError:
-            return {"error": "JSON 파싱 실패", "raw": r.text, "params": params}
-        return data
-    except requests.RequestException as e:
-        return {"error": f"요청 중 오류 발생: {e}", "params": params}
+        return r.json()
+    except ValueError:
+        return {"error": "JSON 파싱 실패", "raw": r.text, "params": params}
 
 
-def llm_as_a_judge(content, client: OpenAI):
-    judge_directive = JUDGE_PROMPT_TEMPLATE
-    judge_session = [
-        {"role": "system", "content": judge_directive},
+def _judge_messages(content):
+    return [
+        {"role": "system", "content": JUDGE_PROMPT_TEMPLATE},
         {"role": "user", "content": content},
     ]
+
+
+def llm_as_a_judge(content, client: OpenAI):
     judge_response = client.chat.completions.create(
         model="gpt-4o-mini",
-        messages=judge_session,
+        messages=_judge_messages(content),
+    )
+    return judge_response.choices[0].message.content
+
+
+async def llm_as_a_judge_async(content, aclient: AsyncOpenAI):
+    judge_response = await aclient.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=_judge_messages(content),
     )
     return judge_response.choices[0].message.content
 
@@ -88,71 +151,156 @@ def get_current_datetime():
     return f"{now.year}년 {now.month}월 {now.day}일 {ampm} {hour_12}시 {now.minute}분"
 
 
-def plan_from_user_query(raw_query: str, client: OpenAI):
-    prompt = PLAN_PROMPT_TEMPLATE.format(raw_query=raw_query)
-    res = client.chat.completions.create(
-        model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}]
-    )
-    text = res.choices[0].message.content
+def _parse_json(text, default: dict):
     try:
         if not text:
             raise ValueError("Empty response from LLM")
-        plan = json.loads(text)
+        return json.loads(text)
     except Exception:
-        plan = {"refine_question": raw_query, "intention": "일반질문", "tool_plan": []}
-    return plan
+        return default
 
 
-def check_policy_and_safety(user_query: str, answer: str, client: OpenAI):
-    prompt = POLICY_SAFETY_PROMPT_TEMPLATE.format(user_query=user_query, answer=answer)
+def _mini_completion(client: OpenAI, prompt: str):
     res = client.chat.completions.create(
         model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}]
     )
-    text = res.choices[0].message.content
-    try:
-        if not text:
-            raise ValueError("Empty response from LLM")
-        data = json.loads(text)
-    except Exception:
-        data = {"is_safe": True, "reason": "", "final_answer": answer}
-    return data
+    return res.choices[0].message.content
+
+
+async def _mini_completion_async(aclient: AsyncOpenAI, prompt: str):
+    res = await aclient.chat.completions.create(
+        model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}]
+    )
+    return res.choices[0].message.content
+
+
+def _default_plan(raw_query: str):
+    return {"refine_question": raw_query, "intention": "일반질문", "tool_plan": []}
+
+
+def plan_from_user_query(raw_query: str, client: OpenAI):
+    prompt = PLAN_PROMPT_TEMPLATE.format(raw_query=raw_query)
+    return _parse_json(_mini_completion(client, prompt), _default_plan(raw_query))
+
+
+async def plan_from_user_query_async(raw_query: str, aclient: AsyncOpenAI):
+    prompt = PLAN_PROMPT_TEMPLATE.format(raw_query=raw_query)
+    text = await _mini_completion_async(aclient, prompt)
+    return _parse_json(text, _default_plan(raw_query))
+
+
+def check_policy_and_safety(user_query: str, answer: str, client: OpenAI):
+    prompt = POLICY_SAFETY_PROMPT_TEMPLATE.format(user_query=user_query, answer=answer)
+    return _parse_json(
+        _mini_completion(client, prompt),
+        {"is_safe": True, "reason": "", "final_answer": answer},
+    )
+
+
+async def check_policy_and_safety_async(
+    user_query: str, answer: str, aclient: AsyncOpenAI
+):
+    prompt = POLICY_SAFETY_PROMPT_TEMPLATE.format(user_query=user_query, answer=answer)
+    return _parse_json(
+        await _mini_completion_async(aclient, prompt),
+        {"is_safe": True, "reason": "", "final_answer": answer},
+    )
+
+
+# 분류 LLM 호출 전에 쓰는 저비용 규칙: 인사·감사·맞장구 한마디는 문서 검색이 필요 없는 질의로 봄
+# (선행 문서 검색을 건너뛰는 데만 쓰고, 도구 사용 여부는 여전히 분류 결과로 결정)
+_SMALL_TALK = re.compile(
+    r"(?:안녕\S*|반가\S*|고마\S*|감사\S*|수고\S*|[ㅎㅋ]+|네|넵|응|예|좋아요?|알겠\S*"
+    r"|ok|hi|hello|thanks?)[\s!.~?]*"
+)
+
+
+def is_small_talk(query: str) -> bool:
+    query = unicodedata.normalize("NFKC", query or "").strip().lower()
+    return not query or bool(_SMALL_TALK.fullmatch(query))
+
+
+CLASSIFY_FALLBACK = {
+    "need_tools": True,
+    "reason": "JSON 파싱 실패, 기본값으로 tools 사용",
+}
 
 
 def classify_query_for_tools(query: str, client: OpenAI):
     prompt = CLASSIFY_PROMPT_TEMPLATE.format(query=query)
-    res = client.chat.completions.create(
-        model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}]
+    return _parse_json(_mini_completion(client, prompt), dict(CLASSIFY_FALLBACK))
+
+
+async def classify_query_for_tools_async(query: str, aclient: AsyncOpenAI):
+    prompt = CLASSIFY_PROMPT_TEMPLATE.format(query=query)
+    text = await _mini_completion_async(aclient, prompt)
+    return _parse_json(text, dict(CLASSIFY_FALLBACK))
+
+
+def _split_route_and_plan(query: str, data: dict):
+    # 한 번에 받은 결과를 기존 분류 결과 / 플래너 결과 형태로 나눔
+    if not isinstance(data, dict) or "need_tools" not in data:
+        return dict(CLASSIFY_FALLBACK), _default_plan(query)
+    classify_result = {
+        "need_tools": bool(data["need_tools"]),
+        "reason": data.get("reason", ""),
+    }
+    plan = _default_plan(query)
+    plan["refine_question"] = data.get("refine_question") or query
+    plan["intention"] = data.get("intention") or plan["intention"]
+    plan["tool_plan"] = [
+        {
+            "name": step["name"],
+            "args": {k: v for k, v in step.get("args", {}).items() if v is not None},
+        }
+        for step in data.get("tool_plan") or []
+    ]
+    return classify_result, plan
+
+
+async def route_and_plan_async(query: str, aclient: AsyncOpenAI):
+    # 분류와 플래너를 JSON 스키마로 강제한 한 번의 호출로 처리 → (classify_result, plan)
+    prompt = ROUTE_AND_PLAN_PROMPT_TEMPLATE.format(query=query)
+    res = await aclient.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_schema", "json_schema": ROUTE_AND_PLAN_SCHEMA},
+    )
+    return _split_route_and_plan(query, _parse_json(res.choices[0].message.content, {}))
+
+
+def search_vector_store(
+    client: OpenAI,
+    query,
+    index,
+    chunks,
+    metadatas,
+    top_k=3,
+    mode: str | None = None,
+    lexical_index=None,
+    filters: dict | None = None,
+):
+    # mode: vector / lexical / hybrid / auto, filters: {"category", "date_from", "date_to", "source_file"}
+    request = {"query": query, "top_k": top_k, "mode": mode, "filters": filters}
+    return search_vector_store_batch(
+        client, [request], index, chunks, metadatas, lexical_index
+    )[0]
+
+
+def search_vector_store_batch(
+    client: OpenAI, search_requests: list, index, chunks, metadatas, lexical_index=None
+):
+    # 한 턴에 들어온 여러 검색 요청을 임베딩 1회 요청 + 다중 행 검색 1회로 처리
+    # (service 모드에서는 index 자리에 RetrievalClient 가 들어와 검색 서비스로 위임)
+    if isinstance(index, RetrievalClient):
+        return index.search(search_requests)
+    return search_documents(
+        client, search_requests, index, chunks, metadatas, lexical_index
     )
-    text = res.choices[0].message.content
-    try:
-        if not text:
-            raise ValueError("Empty response from LLM")
-        data = json.loads(text)
-    except Exception:
-        data = {"need_tools": True, "reason": "JSON 파싱 실패, 기본값으로 tools 사용"}
-    return data
-
-
-def search_vector_store(client: OpenAI, query, index, chunks, metadatas, top_k=3):
-    q_emb = np.array([get_embedding(query, client)], dtype="float32")
-    dist, ids = index.search(q_emb, top_k)
-    results = []
-    for d, i in zip(dist[0], ids[0]):
-        if i == -1:
-            continue
-        results.append(
-            {
-                "text": chunks[i],
-                "source_file": metadatas[i]["source_file"],
-                "score": float(d),
-            }
-        )
-    return results
 
 
 def get_embedding(text, client: OpenAI):
-    res = client.embeddings.create(model="text-embedding-3-small", input=text)
-    return np.array(res.data[0].embedding, dtype="float32")
+    return embed_text(text, client)
 
 
 def get_user_summary(user_id: str) -> Optional[str]:
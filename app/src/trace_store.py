@@ -0,0 +1,75 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from src.config import TRACE_DIR, TRACE_RETENTION_DAYS
+
+
+class TraceStore:
+    # 요청별 도구 원본 결과를 날짜별 JSONL 로 보관
+    # 세션과 Judge 에는 요약본만 남기므로, 원본은 trace_id 로 여기서 확인
+
+    def __init__(
+        self, trace_dir: str = TRACE_DIR, retention_days: int = TRACE_RETENTION_DAYS
+    ):
+        self.trace_dir = trace_dir
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        os.makedirs(self.trace_dir, exist_ok=True)
+        self.prune()
+
+    def _path(self, day: str) -> str:
+        return os.path.join(self.trace_dir, f"{day}.jsonl")
+
+    def append(self, record: dict):
+        record = {"ts": datetime.now().isoformat(timespec="seconds"), **record}
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        try:
+            with self._lock, open(
+                self._path(datetime.now().strftime("%Y%m%d")), "a", encoding="utf-8"
+            ) as f:
+                f.write(line)
+        except OSError as e:
+            print(f"트레이스 저장 실패: {e}")
+
+    def load(self, trace_id: str) -> list:
+        # 최신 파일부터 찾아 해당 요청의 기록을 모두 반환
+        records = []
+        for name in sorted(os.listdir(self.trace_dir), reverse=True):
+            if not name.endswith(".jsonl"):
+                continue
+            with open(os.path.join(self.trace_dir, name), encoding="utf-8") as f:
+                for line in f:
+                    if trace_id not in line:
+                        continue
+                    record = json.loads(line)
+                    if record.get("trace_id") == trace_id:
+                        records.append(record)
+            if records:
+                break
+        return records
+
+    def prune(self) -> int:
+        # 보관 기간이 지난 날짜 파일 삭제
+        cutoff = time.time() - self.retention_days * 86400
+        removed = 0
+        for name in os.listdir(self.trace_dir):
+            path = os.path.join(self.trace_dir, name)
+            if name.endswith(".jsonl") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        return removed
+
+
+_trace_store = None
+_trace_store_lock = threading.Lock()
+
+
+def get_trace_store() -> TraceStore:
+    global _trace_store
+    with _trace_store_lock:
+        if _trace_store is None:
+            _trace_store = TraceStore()
+    return _trace_store
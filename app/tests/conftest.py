@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+import sys
+import types
+
+import pytest
+
+# 앱과 같이 app 디렉터리 기준으로 src / components 를 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.prompts import (  # noqa: E402
+    CLASSIFY_PROMPT_TEMPLATE,
+    CONTEXT_SUMMARY_PROMPT_TEMPLATE,
+    JUDGE_PROMPT_TEMPLATE,
+    PLAN_PROMPT_TEMPLATE,
+)
+from src.trace_store import TraceStore  # noqa: E402
+
+
+def chat_response(content=None, tool_calls=None):
+    message = types.SimpleNamespace(
+        role="assistant", content=content, tool_calls=tool_calls
+    )
+    return types.SimpleNamespace(
+        choices=[types.SimpleNamespace(message=message)], usage=None
+    )
+
+
+class FakeAsyncOpenAI:
+    # chat.completions.create 만 흉내 내는 AsyncOpenAI (responder(model, messages, kwargs) 가 응답 결정)
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.calls = []
+        self.chat = types.SimpleNamespace(
+            completions=types.SimpleNamespace(create=self._create)
+        )
+
+    async def _create(self, model, messages, **kwargs):
+        # 실제 API 호출처럼 한 번은 이벤트 루프에 양보 (동시에 시작한 작업이 먼저 진행될 수 있도록)
+        await asyncio.sleep(0)
+        messages = [dict(m) if isinstance(m, dict) else m for m in messages]
+        self.calls.append({"model": model, "messages": messages, "kwargs": kwargs})
+        result = self.responder(model, messages, kwargs)
+        return result if hasattr(result, "choices") else chat_response(result)
+
+    def calls_for(self, model: str) -> list:
+        return [call for call in self.calls if call["model"] == model]
+
+
+def prompt_kind(messages: list) -> str:
+    # gpt-4o-mini 호출 종류 (분류 / 플래너 / Judge / 대화 요약)
+    first = messages[0].get("content") or ""
+    if first == JUDGE_PROMPT_TEMPLATE:
+        return "judge"
+    if first.startswith(CLASSIFY_PROMPT_TEMPLATE[:30]):
+        return "classify"
+    if first.startswith(PLAN_PROMPT_TEMPLATE[:30]):
+        return "plan"
+    if first.startswith(CONTEXT_SUMMARY_PROMPT_TEMPLATE[:30]):
+        return "summary"
+    return "other"
+
+
+def agent_responder(answers: list, scores: list, summary: str = "요약"):
+    # 복잡 질의 경로용 응답: gpt-4o 는 answers 를 차례로, Judge 는 scores 를 차례로 반환
+    answers, scores = list(answers), list(scores)
+
+    def respond(model, messages, kwargs):
+        if model == "gpt-4o":
+            return answers.pop(0)
+        kind = prompt_kind(messages)
+        if kind == "judge":
+            return json.dumps({"score": scores.pop(0), "reason": "근거 부족"})
+        if kind == "classify":
+            return json.dumps({"need_tools": True, "reason": "규정 질문"})
+        if kind == "plan":
+            return json.dumps({"refine_question": "질문", "tool_plan": []})
+        if kind == "summary":
+            return summary
+        return "{}"
+
+    return respond
+
+
+@pytest.fixture
+def trace_store(tmp_path, monkeypatch):
+    store = TraceStore(str(tmp_path / "traces"))
+    monkeypatch.setattr("src.agent_core.get_trace_store", lambda: store)
+    return store
+
+
+@pytest.fixture
+def fake_aclient(monkeypatch):
+    # src.agent_core 가 쓰는 AsyncOpenAI 를 가짜로 교체하고, 응답 방식은 테스트에서 지정
+    client = FakeAsyncOpenAI(lambda model, messages, kwargs: "{}")
+    monkeypatch.setattr("src.agent_core.get_async_client", lambda _client: client)
+    return client
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from conftest import agent_responder, chat_response, prompt_kind
+from openai.types.chat import ChatCompletionMessageFunctionToolCall
+from openai.types.chat.chat_completion_message_function_tool_call import Function
+
+from src import agent_core, judge_policy
+from src.agent_core import get_response_async
+
+DIRECTIVE = "당신은 부동산 상담사입니다."
+HEADLINES = ["가" * 200, "전세 시장 동향"]
+
+
+def _tool_call(call_id: str, name: str, args: dict):
+    return ChatCompletionMessageFunctionToolCall(
+        id=call_id,
+        type="function",
+        function=Function(name=name, arguments=json.dumps(args, ensure_ascii=False)),
+    )
+
+
+@pytest.fixture
+def tools(monkeypatch):
+    # 외부 API 대신 뉴스는 느린 가짜, 법령 검색은 제한 시간을 넘기는 가짜
+    started = []
+
+    async def fake_news(topic, http_client):
+        started.append(topic)
+        await asyncio.sleep(0.05)
+        return {"topic": topic, "headlines": HEADLINES}
+
+    async def slow_law(http_client, **args):
+        await asyncio.sleep(1)
+        return {}
+
+    monkeypatch.setattr(agent_core, "get_news_async", fake_news)
+    monkeypatch.setattr(agent_core, "search_korean_law_async", slow_law)
+    monkeypatch.setattr(agent_core, "get_http_client", lambda: None)
+    monkeypatch.setattr(agent_core, "TOOL_TIMEOUTS", {"search_korean_law": 0.1})
+    monkeypatch.setattr(judge_policy, "JUDGE_POLICY", "always")
+    return started
+
+
+def test_tool_loop_runs_calls_and_compacts_results(fake_aclient, trace_store, tools):
+    answers = [
+        chat_response(
+            tool_calls=[
+                _tool_call("c1", "get_news", {"topic": "전세"}),
+                _tool_call("c2", "get_news", {"topic": "매매"}),
+                _tool_call("c3", "search_korean_law", {"query": "보증금"}),
+            ]
+        ),
+        "[핵심 요약] 전세 시장 동향",
+    ]
+    fake_aclient.responder = agent_responder(answers, [5])
+
+    answer, tool_results, session, _ = asyncio.run(
+        get_response_async(None, None, "요즘 전세 뉴스 알려줘", DIRECTIVE, session=[])
+    )
+
+    assert answer == "[핵심 요약] 전세 시장 동향"
+    assert sorted(tools) == ["매매", "전세"]
+    # 인덱스가 없으면 문서 검색 도구는 빠짐
+    first = fake_aclient.calls_for("gpt-4o")[0]
+    names = [t["function"]["name"] for t in first["kwargs"]["tools"]]
+    assert "search_vector_store" not in names and "get_news" in names
+
+    # 두 번째 gpt-4o 호출은 원래 tool_call 순서대로 원본 결과를 받음
+    tool_msgs = [
+        m
+        for m in fake_aclient.calls_for("gpt-4o")[1]["messages"]
+        if m["role"] == "tool"
+    ]
+    assert [m["tool_call_id"] for m in tool_msgs] == ["c1", "c2", "c3"]
+    assert json.loads(tool_msgs[0]["content"])["headlines"] == HEADLINES
+    assert "응답 시간 초과" in json.loads(tool_msgs[2]["content"])["error"]
+
+    # 턴이 끝나면 세션과 Judge 입력에는 요약본, 원본은 트레이스 저장소에
+    saved = [m for m in session if m.get("role") == "tool"]
+    assert json.loads(saved[0]["content"])["headlines"][0] == "가" * 120 + "…"
+    assert tool_results["get_news"]["headlines"][0].endswith("…")
+    raw = trace_store.load(tool_results["_trace_id"])
+    assert [r["name"] for r in raw] == [
+        "get_news",
+        "get_news",
+        "search_korean_law",
+        "_judge",
+    ]
+    assert raw[0]["result"]["headlines"] == HEADLINES
+
+
+def test_simple_query_skips_tools_and_judge(fake_aclient, trace_store, tools):
+    def respond(model, messages, kwargs):
+        if model == "gpt-4o":
+            return "안녕하세요"
+        return json.dumps({"need_tools": False, "reason": "인사"})
+
+    fake_aclient.responder = respond
+    answer, tool_results, session, previous_size = asyncio.run(
+        get_response_async(None, None, "안녕", DIRECTIVE, session=[])
+    )
+    assert answer == "안녕하세요"
+    assert previous_size == 0
+    assert session[-1] == {"role": "assistant", "content": "안녕하세요"}
+    assert "tools" not in fake_aclient.calls_for("gpt-4o")[0]["kwargs"]
+    assert tool_results["_mode"] == "simple_answer"
+    # 답변은 한 번만 생성하고 도구·Judge 단계는 거치지 않음
+    assert [c["model"] for c in fake_aclient.calls].count("gpt-4o") == 1
+    assert "_trace_id" not in tool_results
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    # 선행 문서 검색 단계 기록: 임베딩은 release 전까지 대기, 인덱스 검색은 호출만 기록
+    calls = {
+        "embedded": [],
+        "searched": [],
+        "started": threading.Event(),
+        "release": threading.Event(),
+    }
+
+    def fake_embed_query(query, client):
+        calls["started"].set()
+        calls["release"].wait(5)
+        calls["embedded"].append(query)
+
+    def fake_search(client, query, index, chunks, metadatas, lexical_index=None):
+        calls["searched"].append(query)
+        return [{"text": "DSR 규제", "source_file": "a.pdf"}]
+
+    monkeypatch.setattr(agent_core, "embed_query", fake_embed_query)
+    monkeypatch.setattr(agent_core, "search_vector_store", fake_search)
+    monkeypatch.setattr(agent_core, "SPECULATIVE_PREFETCH", True)
+    return calls
+
+
+def _ask(query: str, session: list):
+    return asyncio.run(
+        get_response_async(
+            None, None, query, DIRECTIVE, index=object(), session=session
+        )
+    )
+
+
+def test_small_talk_skips_speculative_search(fake_aclient, searches):
+    fake_aclient.responder = lambda model, messages, kwargs: (
+        "안녕하세요" if model == "gpt-4o" else json.dumps({"need_tools": False})
+    )
+    _ask("안녕하세요!", [])
+    assert searches["embedded"] == [] and searches["searched"] == []
+    # 인사만 했으므로 플래너도 미리 호출하지 않음
+    assert {
+        prompt_kind(c["messages"]) for c in fake_aclient.calls_for("gpt-4o-mini")
+    } == {"classify"}
+
+
+def test_discarded_speculative_search_does_not_start_index_search(
+    fake_aclient, searches
+):
+    def respond(model, messages, kwargs):
+        if model == "gpt-4o":
+            return "DSR 은 총부채원리금상환비율입니다."
+        # 임베딩 스레드가 실행 중일 때 분류 결과를 내고, 그 뒤에야 임베딩을 끝내도록 함
+        assert searches["started"].wait(5)
+        searches["release"].set()
+        return json.dumps({"need_tools": False})
+
+    fake_aclient.responder = respond
+    _ask("DSR 이 뭐야?", [])
+    deadline = time.time() + 5
+    while not searches["embedded"] and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    # 임베딩 스레드는 끝까지 돌지만(결과는 캐시로 재사용) 인덱스 검색은 시작하지 않음
+    assert searches["embedded"] == ["DSR 이 뭐야?"]
+    assert searches["searched"] == []
+
+
+def test_speculative_search_ids_are_unique_across_turns(
+    fake_aclient, trace_store, tools, searches
+):
+    searches["release"].set()
+    fake_aclient.responder = agent_responder(["답변 1", "답변 2"], [5, 5])
+    _, _, session, _ = _ask("전세 대출 규제 알려줘", [])
+    _, _, session, _ = _ask("전세 대출 규제 알려줘", session)
+
+    ids = [
+        m["tool_call_id"]
+        for m in session
+        if m.get("role") == "tool" and m.get("name") == "search_vector_store"
+    ]
+    assert len(ids) == 2 and len(set(ids)) == 2
+    assert searches["searched"] == ["전세 대출 규제 알려줘"] * 2
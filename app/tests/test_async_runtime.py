@@ -0,0 +1,25 @@
+import asyncio
+
+from src.async_runtime import run_sync
+
+
+async def _work(steps: int, progress_callback=None):
+    for step in range(steps):
+        await asyncio.sleep(0.01)
+        progress_callback(step)
+    # 마지막 동작이 콜백이어도 run_sync 가 반환되기 전에 실행되어야 함
+    progress_callback("done")
+    return steps
+
+
+def test_run_sync_delivers_callbacks_in_order():
+    seen = []
+    assert run_sync(_work, 3, progress_callback=seen.append) == 3
+    assert seen == [0, 1, 2, "done"]
+
+
+def test_run_sync_runs_callback_fired_as_last_action():
+    for _ in range(20):
+        seen = []
+        run_sync(_work, 0, progress_callback=seen.append)
+        assert seen == ["done"]
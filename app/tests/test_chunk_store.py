@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from src.chunk_store import ChunkStore
+
+CHUNKS = {
+    7: "주택임대차보호법 제3조",
+    3: "",
+    12: "DSR 규제 🏠 강화",
+}
+METADATAS = {
+    7: {
+        "source_file": "/docs/법령/주택임대차.pdf",
+        "page": 2,
+        "page_end": 3,
+        "category": "법령",
+        "date": 20240101,
+    },
+    3: {"source_file": "/docs/빈문서.pdf", "page": 1, "page_end": 1},
+    12: {
+        "source_file": "/docs/대출규제/2025-06-27 가계부채.pdf",
+        "page": 5,
+        "page_end": 5,
+        "category": "대출규제",
+        "date": 20250627,
+    },
+}
+
+
+@pytest.fixture(params=[True, False], ids=["mmap", "memory"])
+def store(request, tmp_path):
+    ChunkStore.save(str(tmp_path), CHUNKS, METADATAS)
+    return ChunkStore.load(str(tmp_path), mmap=request.param)
+
+
+def test_offsets_slice_multibyte_text(store):
+    # 오프셋은 UTF-8 바이트 기준이므로 한글·이모지·빈 청크도 그대로 복원
+    assert store.ids.tolist() == [3, 7, 12]
+    assert store.offsets.tolist()[0] == 0
+    assert store.offsets.tolist()[-1] == sum(
+        len(t.encode("utf-8")) for t in CHUNKS.values()
+    )
+    for chunk_id, text in CHUNKS.items():
+        assert store[chunk_id] == text
+
+
+def test_lookup_and_metadata_view(store):
+    assert len(store) == 3 and 7 in store and 8 not in store
+    with pytest.raises(KeyError):
+        store[99]
+    assert store.metadatas[7] == METADATAS[7]
+    assert store.metadatas[3] == {
+        "source_file": "/docs/빈문서.pdf",
+        "page": 1,
+        "page_end": 1,
+        "category": "",
+        "date": 0,
+    }
+    chunks, metadatas = store.to_dicts()
+    assert chunks == CHUNKS
+    assert metadatas[12] == METADATAS[12]
+
+
+def test_select_masks(store):
+    assert store.select() is None
+    assert store.select(category="대출").tolist() == [False, False, True]
+    assert store.select(source_file="주택").tolist() == [False, True, False]
+    # 날짜 상한이 있으면 공표일을 모르는 청크(0)는 제외
+    assert store.select(date_to=20241231).tolist() == [False, True, False]
+    assert store.select(date_from=20250101).tolist() == [False, False, True]
+    assert not np.any(store.select(category="없는분류"))
+
+
+def test_empty_text_blob(tmp_path):
+    ChunkStore.save(str(tmp_path), {0: ""}, {0: {"source_file": "a.pdf"}})
+    store = ChunkStore.load(str(tmp_path), mmap=True)
+    assert store[0] == ""
@@ -0,0 +1,78 @@
+import pytest
+
+from src import chunker
+from src.chunker import (
+    chunker_params,
+    get_chunker,
+    iter_fixed_chunks,
+    iter_sentence_chunks,
+    iter_sentences,
+)
+
+
+@pytest.fixture(autouse=True)
+def char_tokens(monkeypatch):
+    # tiktoken 없이도 결정적으로: 1글자 = 1토큰
+    monkeypatch.setattr(chunker, "count_tokens", lambda text, model=None: len(text))
+
+
+PAGES = [
+    {"page": 1, "text": "첫 문장입니다. 둘째 문장입니다.\n\n새 문단입니다."},
+    {"page": 2, "text": "1. 주택이란 무엇인가\n다음 줄입니다."},
+]
+
+
+def test_default_chunker_is_fixed():
+    assert chunker.CHUNKER == "fixed"
+    assert chunker_params()["chunker"] == "fixed"
+    assert get_chunker() is iter_fixed_chunks
+    assert get_chunker("sentence") is iter_sentence_chunks
+    assert get_chunker("unknown") is iter_fixed_chunks
+
+
+def test_iter_sentences_separators():
+    units = list(iter_sentences(PAGES))
+    assert units == [
+        (1, "첫 문장입니다.", " "),
+        (1, "둘째 문장입니다.", "\n\n"),
+        (1, "새 문단입니다.", "\n\n"),
+        (2, "1. 주택이란 무엇인가", "\n"),
+        (2, "다음 줄입니다.", "\n\n"),
+    ]
+
+
+def test_fixed_chunks_overlap_and_pages():
+    pages = [{"page": 1, "text": "가" * 8}, {"page": 2, "text": "나" * 8}]
+    chunks = list(iter_fixed_chunks(pages, chunk_size=10, overlap=4))
+    assert [c["text"] for c in chunks] == [
+        "가" * 8 + "\n\n",
+        "가" * 2 + "\n\n" + "나" * 6,
+        "나" * 6,
+    ]
+    assert [(c["page"], c["page_end"]) for c in chunks] == [(1, 1), (1, 2), (2, 2)]
+
+
+def test_sentence_chunks_respect_budget_and_paragraphs():
+    # 예산(문장 토큰 합) 20 안에서 문장을 쪼개지 않고 채우며, 문단 경계에서는 겹침 없음
+    chunks = list(iter_sentence_chunks(PAGES, max_tokens=20, overlap_tokens=10))
+    assert [(c["text"], c["page"], c["page_end"]) for c in chunks] == [
+        ("첫 문장입니다. 둘째 문장입니다.", 1, 1),
+        ("새 문단입니다.\n\n1. 주택이란 무엇인가", 1, 2),
+        ("다음 줄입니다.", 2, 2),
+    ]
+
+
+def test_sentence_chunks_overlap_mid_paragraph():
+    pages = [{"page": 1, "text": "가나다라마. 바사아자차. 카타파하가."}]
+    chunks = list(iter_sentence_chunks(pages, max_tokens=12, overlap_tokens=6))
+    assert [c["text"] for c in chunks] == [
+        "가나다라마. 바사아자차.",
+        "바사아자차. 카타파하가.",
+    ]
+
+
+def test_sentence_chunks_split_overlong_sentence():
+    pages = [{"page": 3, "text": "가" * 45}]
+    chunks = list(iter_sentence_chunks(pages, max_tokens=20, overlap_tokens=0))
+    assert [len(c["text"]) for c in chunks] == [15, 15, 15]
+    assert {c["page"] for c in chunks} == {3}
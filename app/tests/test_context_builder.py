@@ -0,0 +1,213 @@
+import asyncio
+
+from conftest import FakeAsyncOpenAI, agent_responder, prompt_kind
+
+from src import context_builder
+from src.agent_core import get_response_async, update_context_summary_async
+from src.agent_utils import init_session
+from src.context_builder import (
+    DIRECTIVE_NAME,
+    SUMMARY_NAME,
+    build_context,
+    find_directives,
+    split_turns,
+    update_session_summary,
+)
+
+DIRECTIVE = "당신은 부동산 상담사입니다."
+
+
+def _turn(i: int, answer: str | None = None) -> list:
+    return [
+        {"role": "user", "content": f"질문 {i}"},
+        {"role": "system", "content": f"[정제된 질문] 질문 {i}"},
+        {"role": "assistant", "content": answer or f"답변 {i}"},
+    ]
+
+
+def _session(n_turns: int) -> list:
+    session = init_session([], DIRECTIVE, True)
+    for i in range(n_turns):
+        session.extend(_turn(i))
+    return session
+
+
+def test_directive_is_marked_and_not_duplicated():
+    session = init_session([], DIRECTIVE, True)
+    session.extend(_turn(0))
+    init_session(session, DIRECTIVE, True)
+    assert find_directives(session) == [
+        {"role": "system", "name": DIRECTIVE_NAME, "content": DIRECTIVE}
+    ]
+
+    init_session(session, "새 지시문", True)
+    assert [d["content"] for d in find_directives(session)] == [DIRECTIVE, "새 지시문"]
+
+
+def test_system_message_before_user_is_not_a_directive():
+    # 재시도/플래너 system 메시지가 다음 user 메시지 바로 앞에 있어도 지시문이 아님
+    session = _session(1)
+    session.append({"role": "system", "content": "이전 턴의 재생성 답변"})
+    session.append({"role": "user", "content": "다음 질문"})
+
+    context = build_context(session)
+    assert context[0] == {
+        "role": "system",
+        "name": DIRECTIVE_NAME,
+        "content": DIRECTIVE,
+    }
+    assert sum(m["role"] == "system" for m in context) == 1
+
+
+def test_past_turn_keeps_only_final_answer():
+    session = init_session([], DIRECTIVE, True)
+    session += [
+        {"role": "user", "content": "질문 0"},
+        {"role": "assistant", "content": "초안"},
+        {"role": "system", "content": "재시도 지시"},
+        {"role": "assistant", "content": "최종 답변"},
+        {"role": "user", "content": "질문 1"},
+    ]
+    context = build_context(session)
+    assert [(m["role"], m["content"]) for m in context] == [
+        ("system", DIRECTIVE),
+        ("user", "질문 0"),
+        ("assistant", "최종 답변"),
+        ("user", "질문 1"),
+    ]
+
+
+def test_build_context_uses_stored_summary_without_llm_call(monkeypatch):
+    monkeypatch.setattr(context_builder, "CONTEXT_KEEP_TURNS", 2)
+    session = _session(4)
+    session.append(
+        {
+            "role": "system",
+            "name": SUMMARY_NAME,
+            "content": "질문 0, 1 요약",
+            "covered_turns": 2,
+        }
+    )
+    session.append({"role": "user", "content": "질문 4"})
+
+    context = build_context(session)
+    assert context[1]["content"] == "[이전 대화 요약]\n질문 0, 1 요약"
+    assert [m["content"] for m in context if m["role"] == "user"] == [
+        "질문 2",
+        "질문 3",
+        "질문 4",
+    ]
+
+
+def test_stored_summary_message_is_not_sent(monkeypatch):
+    # 요약은 답변 뒤 같은 턴에 저장되므로 진행 중인 턴에 섞여 있어도 API 메시지로 보내지 않음
+    monkeypatch.setattr(context_builder, "CONTEXT_KEEP_TURNS", 1)
+    session = _session(3)
+    session.append(
+        {
+            "role": "system",
+            "name": SUMMARY_NAME,
+            "content": "질문 0 요약",
+            "covered_turns": 1,
+        }
+    )
+
+    context = build_context(session)
+    assert not any("covered_turns" in m for m in context)
+    assert not any(m.get("name") == SUMMARY_NAME for m in context)
+    assert context[1]["content"] == "[이전 대화 요약]\n질문 0 요약"
+
+
+def test_unsummarized_dropped_turns_fall_back_to_excerpt(monkeypatch):
+    monkeypatch.setattr(context_builder, "CONTEXT_KEEP_TURNS", 1)
+    session = _session(3)
+    session.append({"role": "user", "content": "질문 3"})
+
+    summary = build_context(session)[1]["content"]
+    assert "질문: 질문 0 / 답변: 답변 0" in summary
+    assert "질문: 질문 1 / 답변: 답변 1" in summary
+
+
+def test_update_session_summary_once_per_dropped_turn(monkeypatch):
+    monkeypatch.setattr(context_builder, "CONTEXT_KEEP_TURNS", 2)
+    aclient = FakeAsyncOpenAI(lambda model, messages, kwargs: "요약 결과")
+
+    session = _session(2)
+    assert asyncio.run(update_session_summary(aclient, session)) is None
+    assert aclient.calls == []
+
+    session.extend(_turn(2))
+    msg = asyncio.run(update_session_summary(aclient, session))
+    assert msg == {
+        "role": "system",
+        "name": SUMMARY_NAME,
+        "content": "요약 결과",
+        "covered_turns": 1,
+    }
+    assert session[-1] is msg
+    # 이미 최신이면 다시 요약하지 않음
+    assert asyncio.run(update_session_summary(aclient, session)) is None
+    assert len(aclient.calls) == 1
+    # 다음 요약은 기존 요약에 새로 밀려난 턴만 더함
+    session.extend(_turn(3))
+    asyncio.run(update_session_summary(aclient, session))
+    prompt = aclient.calls[-1]["messages"][0]["content"]
+    assert "요약 결과" in prompt and "질문 1" in prompt and "질문 0" not in prompt
+
+
+def test_multi_turn_session_with_judge_retry(fake_aclient, trace_store, monkeypatch):
+    # 1턴: Judge 3.0점 → 재생성, 2턴: 지시문과 1턴 최종 답변이 그대로 전달되어야 함
+    monkeypatch.setattr(context_builder, "CONTEXT_KEEP_TURNS", 1)
+    fake_aclient.responder = agent_responder(
+        answers=["초안 답변", "[핵심 요약] 최종 답변 a.pdf 참고", "2턴 답변"],
+        scores=[3.0, 4.5, 4.5],
+        summary="1턴 요약",
+    )
+
+    def ask(query, session):
+        answer, _, session, _ = asyncio.run(
+            get_response_async(None, None, query, DIRECTIVE, session=session)
+        )
+        asyncio.run(update_context_summary_async(None, session))
+        return answer, session
+
+    answer, session = ask("전세사기 관련 규정 알려줘", [])
+    assert answer == "[핵심 요약] 최종 답변 a.pdf 참고"
+    assert {"role": "assistant", "content": answer} in session
+    n_first_turn_calls = len(fake_aclient.calls_for("gpt-4o"))
+
+    answer, session = ask("보증보험은?", session)
+    assert answer == "2턴 답변"
+
+    turn2 = fake_aclient.calls_for("gpt-4o")[n_first_turn_calls:]
+    assert turn2
+    for call in turn2:
+        messages = call["messages"]
+        assert messages[0] == {
+            "role": "system",
+            "name": DIRECTIVE_NAME,
+            "content": DIRECTIVE,
+        }
+        assert sum(m.get("name") == DIRECTIVE_NAME for m in messages) == 1
+        past = [
+            (m["role"], m.get("content"))
+            for m in messages[1:]
+            if m["role"] in ("user", "assistant")
+        ]
+        assert past[:2] == [
+            ("user", "전세사기 관련 규정 알려줘"),
+            ("assistant", "[핵심 요약] 최종 답변 a.pdf 참고"),
+        ]
+        assert ("assistant", "초안 답변") not in past
+
+    # 요약은 응답 이후 한 번만 (2턴이 끝나 1턴이 밀려났을 때)
+    summaries = [
+        c
+        for c in fake_aclient.calls_for("gpt-4o-mini")
+        if prompt_kind(c["messages"]) == "summary"
+    ]
+    assert len(summaries) == 1
+    assert "최종 답변 a.pdf" in summaries[0]["messages"][0]["content"]
+    assert "초안 답변" not in summaries[0]["messages"][0]["content"]
+    assert len(split_turns(session)[1]) == 2
+    assert session[-1]["name"] == SUMMARY_NAME
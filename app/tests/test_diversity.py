@@ -0,0 +1,75 @@
+import types
+
+import numpy as np
+
+from src import retrieval
+from src.diversity import (
+    dedup_select,
+    join_overlapping,
+    merge_adjacent,
+    merge_adjacent_top_k,
+    mmr_select,
+)
+
+# 청크 0~2 는 a.pdf 의 연속 청크, 3~5 는 b.pdf 의 연속 청크
+METADATAS = [{"source_file": "a.pdf"}] * 3 + [{"source_file": "b.pdf"}] * 3
+
+
+def test_mmr_prefers_dissimilar_candidate():
+    vectors = np.array([[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]])
+    relevance = np.array([1.0, 0.95, 0.6])
+    assert mmr_select(relevance, vectors, 2, lam=0.5) == [0, 2]
+    assert mmr_select(relevance, vectors, 2, lam=1.0) == [0, 1]
+
+
+def test_dedup_skips_near_duplicates():
+    vectors = np.array([[1.0, 0.0], [1.0, 0.001], [0.0, 1.0], [0.7, 0.7]])
+    assert dedup_select(vectors, 3, threshold=0.95) == [0, 2, 3]
+    assert dedup_select(vectors, 1) == [0]
+
+
+def test_join_overlapping_removes_overlap():
+    assert join_overlapping("가나다라", "다라마바") == "가나다라마바"
+    assert join_overlapping("가나", "다라") == "가나\n다라"
+
+
+def test_merge_adjacent_groups_runs_by_best_rank():
+    hits = [(4, 0.9), (1, 0.8), (3, 0.7), (0, 0.6)]
+    assert merge_adjacent(hits, METADATAS) == [([3, 4], 0.9), ([0, 1], 0.8)]
+
+
+def test_merge_adjacent_top_k_refills_from_candidates():
+    ranked = [(0, 0.9), (1, 0.8), (4, 0.7), (5, 0.6)]
+    # 상위 2개가 하나로 묶이면 다음 후보로 두 번째 묶음을 채움
+    assert merge_adjacent_top_k(ranked, 2, METADATAS) == [([0, 1], 0.9), ([4], 0.7)]
+    assert len(merge_adjacent_top_k(ranked, 3, METADATAS)) == 2  # 후보 부족
+
+
+def _plan(hits, top_k):
+    return {"hits": hits, "top_k": top_k, "q_emb": None}
+
+
+def test_diversify_defaults_keep_top_k(monkeypatch):
+    monkeypatch.setattr(retrieval, "RAG_DIVERSITY", "off")
+    monkeypatch.setattr(retrieval, "RAG_MERGE_ADJACENT", False)
+    hits = [(0, 0.9), (1, 0.8), (2, 0.7)]
+    assert retrieval.diversify(_plan(hits, 2), None, None, METADATAS) == [
+        ([0], 0.9),
+        ([1], 0.8),
+    ]
+
+
+def test_diversify_merge_returns_top_k_groups(monkeypatch):
+    monkeypatch.setattr(retrieval, "RAG_DIVERSITY", "mmr")
+    monkeypatch.setattr(retrieval, "RAG_MERGE_ADJACENT", True)
+    chunks = types.SimpleNamespace(
+        ids=np.arange(6),
+        vectors=np.array(
+            [[1, 0], [1, 0.01], [1, 0.02], [0, 1], [0.01, 1], [0.5, 0.5]],
+            dtype="float32",
+        ),
+    )
+    hits = [(0, 0.9), (1, 0.8), (2, 0.7), (3, 0.6), (4, 0.5)]
+    groups = retrieval.diversify(_plan(hits, 2), None, chunks, METADATAS)
+    assert len(groups) == 2
+    assert {ids[0] for ids, _ in groups} == {0, 3}
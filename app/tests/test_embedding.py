@@ -0,0 +1,16 @@
+from src import embedding
+from src.embedding import _prepare_input, count_tokens
+
+
+def test_fallback_token_count_is_utf8_upper_bound(monkeypatch):
+    # 토크나이저가 없으면 한국어 1글자를 3토큰까지로 봄 (글자 수는 실제 토큰 수보다 작음)
+    monkeypatch.setattr(embedding, "get_encoding", lambda model=None: None)
+    assert count_tokens("주택담보대출") == 18
+    assert count_tokens("DSR 40%") == 7
+
+
+def test_fallback_truncation_keeps_whole_characters(monkeypatch):
+    monkeypatch.setattr(embedding, "get_encoding", lambda model=None: None)
+    monkeypatch.setattr(embedding, "MAX_INPUT_TOKENS", 10)
+    text, n_tokens = _prepare_input("가계부채관리", "text-embedding-3-small")
+    assert text == "가계부" and n_tokens == 9
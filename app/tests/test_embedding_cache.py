@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from src import embedding_cache
+from src.embedding_cache import QueryEmbeddingCache, embed_queries, normalize_query
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = QueryEmbeddingCache(db_path=str(tmp_path / "q.db"))
+    monkeypatch.setattr(embedding_cache, "get_query_embedding_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def embedded(monkeypatch):
+    # embed_texts 로 보낸 텍스트 기록, 벡터는 [배치 내 순번, 글자 수]
+    sent = []
+
+    def fake_embed_texts(texts, client, model):
+        sent.append(list(texts))
+        return np.array([[n, len(t)] for n, t in enumerate(texts)], dtype="float32")
+
+    monkeypatch.setattr(embedding_cache, "embed_texts", fake_embed_texts)
+    return sent
+
+
+def test_normalize_query():
+    assert normalize_query("  ＤＳＲ   한도\n") == "dsr 한도"
+
+
+def test_embed_queries_sends_original_text_once_per_key(cache, embedded):
+    vectors = embed_queries(["DSR  한도", "dsr 한도", "전세 보증금"], None)
+    assert embedded == [["DSR  한도", "전세 보증금"]]
+    assert vectors.shape == (3, 2)
+    assert np.array_equal(vectors[0], vectors[1])
+
+    embed_queries(["ＤＳＲ 한도"], None)
+    assert len(embedded) == 1
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_lru_eviction_and_ttl(tmp_path, monkeypatch):
+    cache = QueryEmbeddingCache(max_entries=2, ttl_sec=10, db_path=None)
+    for q in ("a", "b", "c"):
+        cache.put(q, [1.0])
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+    now = embedding_cache.time.time()
+    monkeypatch.setattr(embedding_cache.time, "time", lambda: now + 11)
+    assert cache.get("c") is None
+
+
+def test_disk_layer_survives_restart(tmp_path):
+    db_path = str(tmp_path / "q.db")
+    QueryEmbeddingCache(db_path=db_path).put("전세", [1.0, 2.0])
+    restarted = QueryEmbeddingCache(db_path=db_path)
+    assert restarted.get(" 전세 ").tolist() == [1.0, 2.0]
+    assert restarted.stats()["disk_hits"] == 1
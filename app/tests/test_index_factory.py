@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from src import index_factory
+from src.index_factory import (
+    INDEX_TYPES,
+    build_index,
+    configured_index_type,
+    factory_string,
+    rescore_exact,
+    search_with_ids,
+    stores_exact_vectors,
+)
+
+DIM = 16
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    vectors = rng.random((200, DIM), dtype=np.float32)
+    ids = np.arange(1000, 1200, dtype="int64")
+    return vectors, ids
+
+
+def test_factory_string_falls_back_to_flat_for_small_sets():
+    assert factory_string("ivf_flat", DIM, 50) == "IDMap2,Flat"
+    assert factory_string("ivf_flat", DIM, 200).startswith("IVF")
+    assert factory_string("ivf_pq", DIM, 200) == "IDMap2,Flat"
+    assert factory_string("ivf_pq", DIM, 10000).endswith("x8")
+    with pytest.raises(ValueError):
+        factory_string("annoy", DIM, 10)
+
+
+@pytest.mark.parametrize("kind", INDEX_TYPES)
+def test_build_index_keeps_chunk_ids(kind, data):
+    vectors, ids = data
+    index = build_index(kind, vectors, ids)
+    assert index.ntotal == len(ids)
+    _, found = index.search(vectors[:5], 1)
+    assert set(found[:, 0]) <= set(ids.tolist())
+    # 양자화(SQ/PQ) 인덱스만 근사 거리 (ivf_pq 는 학습 데이터가 적어 flat 으로 대체됨)
+    quantized = any(q in factory_string(kind, DIM, len(ids)) for q in ("SQ", "PQ"))
+    assert stores_exact_vectors(index) is not quantized
+
+
+def test_search_with_ids_restricts_candidates(data):
+    vectors, ids = data
+    index = build_index("flat", vectors, ids)
+    allowed = ids[10:20]
+    _, found = search_with_ids(index, vectors[:1], 5, allowed)
+    assert set(found[0].tolist()) <= set(allowed.tolist())
+
+
+def test_rescore_exact_reorders_by_true_distance(data):
+    vectors, ids = data
+    query = vectors[3:4]
+    candidates = np.array([[ids[7], ids[3], -1]])
+    dist, found = rescore_exact(query, candidates, vectors, ids, 3)
+    assert found[0].tolist() == [ids[3], ids[7], -1]
+    assert dist[0][0] == 0 and np.isinf(dist[0][2])
+
+
+def test_configured_index_type_falls_back_to_flat(monkeypatch):
+    monkeypatch.setattr(index_factory, "RAG_INDEX_TYPE", "hnsw")
+    assert configured_index_type() == "hnsw"
+    monkeypatch.setattr(index_factory, "RAG_INDEX_TYPE", "annoy")
+    assert configured_index_type() == "flat"
@@ -0,0 +1,52 @@
+from src import index_warmup
+from src.index_warmup import EMPTY_RESOURCES, IndexWarmup
+
+RESOURCES = ("index", ["chunk"], [{}], "lexical")
+
+
+def _flaky_loader(failures):
+    # 처음 failures 번은 실패, 이후 성공
+    calls = []
+
+    def load(progress):
+        calls.append(1)
+        progress({"stage": "load"})
+        if len(calls) <= failures:
+            raise RuntimeError("disk not ready")
+        return RESOURCES
+
+    return load, calls
+
+
+def test_ready_warmup_swaps_resources():
+    load, calls = _flaky_loader(0)
+    warmup = IndexWarmup(load).start()
+    assert warmup.wait(5) == RESOURCES
+    assert warmup.snapshot()["status"] == "ready"
+    assert warmup.retry_if_failed() is warmup and len(calls) == 1
+
+
+def test_failed_warmup_retries_after_interval(monkeypatch):
+    load, calls = _flaky_loader(1)
+    warmup = IndexWarmup(load).start()
+    assert warmup.wait(5) == EMPTY_RESOURCES
+    assert warmup.status == "failed" and "disk not ready" in warmup.error
+
+    # 재시도 간격 전에는 실패 상태 유지
+    warmup.retry_if_failed(60)
+    assert warmup.status == "failed" and len(calls) == 1
+
+    finished = warmup.finished_at
+    monkeypatch.setattr(index_warmup.time, "time", lambda: finished + 61)
+    warmup.retry_if_failed(60)
+    assert warmup.wait(5) == RESOURCES
+    assert warmup.status == "ready" and warmup.error is None
+    assert len(calls) == 2
+
+
+def test_no_documents_is_failed_and_retryable():
+    results = [EMPTY_RESOURCES, RESOURCES]
+    warmup = IndexWarmup(lambda progress: results.pop(0)).start()
+    warmup.wait(5)
+    assert warmup.status == "failed"
+    assert warmup.retry_if_failed(0).wait(5) == RESOURCES
@@ -0,0 +1,75 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src import ingest_pipeline
+from src.ingest_pipeline import ingest_files
+
+
+@pytest.fixture(autouse=True)
+def fake_embedding(monkeypatch):
+    monkeypatch.setattr(
+        ingest_pipeline,
+        "embed_texts",
+        lambda texts, client, concurrency=1: np.ones((len(texts), 4), dtype="float32"),
+    )
+    monkeypatch.setattr(ingest_pipeline, "count_tokens", lambda text: len(text))
+
+
+def _ocr(path: str):
+    if path.startswith("bad"):
+        raise RuntimeError("OCR 실패")
+    return [{"page": 1, "text": path}]
+
+
+def _chunk(pages):
+    # 페이지 하나를 청크 20개로 나눔 (작은 큐를 가득 채우기 위함)
+    return [{"text": f"{pages[0]['text']}-{n}", "page": 1} for n in range(20)]
+
+
+def test_failed_ocr_counts_toward_progress():
+    progress = []
+    jobs = [("a.pdf", "a.pdf"), ("bad.pdf", "bad.pdf")]
+    result = ingest_files(
+        jobs,
+        None,
+        _ocr,
+        _chunk,
+        on_vectors=lambda *args: None,
+        progress_callback=progress.append,
+    )
+    assert list(result["completed"]) == ["a.pdf"]
+    assert result["failed"] == ["bad.pdf"]
+    assert progress[-1]["files_done"] == progress[-1]["files_total"] == 2
+
+
+def test_on_vectors_error_stops_workers():
+    def on_vectors(ids, texts, metas, embeddings):
+        raise OSError("디스크 가득 참")
+
+    jobs = [(f"{n}.pdf", f"{n}.pdf") for n in range(10)]
+    errors = []
+
+    def run():
+        try:
+            ingest_files(
+                jobs,
+                None,
+                _ocr,
+                _chunk,
+                on_vectors,
+                queue_size=1,
+                max_batch_inputs=2,
+            )
+        except OSError as e:
+            errors.append(e)
+
+    before = threading.active_count()
+    runner = threading.Thread(target=run)
+    runner.start()
+    runner.join(timeout=10)
+    # 예외가 호출한 쪽까지 전달되고 OCR/청커/배처 스레드도 모두 종료
+    assert not runner.is_alive()
+    assert [str(e) for e in errors] == ["디스크 가득 참"]
+    assert threading.active_count() == before
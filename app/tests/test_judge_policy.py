@@ -0,0 +1,162 @@
+import asyncio
+import time
+
+import pytest
+from conftest import FakeAsyncOpenAI, agent_responder, prompt_kind
+
+from src import agent_core, judge_policy
+from src.agent_utils import init_session
+from src.judge_policy import (
+    can_judge,
+    can_retry,
+    configured_judge_policy,
+    is_well_grounded,
+    observe,
+)
+
+DOCS = [{"text": "DSR 40%", "source": "가계부채.pdf", "page": 3}]
+LAW = {"total": 1, "hits": [{"안건명": "전세보증금 반환", "안건번호": "21-0624"}]}
+TRACE = {"trace_id": "t1", "user_id": "u1"}
+
+
+@pytest.fixture(autouse=True)
+def estimates(monkeypatch):
+    # 요청 간에 공유되는 예상 소요 시간을 테스트마다 초기값으로
+    monkeypatch.setattr(judge_policy, "_estimates", {"judge": 3.0, "regen": 10.0})
+
+
+def _use_policy(monkeypatch, policy: str):
+    monkeypatch.setattr(judge_policy, "JUDGE_POLICY", policy)
+
+
+def test_configured_policy_falls_back_to_always(monkeypatch):
+    _use_policy(monkeypatch, "adaptive")
+    assert configured_judge_policy() == "adaptive"
+    _use_policy(monkeypatch, "sometimes")
+    assert configured_judge_policy() == "always"
+
+
+@pytest.mark.parametrize(
+    "answer, tool_results, expected",
+    [
+        ("[출처] 가계부채.pdf 3쪽", {"search_vector_store": DOCS}, True),
+        ("안건번호 21-0624 에 따르면", {"search_korean_law": LAW}, True),
+        ("출처 없이 답변", {"search_vector_store": DOCS}, False),
+        (
+            "가계부채 참고",
+            {"search_vector_store": DOCS, "get_news": {"error": "x"}},
+            False,
+        ),
+        ("가계부채 참고", {"search_vector_store": DOCS, "get_news": []}, False),
+        ("답변", {}, False),
+        # "_" 로 시작하는 내부 기록은 도구 결과로 보지 않음
+        ("가계부채", {"search_vector_store": DOCS, "_judge_policy": {}}, True),
+    ],
+)
+def test_is_well_grounded(answer, tool_results, expected):
+    assert is_well_grounded(answer, tool_results) is expected
+
+
+def test_deadline_checks_use_running_estimates():
+    now = time.time()
+    assert can_judge("always", now - 1000) and can_retry("grounded", now - 1000)
+    # 마감 40초, Judge 3초 / 재생성 10초 예상
+    assert can_judge("deadline", now - 30)
+    assert not can_retry("deadline", now - 30)
+    assert not can_judge("adaptive", now - 38)
+
+    observe("judge", 13.0)
+    assert judge_policy.estimate("judge") == pytest.approx(6.0)
+    assert not can_judge("deadline", now - 35)
+
+
+def _session():
+    session = init_session([], "부동산 상담사", True)
+    session += [
+        {"role": "user", "content": "DSR 한도는?"},
+        {"role": "assistant", "content": "초안"},
+    ]
+    return session
+
+
+def _run_phase(aclient, first_output, tool_results, started=None, session=None):
+    async def run():
+        result = await agent_core._run_judge_phase(
+            aclient,
+            "DSR 한도는?",
+            "부동산 상담사",
+            session if session is not None else _session(),
+            first_output,
+            tool_results,
+            TRACE,
+            started if started is not None else time.time(),
+        )
+        # async 정책의 백그라운드 평가까지 마친 뒤 반환
+        await asyncio.gather(*agent_core._background_judges)
+        return result
+
+    return asyncio.run(run())
+
+
+def _judge_calls(aclient):
+    return [c for c in aclient.calls if prompt_kind(c["messages"]) == "judge"]
+
+
+def test_always_retries_low_score(monkeypatch, trace_store):
+    _use_policy(monkeypatch, "always")
+    aclient = FakeAsyncOpenAI(agent_responder(["개선된 답변"], [3, 5]))
+    session = _session()
+    output, logs = _run_phase(aclient, "초안", {}, session=session)
+
+    assert output == "개선된 답변"
+    assert logs["_judge_last"]["score"] == 5
+    assert logs["_judge_policy"] == {"policy": "always", "action": "judged"}
+    assert session[-1] == {"role": "assistant", "content": "개선된 답변"}
+    record = trace_store.load("t1")[-1]
+    assert (record["name"], record["score"], record["attempts"]) == ("_judge", 5, 2)
+
+
+def test_grounded_skips_judge(monkeypatch, trace_store):
+    _use_policy(monkeypatch, "grounded")
+    aclient = FakeAsyncOpenAI(agent_responder([], []))
+    output, logs = _run_phase(
+        aclient, "가계부채 자료 기준 40%", {"search_vector_store": DOCS}
+    )
+    assert output == "가계부채 자료 기준 40%"
+    assert logs["_judge_policy"]["action"] == "skipped_grounded"
+    assert aclient.calls == []
+
+
+def test_deadline_skips_when_out_of_time(monkeypatch, trace_store):
+    _use_policy(monkeypatch, "deadline")
+    aclient = FakeAsyncOpenAI(agent_responder([], [2]))
+    output, logs = _run_phase(aclient, "초안", {}, started=time.time() - 39)
+    assert output == "초안"
+    assert logs["_judge_policy"]["action"] == "deadline_skipped"
+    assert _judge_calls(aclient) == []
+
+
+def test_deadline_caps_retries(monkeypatch, trace_store):
+    _use_policy(monkeypatch, "deadline")
+    aclient = FakeAsyncOpenAI(agent_responder(["재생성"], [2]))
+    # Judge 3초는 남았지만 재생성+재평가 13초는 부족
+    output, logs = _run_phase(aclient, "초안", {}, started=time.time() - 30)
+    assert output == "초안"
+    assert logs["_judge_policy"]["action"] == "deadline_capped"
+    assert len(_judge_calls(aclient)) == 1
+    assert aclient.calls_for("gpt-4o") == []
+
+
+def test_async_judges_in_background(monkeypatch, trace_store):
+    _use_policy(monkeypatch, "async")
+    aclient = FakeAsyncOpenAI(agent_responder([], [2]))
+    output, logs = _run_phase(aclient, "초안", {})
+    # 점수가 낮아도 초안을 그대로 확정하고 점수만 기록
+    assert output == "초안"
+    assert logs["_judge_policy"]["action"] == "deferred"
+    assert aclient.calls_for("gpt-4o") == []
+    records = trace_store.load("t1")
+    assert [(r["action"], r["score"]) for r in records] == [
+        ("deferred", None),
+        ("deferred", 2),
+    ]
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from src import retrieval
+from src.lexical_index import (
+    LexicalIndex,
+    is_keyword_query,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+
+CHUNKS = {
+    10: "주택임대차보호법 제3조의2 보증금의 회수",
+    11: "투기과열지구 지정 및 해제 절차",
+    12: "전세사기 피해자 지원 및 주거안정 특별법",
+}
+
+
+def test_tokenize_korean_bigrams_and_articles():
+    assert tokenize("투기과열지구") == ["투기", "기과", "과열", "열지", "지구"]
+    assert tokenize("제3조의2 DSR 21-0624") == ["제3조의2", "dsr", "21-0624"]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("주택임대차보호법 제3조", True),
+        ("안건 21-0624", True),
+        ('"확정일자"', True),
+        ("투기과열지구", True),
+        ("DSR LTV", True),
+        # 조사·어미와 같은 음절로 끝나는 명사
+        ("토지", True),
+        ("택지", True),
+        ("보고서", True),
+        ("토지 보고서", True),
+        ("대출 한도", True),
+        ("토지는", False),
+        ("보고서에서", False),
+        ("대출 되나요", False),
+        ("택지 알려줘", False),
+        ("전세사기 예방법은?", False),
+        ("전세사기 예방법은", False),
+        ("보증금 돌려받으려면", False),
+        ("전세 계약할 때 주의할 점", False),
+        ("", False),
+    ],
+)
+def test_is_keyword_query(query, expected):
+    assert is_keyword_query(query) is expected
+
+
+def test_bm25_search_and_mmap_roundtrip(tmp_path):
+    index = LexicalIndex.build(CHUNKS)
+    assert index.search("제3조의2", 3)[0][0] == 10
+    assert [i for i, _ in index.search("투기과열지구", 3)] == [11]
+    assert index.search("없는단어", 3) == []
+
+    index.save(str(tmp_path))
+    loaded = LexicalIndex.load(str(tmp_path), mmap=True)
+    assert len(loaded) == 3
+    assert loaded.search("전세사기", 3) == index.search("전세사기", 3)
+    # allowed 는 청크 ID 오름차순 행 마스크
+    assert (
+        loaded.search("특별법 회수", 3, allowed=np.array([True, False, False]))[0][0]
+        == 10
+    )
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1]], k=60)
+    assert [i for i, _ in fused] == [1, 3, 2]
+
+
+def _plan(query, mode, lexical_index):
+    return retrieval._plan_search(
+        {"query": query, "top_k": 2, "mode": mode}, None, lexical_index
+    )
+
+
+def test_auto_mode_routes_only_keyword_queries_to_bm25():
+    index = LexicalIndex.build(CHUNKS)
+    plan = _plan("제3조의2", "auto", index)
+    assert plan["mode"] == "lexical" and plan["hits"]
+
+    plan = _plan("전세사기 예방법은?", "auto", index)
+    assert plan["mode"] == "hybrid" and plan["hits"] is None
+
+
+def test_lexical_mode_falls_back_to_vector_without_hits():
+    index = LexicalIndex.build(CHUNKS)
+    plan = _plan("청약 가점", "lexical", index)
+    assert plan["mode"] == "vector" and plan["hits"] is None
@@ -0,0 +1,42 @@
+import os
+import time
+
+from src.ocr_cache import OcrCache
+
+MODEL = "document-parse"
+
+
+def _pages(n: int) -> list:
+    # 압축해도 크기가 유지되도록 항목마다 다른 난수 텍스트
+    return [{"page": 1, "text": os.urandom(n).hex()}]
+
+
+def test_put_scans_the_cache_only_when_over_limit(tmp_path, monkeypatch):
+    cache = OcrCache(str(tmp_path), max_bytes=10**9)
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+
+    for n in range(30):
+        cache.put(f"{n:064x}", MODEL, _pages(100))
+    # 처음 한 번만 전체를 스캔하고 이후에는 크기를 증감만 함
+    assert len(scans) == 1
+    assert cache._total_bytes == cache.stats()["bytes"]
+
+
+def test_eviction_removes_least_recently_used_down_to_target(tmp_path):
+    cache = OcrCache(str(tmp_path), max_bytes=0)
+    for n in range(10):
+        cache.put(f"{n:064x}", MODEL, _pages(500))
+        past = time.time() - 100 + n
+        os.utime(cache._path(f"{n:064x}", MODEL), (past, past))
+    total = cache.stats()["bytes"]
+    cache.get(f"{0:064x}", MODEL)  # 가장 오래된 항목을 최근 사용으로 갱신
+
+    cache.max_bytes = total - 1
+    cache.put(f"{10:064x}", MODEL, _pages(500))
+    stats = cache.stats()
+    assert stats["bytes"] <= cache.max_bytes * 0.9
+    assert cache.get(f"{0:064x}", MODEL) is not None
+    assert cache.get(f"{1:064x}", MODEL) is None
+    assert (stats["hits"], stats["misses"]) == (1, 0)
@@ -0,0 +1,31 @@
+import numpy as np
+
+from src.rag_bench import evaluate_index_types, hold_out_queries
+
+DIM = 16
+
+
+def _data(n: int):
+    rng = np.random.default_rng(0)
+    return rng.random((n, DIM), dtype=np.float32), np.arange(100, 100 + n)
+
+
+def test_held_out_queries_are_not_indexed():
+    vectors, ids = _data(200)
+    queries, base, base_ids = hold_out_queries(vectors, ids, 50, k=5)
+    assert len(queries) == 50 and len(base) == len(base_ids) == 150
+    # 질의 벡터는 인덱스 쪽 어떤 벡터와도 같지 않음 (자기 자신 매칭 없음)
+    dist = ((queries[:, None, :] - base[None, :, :]) ** 2).sum(-1)
+    assert dist.min() > 0
+
+
+def test_hold_out_keeps_enough_vectors_for_small_corpus():
+    vectors, ids = _data(8)
+    queries, base, _ = hold_out_queries(vectors, ids, 200, k=5)
+    assert len(queries) == 3 and len(base) == 5
+
+
+def test_flat_recall_is_exact_on_held_out_queries():
+    vectors, ids = _data(200)
+    (row,) = evaluate_index_types(vectors, ids, ["flat"], k=5, n_queries=20)
+    assert row["recall@5"] == 1.0
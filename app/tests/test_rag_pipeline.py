@@ -0,0 +1,145 @@
+import hashlib
+import types
+
+import numpy as np
+import pytest
+
+from src import ingest_pipeline, rag_pipeline
+from src.index_store import load_index_artifact, load_manifest
+from src.rag_pipeline import load_or_build_index, sync_index_artifact
+
+DIM = 8
+
+
+def _vector(text: str) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+    return np.random.default_rng(seed).random(DIM, dtype=np.float32)
+
+
+@pytest.fixture
+def embedded(monkeypatch):
+    # OCR 은 파일 내용을 한 페이지로, 임베딩은 텍스트별 고정 난수 벡터로 대체하고 임베딩한 텍스트를 기록
+    sent = []
+
+    def fake_embed_texts(texts, client, concurrency=1):
+        sent.extend(texts)
+        return np.stack([_vector(t) for t in texts])
+
+    def fake_read_pdf_pages(path):
+        with open(path, encoding="utf-8") as f:
+            return [{"page": 1, "text": f.read()}]
+
+    monkeypatch.setattr(ingest_pipeline, "embed_texts", fake_embed_texts)
+    monkeypatch.setattr(ingest_pipeline, "count_tokens", lambda text: len(text))
+    monkeypatch.setattr(rag_pipeline, "count_tokens", lambda text: len(text))
+    monkeypatch.setattr(rag_pipeline, "read_pdf_pages", fake_read_pdf_pages)
+    monkeypatch.setattr(
+        rag_pipeline, "get_ocr_cache", lambda: types.SimpleNamespace(ocr_pages=0)
+    )
+    return sent
+
+
+@pytest.fixture
+def folder(tmp_path):
+    docs = tmp_path / "rag"
+    (docs / "대출규제").mkdir(parents=True)
+    return docs
+
+
+def _write(folder, rel: str, text: str):
+    (folder / rel).write_text(text, encoding="utf-8")
+
+
+def _chunk_ids(manifest: dict) -> dict:
+    return {rel: info["chunk_ids"] for rel, info in manifest["files"].items()}
+
+
+def test_incremental_update_embeds_only_changed_files(folder, tmp_path, embedded):
+    artifact_dir = str(tmp_path / "index")
+    _write(folder, "a.pdf", "유지되는 문서")
+    _write(folder, "b.pdf", "바뀌기 전 문서")
+    _write(folder, "대출규제/2025-06-27 d.pdf", "삭제될 문서")
+    sync_index_artifact(str(folder), None, artifact_dir)
+    before = _chunk_ids(load_manifest(artifact_dir))
+    assert sorted(embedded) == sorted(
+        ["유지되는 문서", "바뀌기 전 문서", "삭제될 문서"]
+    )
+
+    embedded.clear()
+    _write(folder, "b.pdf", "바뀐 문서")
+    _write(folder, "c.pdf", "새 문서")
+    (folder / "대출규제" / "2025-06-27 d.pdf").unlink()
+    index, chunks, metadatas, manifest, saved = sync_index_artifact(
+        str(folder), None, artifact_dir
+    )
+
+    assert saved
+    assert sorted(embedded) == ["바뀐 문서", "새 문서"]
+    after = _chunk_ids(manifest)
+    assert set(after) == {"a.pdf", "b.pdf", "c.pdf"}
+    # 변경 없는 파일의 청크 ID 는 그대로, 변경/추가 파일은 새 ID
+    assert after["a.pdf"] == before["a.pdf"]
+    assert not set(after["b.pdf"]) & set(before["b.pdf"])
+    assert manifest["last_ingest"]["files_deleted"] == 1
+    assert manifest["last_ingest"]["chunks_embedded"] == 2
+
+    index, store, _, lexical_index = load_index_artifact(artifact_dir, mmap=True)
+    assert index.ntotal == len(store) == 3
+    assert sorted(store[i] for i in store.ids.tolist()) == sorted(
+        ["유지되는 문서", "바뀐 문서", "새 문서"]
+    )
+    a_id = after["a.pdf"][0]
+    _, ids = index.search(_vector("유지되는 문서")[None, :], 1)
+    assert ids[0][0] == a_id
+    assert lexical_index.search("새 문서", 1)[0][0] == after["c.pdf"][0]
+
+
+def test_document_metadata_from_folder_and_name(folder, tmp_path, embedded):
+    _write(folder, "대출규제/2025-06-27 가계부채.pdf", "DSR 규제")
+    _, chunks, metadatas, _, _ = sync_index_artifact(
+        str(folder), None, str(tmp_path / "index")
+    )
+    (chunk_id,) = chunks
+    assert metadatas[chunk_id]["category"] == "대출규제"
+    assert metadatas[chunk_id]["date"] == 20250627
+
+
+def test_load_or_build_reuses_current_artifact(folder, tmp_path, embedded):
+    artifact_dir = str(tmp_path / "index")
+    _write(folder, "a.pdf", "문서")
+    progress = []
+    index, store, _, _ = load_or_build_index(
+        str(folder), None, artifact_dir, progress_callback=progress.append
+    )
+    assert len(store) == 1 and embedded == ["문서"]
+    # 진행 상황은 바뀐 항목만 오므로 단계가 없는 갱신도 있음
+    stages = [p["stage"] for p in progress if "stage" in p]
+    assert stages == ["scan", "ingest", "save"]
+
+    progress.clear()
+    _, store, _, _ = load_or_build_index(
+        str(folder), None, artifact_dir, progress_callback=progress.append
+    )
+    # 폴더·파라미터가 그대로면 다시 임베딩하지 않고 디스크 아티팩트를 엶
+    assert embedded == ["문서"]
+    assert [p["stage"] for p in progress] == ["scan", "load"]
+    assert store[store.ids[0]] == "문서"
+
+
+def test_merge_vector_store_drops_and_sorts(monkeypatch):
+    # 작은 블록으로 나눠 병합해도 결과가 같아야 함
+    monkeypatch.setattr(rag_pipeline, "MERGE_BLOCK_ROWS", 2)
+    old = (np.array([1, 4, 6]), np.arange(3, dtype="float32")[:, None] + 10)
+    new = (np.array([5, 2]), np.arange(2, dtype="float32")[:, None] + 20)
+    ids, vectors = rag_pipeline._merge_vector_store([old, new], [4])
+    assert ids.tolist() == [1, 2, 5, 6]
+    assert vectors[:, 0].tolist() == [10, 21, 20, 12]
+
+
+def test_empty_folder_builds_nothing(folder, tmp_path, embedded):
+    assert load_or_build_index(str(folder), None, str(tmp_path / "index")) == (
+        None,
+        [],
+        [],
+        None,
+    )
@@ -0,0 +1,58 @@
+import json
+import socketserver
+import threading
+import time
+
+import pytest
+
+from src.retrieval_service import RetrievalClient
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def service(tmp_path):
+    # 연결마다 behavior(연결 순번) 로 응답 방식을 정하는 가짜 검색 서비스
+    state = {"connections": 0, "behavior": None}
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            state["connections"] += 1
+            n = state["connections"]
+            for line in self.rfile:
+                action = state["behavior"](n)
+                if action == "close":
+                    return
+                if action == "hang":
+                    time.sleep(0.5)
+                    return
+                requests = json.loads(line)["requests"]
+                results = [[{"text": r["query"]}] for r in requests]
+                self.wfile.write(json.dumps({"results": results}).encode() + b"\n")
+                self.wfile.flush()
+
+    path = str(tmp_path / "service.sock")
+    server = _Server(path, Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield path, state
+    server.shutdown()
+    server.server_close()
+
+
+def test_reconnects_once_after_dropped_connection(service):
+    path, state = service
+    state["behavior"] = lambda n: "close" if n == 1 else "reply"
+    client = RetrievalClient(path, timeout=1)
+    assert client.search([{"query": "DSR"}]) == [[{"text": "DSR"}]]
+    assert state["connections"] == 2
+
+
+def test_timeout_is_not_retried(service):
+    path, state = service
+    state["behavior"] = lambda n: "hang"
+    client = RetrievalClient(path, timeout=0.1)
+    with pytest.raises(TimeoutError):
+        client.search([{"query": "DSR"}])
+    assert state["connections"] == 1
@@ -0,0 +1,78 @@
+import json
+
+from src import tool_compactor
+from src.tool_compactor import compact_tool_result
+
+
+def _law_hit(n: int) -> dict:
+    return {
+        "안건명": f"안건 {n}",
+        "안건번호": f"21-{n:04d}",
+        "회신일자": "2021.06.24",
+        "법령해석례일련번호": str(n),
+        "질의요지": "긴 본문" * 100,
+    }
+
+
+def test_law_keeps_count_and_top_hit_fields(monkeypatch):
+    monkeypatch.setattr(tool_compactor, "COMPACT_LAW_HITS", 2)
+    result = {"Expc": {"totalCnt": "7", "expc": [_law_hit(n) for n in range(4)]}}
+    compact = compact_tool_result("search_korean_law", result)
+    assert compact["total"] == "7"
+    assert compact["hits"] == [
+        {"안건명": "안건 0", "안건번호": "21-0000", "회신일자": "2021.06.24"},
+        {"안건명": "안건 1", "안건번호": "21-0001", "회신일자": "2021.06.24"},
+    ]
+
+    # 결과가 한 건이면 API 가 리스트 대신 dict 를 돌려줌
+    single = compact_tool_result("search_korean_law", {"Expc": {"expc": _law_hit(9)}})
+    assert single["total"] == 1 and single["hits"][0]["안건번호"] == "21-0009"
+
+
+def test_error_results_are_kept_short():
+    compact = compact_tool_result("search_korean_law", {"error": "타임아웃" * 200})
+    assert list(compact) == ["error"] and len(compact["error"]) == 301
+
+
+def test_news_headlines_are_truncated():
+    compact = compact_tool_result(
+        "get_news", {"topic": "전세", "headlines": ["가" * 200, "짧은 제목"]}
+    )
+    assert compact["topic"] == "전세"
+    assert compact["headlines"] == ["가" * 120 + "…", "짧은 제목"]
+
+
+def test_documents_keep_source_and_page_range(monkeypatch):
+    monkeypatch.setattr(tool_compactor, "COMPACT_DOC_EXCERPT_CHARS", 5)
+    result = [
+        {
+            "text": "가나다라마바사",
+            "source_file": "/data/rag/대출규제/가계부채.pdf",
+            "page": 3,
+            "page_end": 4,
+            "date": "2025-06-27",
+        },
+        {"text": "짧음", "source_file": "/data/rag/a.pdf", "page": 1, "page_end": 1},
+    ]
+    compact = compact_tool_result("search_vector_store", result)
+    assert compact[0] == {
+        "text": "가나다라마…",
+        "source_file": "/data/rag/대출규제/가계부채.pdf",
+        "source": "가계부채.pdf",
+        "page": "3-4",
+        "date": "2025-06-27",
+    }
+    assert compact[1]["page"] == 1 and compact[1]["text"] == "짧음"
+
+
+def test_generic_results_are_capped(monkeypatch):
+    monkeypatch.setattr(tool_compactor, "TOOL_RESULT_MAX_CHARS", 50)
+    assert compact_tool_result("get_current_datetime", "2025년") == "2025년"
+    compact = compact_tool_result("check_policy_and_safety", {"text": "가" * 100})
+    assert compact["truncated"] is True
+    assert (
+        compact["preview"] == json.dumps({"text": "가" * 100}, ensure_ascii=False)[:50]
+    )
+    # 도구별 요약 뒤에도 상한을 넘으면 한 번 더 자름
+    docs = [{"text": "x", "source_file": f"/d/{n}.pdf"} for n in range(10)]
+    assert compact_tool_result("search_vector_store", docs)["truncated"] is True
@@ -0,0 +1,31 @@
+import os
+import time
+
+from src.trace_store import TraceStore
+
+
+def test_append_and_load_by_trace_id(tmp_path):
+    store = TraceStore(str(tmp_path))
+    store.append({"trace_id": "t1", "name": "get_news", "result": {"n": 1}})
+    store.append({"trace_id": "t2", "name": "get_news", "result": {"n": 2}})
+    store.append({"trace_id": "t1", "name": "_judge", "score": 5})
+
+    records = store.load("t1")
+    assert [r["name"] for r in records] == ["get_news", "_judge"]
+    assert records[0]["result"] == {"n": 1} and "ts" in records[0]
+    assert store.load("없음") == []
+
+
+def test_prune_removes_expired_files(tmp_path):
+    old = tmp_path / "20000101.jsonl"
+    old.write_text('{"trace_id": "old"}\n', encoding="utf-8")
+    expired = time.time() - 3 * 86400
+    os.utime(old, (expired, expired))
+    (tmp_path / "notes.txt").write_text("keep", encoding="utf-8")
+    os.utime(tmp_path / "notes.txt", (expired, expired))
+
+    store = TraceStore(str(tmp_path), retention_days=2)
+    assert not old.exists()
+    assert (tmp_path / "notes.txt").exists()
+    store.append({"trace_id": "new"})
+    assert store.prune() == 0